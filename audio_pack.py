@@ -0,0 +1,423 @@
+"""
+단어별 mp3 파일들을 몇 개의 큰 팩 파일과 하나의 색인으로 묶는 오디오 팩
+
+    python audio_pack.py build --csv dict/kss_data.csv
+    python audio_pack.py info
+    python audio_pack.py verify --csv dict/kss_data.csv
+    python audio_pack.py extract felon --output felon.mp3
+
+팩 파일(audio-<빌드 ID>-000.pack, ...)은 클립을 이어 붙인 것이고, 색인 파일은 korean_phonetic_store.py와
+같은 형식(매직, 메타데이터 JSON, 64바이트 경계의 배열 섹션)으로 단어 문자열 테이블과
+단어별 (팩 번호, offset, 길이, SHA-256, 재생 시간)을 담습니다. 단어는 64비트 해시 순으로
+정렬해 두어 찾을 때 파이썬 딕셔너리를 만들지 않고 이진 탐색합니다.
+
+AudioPack은 팩 파일을 mmap으로 열고 클립을 복사 없는 memoryview로 돌려주므로 수많은 작은
+파일을 여는 대신 몇 개의 파일만 열어 둔 채로 바로 응답할 수 있습니다.
+"""
+
+import argparse
+import hashlib
+import mmap
+import os
+import time
+
+import numpy as np
+
+from korean_phonetic_levenshtein import _to_text
+from korean_phonetic_store import StringTable, read_sections, write_sections
+
+AUDIO_CSV_PATH = 'dict/kss_data.csv'
+AUDIO_DIR = 'audio'
+MANIFEST_PATH = 'audio/manifest.csv'
+PACK_DIR = 'audio/pack'
+INDEX_NAME = 'audio.index'
+
+MAGIC = b'KPAUD\x00\x00\x01'
+VERSION = 1
+
+# 팩 파일 하나의 최대 크기 (넘으면 다음 팩 파일에 씀)
+MAX_PACK_SIZE = 1 << 30
+
+# verify 결과 종류
+MISSING = 'missing'
+TRUNCATED = 'truncated'
+CORRUPT = 'corrupt'
+
+# MPEG 오디오 Layer III 프레임 헤더의 비트레이트(kbps)와 샘플링 주파수 (버전 비트: 3=MPEG1, 2=MPEG2, 0=MPEG2.5)
+_BITRATES = {
+    'mpeg1': [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    'mpeg2': [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+
+def _id3_end(data):
+    """ID3v2 태그 다음 위치 (태그가 없으면 0)"""
+    # 크기는 7비트씩 나뉜 synchsafe 정수, 바닥글 플래그가 있으면 10바이트 추가
+    if len(data) >= 10 and data[:3] == b'ID3':
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        return 10 + size + (10 if data[5] & 0x10 else 0)
+    return 0
+
+
+def _frame_header(data, pos):
+    """pos의 Layer III 프레임 헤더를 읽은 (프레임 길이, 샘플 수, 샘플링 주파수) (헤더가 아니면 None)"""
+    if pos + 4 > len(data):
+        return None
+    b1, b2 = data[pos + 1], data[pos + 2]
+    version = (b1 >> 3) & 3
+    bitrate_index = b2 >> 4
+    rate_index = (b2 >> 2) & 3
+    if (data[pos] != 0xFF or b1 & 0xE0 != 0xE0 or version == 1 or (b1 >> 1) & 3 != 1
+            or bitrate_index in (0, 15) or rate_index == 3):
+        return None
+    sample_rate = _SAMPLE_RATES[version][rate_index]
+    padding = (b2 >> 1) & 1
+    if version == 3:
+        return 144 * _BITRATES['mpeg1'][bitrate_index] * 1000 // sample_rate + padding, 1152, sample_rate
+    return 72 * _BITRATES['mpeg2'][bitrate_index] * 1000 // sample_rate + padding, 576, sample_rate
+
+
+def mp3_duration(data):
+    """mp3 바이트의 재생 시간(초) (Layer III 프레임 헤더를 따라가며 샘플 수를 합산, 프레임이 없으면 0)"""
+    data = memoryview(data)
+    pos = _id3_end(data)
+    samples = 0
+    sample_rate = None
+    while pos + 4 <= len(data):
+        header = _frame_header(data, pos)
+        if header is None:
+            # 프레임 헤더가 아니면 한 바이트씩 다음 동기 패턴을 찾음
+            pos += 1
+            continue
+        length, frame_samples, sample_rate = header
+        pos += length
+        samples += frame_samples
+    return samples / sample_rate if sample_rate else 0.0
+
+
+def is_complete_mp3(data):
+    """mp3 바이트가 ID3v2 태그 바로 뒤부터 파일 끝까지 온전한 Layer III 프레임으로 이어지는지
+
+    중간에서 끊긴(내려받다 만) 파일은 마지막 프레임이 모자라고, 손상된 파일은 프레임 사이에
+    동기 패턴이 없으므로 거짓이 됩니다. 끝의 ID3v1 태그(TAG로 시작하는 128바이트)는 허용합니다.
+    """
+    data = memoryview(data)
+    pos = _id3_end(data)
+    frames = 0
+    while True:
+        header = _frame_header(data, pos)
+        if header is None:
+            break
+        pos += header[0]
+        frames += 1
+    if pos == len(data) - 128 and data[pos:pos + 3] == b'TAG':
+        pos = len(data)
+    return frames > 0 and pos == len(data)
+
+
+def word_hashes(words):
+    """단어별 64비트 해시 (UTF-8 blake2b 앞 8바이트)"""
+    return np.array(
+        [int.from_bytes(hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest(), 'little') for word in words],
+        dtype=np.uint64,
+    )
+
+
+def collect_clips(csv_path=None, manifest_path=None, audio_dir=AUDIO_DIR):
+    """팩에 넣을 (단어, 파일 경로) 리스트와 넣지 못하는 (단어, 경로) 리스트 반환
+
+    매니페스트(download_audio.py)는 status가 ok인 행을, CSV는 audio_path 컬럼을 사용합니다.
+    CSV에 디렉토리 없이 파일 이름만 적혀 있고 그 파일이 없으면 다운로더와 같은
+    audio_dir/<단어 첫 두 글자>/<파일 이름>에서 찾습니다. DOWNLOAD_FAILED 같은 표시나 존재하지
+    않는 경로는 넣지 못하는 목록에 들어가며, 같은 단어가 여러 번 나오면 처음 것만 사용합니다.
+    """
+    if manifest_path is not None:
+        from download_audio import STATUS_OK, load_manifest
+
+        rows = [(word, row['audio_path'] if row['status'] == STATUS_OK else '')
+                for word, row in load_manifest(manifest_path).items()]
+    else:
+        import pandas as pd
+
+        df = pd.read_csv(csv_path)
+        rows = list(zip(df['word'], df['audio_path']))
+
+    clips = []
+    skipped = []
+    seen = set()
+    for word, path in rows:
+        word, path = _to_text(word), _to_text(path)
+        if not word or word in seen:
+            continue
+        seen.add(word)
+        if path.endswith('.mp3') and not os.path.dirname(path) and not os.path.isfile(path):
+            candidate = os.path.join(audio_dir, word[:2].lower(), path)
+            if os.path.isfile(candidate):
+                path = candidate
+        if path.endswith('.mp3') and os.path.isfile(path):
+            clips.append((word, path))
+        else:
+            skipped.append((word, path))
+    return clips, skipped
+
+
+def build_pack(clips, pack_dir=PACK_DIR, max_pack_size=MAX_PACK_SIZE):
+    """(단어, mp3 경로) 리스트를 팩 파일과 색인으로 저장하고 색인 메타데이터를 반환
+
+    팩 파일 이름에는 클립 내용으로 정한 빌드 ID가 들어가므로 새 팩은 기존 색인이 가리키는 팩을
+    덮어쓰지 않습니다 (ID가 같으면 내용도 같음). 팩을 모두 쓴 뒤에 색인을 원자적으로 바꾸고
+    나서야 이전 빌드의 팩을 지우므로, 중간에 실패해도 기존 색인과 그 팩은 그대로 남습니다.
+    """
+    os.makedirs(pack_dir, exist_ok=True)
+    count = len(clips)
+    pack_ids = np.zeros(count, dtype=np.uint16)
+    offsets = np.zeros(count, dtype=np.uint64)
+    lengths = np.zeros(count, dtype=np.uint32)
+    digests = np.zeros((count, 32), dtype=np.uint8)
+    durations = np.zeros(count, dtype=np.float32)
+
+    build_hash = hashlib.sha256(str(max_pack_size).encode('utf-8'))
+    packs = []
+    pack = None
+    for i, (_, path) in enumerate(clips):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if pack is None or (pack['size'] and pack['size'] + len(data) > max_pack_size):
+            if pack is not None:
+                pack['file'].close()
+            tmp_path = os.path.join(pack_dir, f'.audio-{len(packs):03d}.pack.tmp')
+            pack = {'tmp_path': tmp_path, 'size': 0, 'file': open(tmp_path, 'wb')}
+            packs.append(pack)
+        pack['file'].write(data)
+        pack_ids[i] = len(packs) - 1
+        offsets[i] = pack['size']
+        lengths[i] = len(data)
+        digest = hashlib.sha256(data).digest()
+        build_hash.update(digest)
+        digests[i] = np.frombuffer(digest, dtype=np.uint8)
+        durations[i] = mp3_duration(data)
+        pack['size'] += len(data)
+    if pack is not None:
+        pack['file'].close()
+
+    build_id = build_hash.hexdigest()[:12]
+    for n, pack in enumerate(packs):
+        pack['name'] = f'audio-{build_id}-{n:03d}.pack'
+        os.replace(pack['tmp_path'], os.path.join(pack_dir, pack['name']))
+
+    # 해시 순으로 정렬하여 찾을 때 이진 탐색
+    words = [word for word, _ in clips]
+    hashes = word_hashes(words)
+    order = np.argsort(hashes, kind='stable')
+    word_data, word_offsets = StringTable.encode([words[i] for i in order])
+    arrays = {
+        'word_data': word_data,
+        'word_offsets': word_offsets,
+        'word_hashes': hashes[order],
+        'pack_ids': pack_ids[order],
+        'offsets': offsets[order],
+        'lengths': lengths[order],
+        'sha256': digests[order],
+        'durations': durations[order],
+    }
+    metadata = {
+        'version': VERSION,
+        'clips': count,
+        'packs': [{'name': pack['name'], 'size': pack['size']} for pack in packs],
+        'duration_seconds': float(durations.sum()),
+    }
+    metadata = write_sections(os.path.join(pack_dir, INDEX_NAME), MAGIC, metadata, arrays)
+
+    # 새 색인이 자리 잡은 뒤에 이전 빌드의 팩을 지움 (이미 mmap으로 열어 둔 팩은 닫을 때까지 유효)
+    current = {pack['name'] for pack in packs}
+    for name in os.listdir(pack_dir):
+        if name.startswith('audio-') and name.endswith('.pack') and name not in current:
+            os.remove(os.path.join(pack_dir, name))
+    return metadata
+
+
+class AudioPack:
+    """오디오 팩 색인과 팩 파일을 mmap으로 열어 단어별 클립을 memoryview로 돌려주는 클래스
+
+    with 문으로 쓰거나 다 쓴 뒤 close()를 호출하세요. 돌려준 memoryview가 남아 있으면 닫을 수
+    없으므로 (BufferError) 필요한 만큼 쓴 뒤 release()하거나 bytes()로 복사하세요.
+    """
+
+    def __init__(self, pack_dir=PACK_DIR):
+        self.pack_dir = pack_dir
+        self.metadata, self._index_mmap, arrays = read_sections(
+            os.path.join(pack_dir, INDEX_NAME), MAGIC, "오디오 팩 색인 파일")
+        if self.metadata['version'] != VERSION:
+            raise ValueError(f"지원하지 않는 오디오 팩 버전입니다: {self.metadata['version']}")
+
+        self.words = StringTable(arrays['word_data'], arrays['word_offsets'])
+        self.hashes = arrays['word_hashes']
+        self.pack_ids = arrays['pack_ids']
+        self.offsets = arrays['offsets']
+        self.lengths = arrays['lengths']
+        self.digests = arrays['sha256']
+        self.durations = arrays['durations']
+
+        self._files = []
+        self._views = []
+        for pack in self.metadata['packs']:
+            path = os.path.join(pack_dir, pack['name'])
+            if not os.path.exists(path) or os.path.getsize(path) == 0:
+                # 없거나 빈 팩은 빈 버퍼로 두고 verify에서 잘린 클립으로 보고
+                self._files.append(None)
+                self._views.append(memoryview(b''))
+                continue
+            with open(path, 'rb') as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._files.append(mapped)
+            self._views.append(memoryview(mapped))
+
+    def __len__(self):
+        return len(self.words)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def close(self):
+        for view in self._views:
+            view.release()
+        for mapped in self._files:
+            if mapped is not None:
+                mapped.close()
+        self._views = []
+        self._files = []
+
+    def locate(self, word):
+        """단어의 색인 행 번호 (없으면 None)"""
+        key = word_hashes([word])[0]
+        i = int(np.searchsorted(self.hashes, key))
+        while i < len(self.hashes) and self.hashes[i] == key:
+            if self.words[i] == word:
+                return i
+            i += 1
+        return None
+
+    def __contains__(self, word):
+        return self.locate(word) is not None
+
+    def _slice(self, i):
+        start = int(self.offsets[i])
+        return self._views[self.pack_ids[i]][start:start + int(self.lengths[i])]
+
+    def get(self, word):
+        """단어 클립의 memoryview (복사 없음, 없으면 None)"""
+        i = self.locate(word)
+        return None if i is None else self._slice(i)
+
+    def __getitem__(self, word):
+        clip = self.get(word)
+        if clip is None:
+            raise KeyError(word)
+        return clip
+
+    def entry(self, word):
+        """단어의 색인 정보 딕셔너리 (없으면 None)"""
+        i = self.locate(word)
+        if i is None:
+            return None
+        return {
+            'word': word,
+            'pack': self.metadata['packs'][self.pack_ids[i]]['name'],
+            'offset': int(self.offsets[i]),
+            'length': int(self.lengths[i]),
+            'sha256': self.digests[i].tobytes().hex(),
+            'duration': float(self.durations[i]),
+        }
+
+    def verify(self, words=None):
+        """문제가 있는 (단어, 종류) 리스트
+
+        팩의 모든 클립을 SHA-256으로 확인하여 팩 파일이 짧으면 TRUNCATED, 내용이 다르면 CORRUPT로
+        보고하고, words가 주어지면 팩에 없는 단어를 MISSING으로 보고합니다.
+        """
+        problems = []
+        for i, word in enumerate(self.words):
+            clip = self._slice(i)
+            if len(clip) != self.lengths[i]:
+                problems.append((word, TRUNCATED))
+            elif hashlib.sha256(clip).digest() != self.digests[i].tobytes():
+                problems.append((word, CORRUPT))
+            clip.release()
+        if words is not None:
+            problems.extend((word, MISSING) for word in words if word not in self)
+        return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="mp3 클립을 색인된 오디오 팩으로 묶기")
+    parser.add_argument('--pack-dir', default=PACK_DIR)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="클립을 팩 파일과 색인으로 묶기")
+    source = build_parser.add_mutually_exclusive_group()
+    source.add_argument('--csv', default=AUDIO_CSV_PATH, help="word, audio_path 컬럼이 있는 CSV")
+    source.add_argument('--manifest', help="download_audio.py의 오디오 매니페스트 (주어지면 --csv 대신 사용)")
+    build_parser.add_argument('--audio-dir', default=AUDIO_DIR, help="CSV에 파일 이름만 있을 때 찾을 오디오 디렉토리")
+    build_parser.add_argument('--max-pack-size', type=int, default=MAX_PACK_SIZE, help="팩 파일 하나의 최대 바이트 수")
+
+    subparsers.add_parser('info', help="색인 정보와 불러오는 시간 출력")
+
+    verify_parser = subparsers.add_parser('verify', help="클립 무결성 확인")
+    verify_parser.add_argument('--csv', help="word 컬럼이 있는 CSV (주어지면 팩에 없는 단어도 보고)")
+
+    extract_parser = subparsers.add_parser('extract', help="단어 클립을 파일로 저장")
+    extract_parser.add_argument('word')
+    extract_parser.add_argument('--output', help="저장할 경로 (기본값: <word>.mp3)")
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        start = time.perf_counter()
+        clips, skipped = collect_clips(args.csv, args.manifest, args.audio_dir)
+        metadata = build_pack(clips, args.pack_dir, args.max_pack_size)
+        size = sum(pack['size'] for pack in metadata['packs'])
+        print(f"오디오 팩 생성 완료: {metadata['clips']}개 클립, 팩 {len(metadata['packs'])}개, "
+              f"{size / 2 ** 20:.1f}MB, 재생 시간 {metadata['duration_seconds']:.1f}초 "
+              f"({time.perf_counter() - start:.2f}초) -> {args.pack_dir}")
+        if skipped:
+            print(f"오디오 파일이 없어 제외한 단어 {len(skipped)}개: "
+                  + ", ".join(f"{word}({path or '-'})" for word, path in skipped))
+        return
+
+    start = time.perf_counter()
+    with AudioPack(args.pack_dir) as pack:
+        elapsed = time.perf_counter() - start
+        if args.command == 'info':
+            print(f"{args.pack_dir}: {len(pack)}개 클립, 팩 {len(pack.metadata['packs'])}개, "
+                  f"재생 시간 {pack.metadata['duration_seconds']:.1f}초")
+            print(f"불러오기: {elapsed * 1000:.1f}ms")
+        elif args.command == 'verify':
+            words = None
+            if args.csv:
+                import pandas as pd
+
+                words = [_to_text(word) for word in pd.read_csv(args.csv)['word']]
+            problems = pack.verify(words)
+            for word, kind in problems:
+                print(f"{kind}: {word}")
+            print(f"{len(pack)}개 클립 확인, 문제 {len(problems)}개")
+            if problems:
+                raise SystemExit(1)
+        else:
+            clip = pack.get(args.word)
+            if clip is None:
+                raise SystemExit(f"팩에 없는 단어입니다: {args.word}")
+            output = args.output or f'{args.word}.mp3'
+            with open(output, 'wb') as f:
+                f.write(clip)
+            clip.release()
+            print(f"{args.word}: {pack.entry(args.word)['duration']:.2f}초 -> {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""
+발음 유사도 계산과 매핑의 성능 측정 스크립트
+
+    python benchmark.py run --sizes 10000 100000 1000000 --output bench.json
+    python benchmark.py compare before.json after.json
+
+측정 항목 (결과는 커밋끼리 비교할 수 있도록 JSON으로 저장):
+    pairwise  길이 구간별 weighted_levenshtein 처리량 (쌍/초)
+    decompose 음절 분해 처리량 (글자/초)
+    top_k     사전 인코딩 시간과 단일 쿼리 top-k 지연 시간 (실제 KO 사전과 합성 사전 크기별)
+    mapper    N개 쿼리 단어에 대한 매핑 스크립트 전체 실행 시간과 최대 RSS
+
+합성 사전은 실제 KO 사전의 음절 빈도와 단어 길이 분포를 따라 고정된 seed로 생성합니다.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import numpy as np
+
+from korean_phonetic_levenshtein import KoreanPhoneticLexicon, KoreanPhoneticSimilarity
+
+KO_PATH = 'dict/final/ko-dict-pronunciation.csv'
+OUTPUT_PATH = 'benchmark_results.json'
+MAPPER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'korean_phonetic_levenshtein_mapper.py')
+
+LENGTH_BUCKETS = [(1, 2), (3, 4), (5, 8), (9, 16)]
+
+
+class SyllableSampler:
+    """실제 사전의 음절 빈도와 단어 길이 분포로 합성 한글 단어를 만드는 클래스"""
+
+    def __init__(self, words, seed=0):
+        syllables = Counter(char for word in words for char in word if '가' <= char <= '힣')
+        lengths = Counter(len(word) for word in words if word)
+        if not syllables:
+            syllables = Counter(chr(code) for code in range(0xAC00, 0xAC00 + 11172))
+            lengths = Counter({2: 1, 3: 1})
+        self.syllables = list(syllables)
+        self.syllable_weights = list(syllables.values())
+        self.lengths = list(lengths)
+        self.length_weights = list(lengths.values())
+        self.random = random.Random(seed)
+
+    def word(self, length=None):
+        if length is None:
+            length = self.random.choices(self.lengths, self.length_weights)[0]
+        return ''.join(self.random.choices(self.syllables, self.syllable_weights, k=length))
+
+    def words(self, count, length_range=None):
+        if length_range is None:
+            return [self.word() for _ in range(count)]
+        return [self.word(self.random.randint(*length_range)) for _ in range(count)]
+
+
+def _timeit(func, min_seconds=0.5):
+    """func를 min_seconds 이상 반복 실행하여 (호출 횟수, 총 소요 시간) 반환"""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        func()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return calls, elapsed
+
+
+def _latency_summary(samples):
+    samples = np.array(samples) * 1000
+    return {
+        'p50_ms': float(np.percentile(samples, 50)),
+        'p99_ms': float(np.percentile(samples, 99)),
+        'mean_ms': float(samples.mean()),
+        'queries': len(samples),
+    }
+
+
+def bench_pairwise(kps, sampler, pairs=200):
+    """길이 구간별 weighted_levenshtein 처리량"""
+    results = {}
+    for low, high in LENGTH_BUCKETS:
+        left = sampler.words(pairs, (low, high))
+        right = sampler.words(pairs, (low, high))
+
+        def run():
+            for a, b in zip(left, right):
+                kps.weighted_levenshtein(a, b)
+
+        calls, elapsed = _timeit(run)
+        results[f'{low}-{high}'] = {'pairs_per_second': calls * pairs / elapsed}
+    return results
+
+
+def bench_decompose(kps, sampler, chars=10000):
+    """음절 분해 처리량"""
+    text = ''.join(sampler.words(chars // 2))[:chars]
+
+    def run():
+        for char in text:
+            kps.decompose(char)
+
+    calls, elapsed = _timeit(run)
+    return {'chars_per_second': calls * len(text) / elapsed}
+
+
+def bench_top_k(pronunciations, queries, k=5):
+    """사전 인코딩 시간과 단일 쿼리 top-k 지연 시간"""
+    kps = KoreanPhoneticSimilarity()
+    kps.compile()
+    start = time.perf_counter()
+    lexicon = KoreanPhoneticLexicon(pronunciations, kps=kps)
+    build_seconds = time.perf_counter() - start
+
+    lexicon.top_k(queries[0], k)
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        lexicon.top_k(query, k)
+        samples.append(time.perf_counter() - start)
+    return dict(entries=len(lexicon), build_seconds=build_seconds, **_latency_summary(samples))
+
+
+def bench_mapper(ko_path, queries, workers=1):
+    """N개 쿼리 단어에 대한 매핑 스크립트 실행 시간과 최대 RSS (별도 프로세스)"""
+    import pandas as pd
+
+    with tempfile.TemporaryDirectory() as tmp:
+        kss_path = os.path.join(tmp, 'kss.csv')
+        pd.DataFrame({'word': [f'q{i}' for i in range(len(queries))], 'pronunciation': queries}).to_csv(
+            kss_path, index=False)
+        command = [sys.executable, MAPPER_SCRIPT, '--kss', kss_path, '--ko', ko_path,
+                   '--output', os.path.join(tmp, 'out.csv'), '--workers', str(workers)]
+
+        start = time.perf_counter()
+        process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        # wait4로 이 프로세스만의 자원 사용량을 받음 (작업자 프로세스는 포함하지 않음)
+        _, status, usage = os.wait4(process.pid, 0)
+        wall = time.perf_counter() - start
+        process.returncode = os.waitstatus_to_exitcode(status)
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, command)
+
+    # ru_maxrss 단위는 Linux는 KB, macOS는 바이트
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return {
+        'queries': len(queries),
+        'workers': workers,
+        'wall_seconds': wall,
+        'peak_rss_mb': usage.ru_maxrss * scale / 2 ** 20,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(MAPPER_SCRIPT)).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(ko_path=KO_PATH, sizes=(10000, 100000), num_queries=100, mapper_queries=(45,),
+                   workers=1, seed=0, skip=()):
+    """모든 측정을 실행하고 JSON으로 저장할 결과 딕셔너리 반환"""
+    import pandas as pd
+
+    ko_df = pd.read_csv(ko_path) if os.path.exists(ko_path) else None
+    ko_pronunciations = ko_df['pronunciation'].fillna('').astype(str).tolist() if ko_df is not None else []
+    sampler = SyllableSampler(ko_pronunciations, seed=seed)
+    queries = sampler.words(num_queries)
+    kps = KoreanPhoneticSimilarity()
+
+    results = {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'seed': seed,
+        },
+    }
+
+    if 'pairwise' not in skip:
+        print("pairwise weighted_levenshtein ...")
+        results['pairwise'] = bench_pairwise(kps, sampler)
+    if 'decompose' not in skip:
+        print("decompose ...")
+        results['decompose'] = bench_decompose(kps, sampler)
+    if 'top_k' not in skip:
+        results['top_k'] = {}
+        if ko_pronunciations:
+            print(f"top_k: {ko_path} ...")
+            results['top_k']['ko'] = bench_top_k(ko_pronunciations, queries)
+        for size in sizes:
+            print(f"top_k: 합성 사전 {size}개 ...")
+            lexicon = SyllableSampler(ko_pronunciations, seed=seed + size).words(size)
+            results['top_k'][f'synthetic_{size}'] = bench_top_k(lexicon, queries)
+    if 'mapper' not in skip and ko_pronunciations:
+        results['mapper'] = []
+        for count in mapper_queries:
+            print(f"mapper: 쿼리 {count}개 ...")
+            results['mapper'].append(bench_mapper(ko_path, sampler.words(count), workers))
+    return results
+
+
+def _flatten(results, prefix=''):
+    """중첩된 결과를 {'top_k.ko.p50_ms': 값} 형태로 펼치기 (meta 제외)"""
+    flat = {}
+    items = enumerate(results) if isinstance(results, list) else results.items()
+    for key, value in items:
+        if key == 'meta':
+            continue
+        name = f'{prefix}{key}'
+        if isinstance(value, (dict, list)):
+            flat.update(_flatten(value, f'{name}.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(before, after):
+    """두 결과 파일의 공통 항목을 (이전, 이후, 비율) 로 출력"""
+    old, new = _flatten(before), _flatten(after)
+    print(f"{'항목':<45} {'이전':>14} {'이후':>14} {'이후/이전':>10}")
+    for name in old:
+        if name in new:
+            ratio = new[name] / old[name] if old[name] else float('nan')
+            print(f"{name:<45} {old[name]:>14.4g} {new[name]:>14.4g} {ratio:>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="발음 유사도/매핑 성능 측정")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help="측정 실행 후 JSON 저장")
+    run_parser.add_argument('--ko', default=KO_PATH, help="KO 사전 발음 CSV (음절 분포와 실제 사전 측정에 사용)")
+    run_parser.add_argument('--sizes', type=int, nargs='*', default=[10000, 100000], help="합성 사전 크기")
+    run_parser.add_argument('--queries', type=int, default=100, help="top-k 지연 시간을 잴 쿼리 수")
+    run_parser.add_argument('--mapper-queries', type=int, nargs='*', default=[45], help="매핑 스크립트에 넘길 쿼리 수")
+    run_parser.add_argument('--workers', type=int, default=1, help="매핑 스크립트의 --workers")
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--skip', nargs='*', default=[], choices=['pairwise', 'decompose', 'top_k', 'mapper'])
+    run_parser.add_argument('--output', default=OUTPUT_PATH)
+
+    compare_parser = subparsers.add_parser('compare', help="두 결과 JSON 비교")
+    compare_parser.add_argument('before')
+    compare_parser.add_argument('after')
+
+    args = parser.parse_args()
+
+    if args.command == 'compare':
+        with open(args.before, encoding='utf-8') as f:
+            before = json.load(f)
+        with open(args.after, encoding='utf-8') as f:
+            after = json.load(f)
+        compare(before, after)
+        return
+
+    results = run_benchmarks(args.ko, args.sizes, args.queries, args.mapper_queries, args.workers,
+                             args.seed, args.skip)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+    print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
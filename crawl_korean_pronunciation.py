@@ -1,75 +1,263 @@
-import pandas as pd
-import requests
-from bs4 import BeautifulSoup
+"""
+aha-dic.com에서 영어 단어의 한글 발음을 수집하는 스크립트
+
+    python crawl_korean_pronunciation.py --concurrency 4 --rate 1
+
+여러 요청을 하나의 연결 풀(requests.Session)로 동시에 보내되, 토큰 버킷으로 초당 요청 수를
+제한합니다. 실패한 요청은 지수 백오프로 재시도하고, 받은 응답은 내용 해시로 디스크에
+캐시하므로 다시 실행하거나 파싱 로직을 바꿔도 같은 페이지를 다시 받지 않습니다.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
 import time
-from tqdm import tqdm
-
-df = pd.read_csv('dict/kss_with_naive_mnemonics.csv')
-
-# 새로운 컬럼을 저장할 리스트
-pronunciations = []
-
-# 각 단어에 대해 웹 스크래핑 수행
-for word in tqdm(df['word'], desc="단어 발음 수집 중"):
-    url = f'http://aha-dic.com/View.asp?word={word}'
-    try:
-        response = requests.get(url)
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # phoneticKor 클래스를 가진 span 태그 찾기
-        phonetic_spans = soup.find_all('span', class_='phoneticKor')
-        
-        # 모든 발음을 합치기
-        pronunciation = ''
-        for span in phonetic_spans:
-            # 원본 텍스트 가져오기
-            text = span.get_text()
-            # 대괄호 제거
-            text = text.replace('[', '').replace(']', '')
-            
-            # accent 클래스를 가진 span 태그 찾기
-            accent_spans = span.find_all('span', class_='accent')
-            
-            # accent 태그가 있는 경우 처리
-            if accent_spans:
-                result_text = ''
-                current_pos = 0
-                
-                for accent_span in accent_spans:
-                    accent_text = accent_span.get_text()
-                    accent_pos = text.find(accent_text, current_pos)
-                    
-                    if accent_pos != -1:
-                        # accent 앞부분 추가
-                        result_text += text[current_pos:accent_pos]
-                        # accent 부분을 <>로 감싸기
-                        result_text += f'<{accent_text}>'
-                        current_pos = accent_pos + len(accent_text)
-                
-                # 남은 부분 추가
-                result_text += text[current_pos:]
-                pronunciation += result_text
-            else:
-                pronunciation += text
-        
-        if pronunciation:
-            print(f"단어: {word} -> 발음: {pronunciation}")
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+import instrumentation
+from http_utils import RETRY_STATUS, TokenBucket, pooled_session, retry_delay
+
+BASE_URL = 'http://aha-dic.com/View.asp'
+INPUT_PATH = 'dict/kss_with_naive_mnemonics.csv'
+OUTPUT_PATH = 'dict/kss_data.csv'
+CACHE_DIR = 'dict/cache/aha-dic'
+
+
+def parse_pronunciation(html):
+    """aha-dic 단어 페이지 HTML에서 한글 발음을 추출 (accent 부분은 <>로 감쌈)"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # phoneticKor 클래스를 가진 span 태그 찾기
+    phonetic_spans = soup.find_all('span', class_='phoneticKor')
+
+    # 모든 발음을 합치기
+    pronunciation = ''
+    for span in phonetic_spans:
+        # 원본 텍스트 가져오기
+        text = span.get_text()
+        # 대괄호 제거
+        text = text.replace('[', '').replace(']', '')
+
+        # accent 클래스를 가진 span 태그 찾기
+        accent_spans = span.find_all('span', class_='accent')
+
+        # accent 태그가 있는 경우 처리
+        if accent_spans:
+            result_text = ''
+            current_pos = 0
+
+            for accent_span in accent_spans:
+                accent_text = accent_span.get_text()
+                accent_pos = text.find(accent_text, current_pos)
+
+                if accent_pos != -1:
+                    # accent 앞부분 추가
+                    result_text += text[current_pos:accent_pos]
+                    # accent 부분을 <>로 감싸기
+                    result_text += f'<{accent_text}>'
+                    current_pos = accent_pos + len(accent_text)
+
+            # 남은 부분 추가
+            result_text += text[current_pos:]
+            pronunciation += result_text
         else:
-            print(f"단어: {word} -> 발음 정보 없음")
-            
-        pronunciations.append(pronunciation)
-        
-        # 서버에 부하를 주지 않기 위해 잠시 대기
-        time.sleep(1)
-        
-    except Exception as e:
-        print(f"Error processing word {word}: {e}")
-        pronunciations.append('')
+            pronunciation += text
+
+    return pronunciation
+
+
+class ResponseCache:
+    """URL별 원본 응답을 내용 해시(SHA-256)로 저장하는 디스크 캐시
+
+    본문은 objects/<해시 앞 2자리>/<해시> 에, URL -> (해시, 인코딩) 정보는
+    urls/<URL 해시>.json 에 저장합니다. 같은 내용의 응답은 한 번만 저장됩니다.
+    """
+
+    def __init__(self, root=CACHE_DIR):
+        self.root = root
+
+    def _url_path(self, url):
+        return os.path.join(self.root, 'urls', hashlib.sha256(url.encode('utf-8')).hexdigest() + '.json')
+
+    def _object_path(self, digest):
+        return os.path.join(self.root, 'objects', digest[:2], digest)
+
+    def get(self, url):
+        """캐시된 응답 텍스트 (없거나 손상되었으면 None)"""
+        try:
+            with open(self._url_path(url), encoding='utf-8') as f:
+                entry = json.load(f)
+            with open(self._object_path(entry['sha256']), 'rb') as f:
+                content = f.read()
+        except (OSError, ValueError, KeyError):
+            return None
+        if hashlib.sha256(content).hexdigest() != entry['sha256']:
+            return None
+        return content.decode(entry.get('encoding') or 'utf-8', errors='replace')
+
+    def put(self, url, content, encoding):
+        digest = hashlib.sha256(content).hexdigest()
+        object_path = self._object_path(digest)
+        if not os.path.exists(object_path):
+            _atomic_write(object_path, content)
+        entry = {'url': url, 'sha256': digest, 'encoding': encoding}
+        _atomic_write(self._url_path(url), json.dumps(entry, ensure_ascii=False).encode('utf-8'))
+
+
+def _atomic_write(path, data):
+    """임시 파일에 쓴 뒤 이름을 바꾸어 중간에 끊긴 파일이 남지 않게 저장"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class PronunciationCrawler:
+    """연결 풀, 요청 속도 제한, 재시도, 응답 캐시를 갖춘 발음 수집기"""
+
+    def __init__(self, base_url=BASE_URL, concurrency=4, rate=1.0, retries=3, backoff=1.0,
+                 timeout=10.0, cache=None, session=None):
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.cache = cache
+        self.bucket = TokenBucket(rate)
+        self.session = session if session is not None else pooled_session(concurrency)
+
+    def url(self, word):
+        return f'{self.base_url}?{urlencode({"word": word})}'
+
+    def fetch(self, word):
+        """단어 페이지 HTML을 캐시 또는 네트워크에서 가져오기
+
+        Raises:
+            requests.RequestException: 재시도를 모두 소진한 경우
+        """
+        import requests
+
+        url = self.url(word)
+        if self.cache is not None:
+            html = self.cache.get(url)
+            if html is not None:
+                instrumentation.incr('http.cache_hits')
+                return html
+
+        for attempt in range(self.retries + 1):
+            with instrumentation.timer('http.rate_limit_wait'):
+                self.bucket.acquire()
+            try:
+                instrumentation.incr('http.requests')
+                with instrumentation.timer('http.request'):
+                    response = self.session.get(url, timeout=self.timeout)
+                if response.status_code in RETRY_STATUS:
+                    raise requests.HTTPError(f'HTTP {response.status_code}', response=response)
+                response.raise_for_status()
+                break
+            except requests.RequestException as e:
+                status = e.response.status_code if e.response is not None else None
+                if attempt == self.retries or (status is not None and status not in RETRY_STATUS):
+                    instrumentation.incr('http.failures')
+                    raise
+                instrumentation.incr('http.retries')
+                time.sleep(retry_delay(attempt, self.backoff, e.response))
+
+        instrumentation.incr('http.bytes', len(response.content))
+        # 헤더에 charset이 없으면 response.text는 apparent_encoding으로 디코딩하므로, 캐시에서 읽을
+        # 때도 같은 결과가 나오도록 실제로 쓴 인코딩을 고정하여 기록
+        response.encoding = response.encoding or response.apparent_encoding
+        if self.cache is not None:
+            self.cache.put(url, response.content, response.encoding)
+        return response.text
+
+    def crawl_word(self, word):
+        """(발음, 오류 메시지) 반환 (실패하면 발음은 빈 문자열)
+
+        네트워크 오류뿐 아니라 파싱 오류 등도 단어별로 기록하여 한 단어 때문에 전체 수집이
+        중단되지 않게 합니다.
+        """
+        try:
+            return parse_pronunciation(self.fetch(word)), None
+        except Exception as e:
+            return '', str(e)
+
+    def crawl(self, words, progress=True):
+        """단어 목록의 (발음, 오류) 리스트를 입력 순서대로 반환"""
+        words = list(words)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            results = executor.map(self.crawl_word, words)
+            if progress:
+                from tqdm import tqdm
+
+                results = tqdm(results, total=len(words), desc="단어 발음 수집 중")
+            return list(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="aha-dic.com에서 영어 단어의 한글 발음 수집")
+    parser.add_argument('--input', default=INPUT_PATH)
+    parser.add_argument('--output', default=OUTPUT_PATH)
+    parser.add_argument('--base-url', default=BASE_URL)
+    parser.add_argument('--concurrency', type=int, default=4, help="동시 요청 수")
+    parser.add_argument('--rate', type=float, default=1.0, help="초당 최대 요청 수 (0이면 제한 없음)")
+    parser.add_argument('--retries', type=int, default=3, help="요청당 최대 재시도 횟수")
+    parser.add_argument('--backoff', type=float, default=1.0, help="재시도 대기 시간의 기준(초)")
+    parser.add_argument('--timeout', type=float, default=10.0, help="요청 타임아웃(초)")
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help="응답 캐시 디렉토리")
+    parser.add_argument('--no-cache', action='store_true', help="응답 캐시를 사용하지 않음")
+    parser.add_argument('--verbose', action='store_true', help="단어별 발음 출력")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+
+    with instrumentation.from_args(args), instrumentation.stage('crawl'):
+        run(args)
+
+
+def run(args):
+    import pandas as pd
+
+    df = pd.read_csv(args.input)
+
+    crawler = PronunciationCrawler(
+        base_url=args.base_url,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        retries=args.retries,
+        backoff=args.backoff,
+        timeout=args.timeout,
+        cache=None if args.no_cache else ResponseCache(args.cache_dir),
+    )
+    results = crawler.crawl(df['word'])
+
+    failures = []
+    for word, (pronunciation, error) in zip(df['word'], results):
+        if error is not None:
+            failures.append(word)
+            print(f"Error processing word {word}: {error}")
+        elif args.verbose:
+            if pronunciation:
+                print(f"단어: {word} -> 발음: {pronunciation}")
+            else:
+                print(f"단어: {word} -> 발음 정보 없음")
+
+    # 새로운 컬럼 추가
+    df['pronunciation'] = [pronunciation for pronunciation, _ in results]
 
-# 새로운 컬럼 추가
-df['pronunciation'] = pronunciations
+    # 새로운 CSV 파일로 저장
+    df.to_csv(args.output, index=False, encoding='utf-8-sig')
 
-# 새로운 CSV 파일로 저장
-df.to_csv('dict/kss_data.csv', index=False, encoding='utf-8-sig')
+    print(f"총 {len(df)}개 단어 중 {len(df) - len(failures)}개 수집 완료, {len(failures)}개 실패")
+    if failures:
+        print("실패한 단어 (다시 실행하면 캐시된 단어는 건너뛰고 이 단어들만 요청합니다):")
+        print(", ".join(map(str, failures)))
 
 
+if __name__ == "__main__":
+    main()
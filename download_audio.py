@@ -1,61 +1,244 @@
+"""
+CSV의 영어 단어 발음 오디오(mp3)를 내려받는 스크립트
+
+    python download_audio.py --workers 8
+
+하나의 연결 풀을 여러 스레드가 함께 사용하여 동시에 내려받고, 각 파일은 임시 파일에 스트리밍으로
+쓴 뒤 이름을 바꾸어 저장합니다. 결과(경로, 크기, SHA-256)는 입력 CSV를 수정하는 대신 오디오
+매니페스트 CSV에 기록하며, 매니페스트와 일치하는 파일과 서버에 없던(404) 단어는 다시 요청하지
+않습니다 (없던 단어도 다시 확인하려면 --retry-missing).
+"""
+
+import argparse
+import csv
+import hashlib
 import os
-import requests
-import pandas as pd
-from urllib.parse import urljoin
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from urllib.parse import urljoin
+
+import instrumentation
+from http_utils import RETRY_STATUS, pooled_session, retry_delay
+
+CSV_PATH = 'dict/kss_with_naive_mnemonics.csv'
+AUDIO_BASE_URL = 'https://ssl.gstatic.com/dictionary/static/pronunciation/2024-04-19/audio/'
+AUDIO_DIR = 'audio'
+MANIFEST_PATH = 'audio/manifest.csv'
+
+MANIFEST_COLUMNS = ['word', 'audio_path', 'status', 'size', 'sha256', 'url']
+
+# 매니페스트의 상태 값
+STATUS_OK = 'ok'
+STATUS_NOT_FOUND = 'not_found'
+STATUS_FAILED = 'failed'
+
+
+def audio_location(word, audio_dir=AUDIO_DIR):
+    """단어의 (상대 URL, 로컬 경로): 단어의 첫 두 글자 디렉토리 아래 <word>_en_us_1.mp3"""
+    first_two = word[:2].lower()
+    audio_filename = f"{word}_en_us_1.mp3"
+    return f"{first_two}/{audio_filename}", Path(audio_dir) / first_two / audio_filename
+
+
+def file_digest(path, chunk_size=1 << 16):
+    """파일의 (크기, SHA-256)"""
+    sha256 = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            sha256.update(chunk)
+            size += len(chunk)
+    return size, sha256.hexdigest()
+
+
+def load_manifest(path=MANIFEST_PATH):
+    """매니페스트 CSV를 {단어: 행} 딕셔너리로 읽기 (없으면 빈 딕셔너리)"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, newline='', encoding='utf-8') as f:
+        return {row['word']: row for row in csv.DictReader(f)}
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    """매니페스트를 임시 파일에 쓴 뒤 이름을 바꾸어 저장"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=MANIFEST_COLUMNS)
+        writer.writeheader()
+        for word in sorted(manifest):
+            writer.writerow({column: manifest[word].get(column, '') for column in MANIFEST_COLUMNS})
+    os.replace(tmp_path, path)
+
+
+class AudioDownloader:
+    """연결 풀, 재시도, 원자적 저장, 매니페스트 기반 건너뛰기를 갖춘 오디오 다운로더"""
+
+    def __init__(self, audio_base_url=AUDIO_BASE_URL, audio_dir=AUDIO_DIR, workers=8, retries=3,
+                 backoff=1.0, timeout=30.0, verify=False, retry_missing=False, session=None):
+        self.audio_base_url = audio_base_url
+        self.audio_dir = audio_dir
+        self.workers = workers
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.verify = verify
+        self.retry_missing = retry_missing
+        self.session = session if session is not None else pooled_session(workers)
+
+    def is_valid(self, entry, path):
+        """매니페스트 항목과 실제 파일이 일치하는지 (verify이면 해시까지 비교)"""
+        if entry is None or entry.get('status') != STATUS_OK or not path.exists():
+            return False
+        if path.stat().st_size != int(entry['size']):
+            return False
+        return not self.verify or file_digest(path)[1] == entry['sha256']
 
-def download_audio_and_update_csv(csv_path, audio_base_url):
-    """
-    CSV 파일의 단어들을 기반으로 오디오 파일을 다운로드하고 상대 경로를 업데이트합니다.
-    
-    Args:
-        csv_path (str): CSV 파일 경로
-        audio_base_url (str): 오디오 파일의 기본 URL
-    """
-    # CSV 파일 읽기
-    df = pd.read_csv(csv_path)
-    
-    # audio 디렉토리 생성
-    audio_dir = Path("audio")
-    audio_dir.mkdir(exist_ok=True)
-    
-    # 결과를 저장할 리스트
-    results = []
-    
-    for word in df['word']:
-        # 단어의 첫 두 글자로 디렉토리 생성
-        first_two = word[:2].lower()
-        sub_dir = audio_dir / first_two
-        sub_dir.mkdir(exist_ok=True)
-        
-        # 오디오 파일 URL 생성
-        audio_filename = f"{word}_en_us_1.mp3"
-        audio_url = urljoin(audio_base_url, f"{first_two}/{audio_filename}")
-        
-        # 파일 경로 설정
-        local_path = sub_dir / audio_filename
-        relative_path = str(local_path)
-        
+    def _stream_to_file(self, url, path):
+        """응답을 같은 디렉토리의 임시 파일에 스트리밍으로 쓴 뒤 이름을 바꾸어 저장"""
+        import requests
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f'.{path.name}.{threading.get_ident()}.part')
+        sha256 = hashlib.sha256()
+        size = 0
+        try:
+            instrumentation.incr('http.requests')
+            with instrumentation.timer('http.request'), \
+                    self.session.get(url, timeout=self.timeout, stream=True) as response:
+                if response.status_code in RETRY_STATUS:
+                    raise requests.HTTPError(f'HTTP {response.status_code}', response=response)
+                response.raise_for_status()
+                with open(tmp_path, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=1 << 16):
+                        f.write(chunk)
+                        sha256.update(chunk)
+                        size += len(chunk)
+            if size == 0:
+                raise requests.RequestException(f'빈 응답: {url}')
+            os.replace(tmp_path, path)
+            instrumentation.incr('http.bytes', size)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        return size, sha256.hexdigest()
+
+    def download(self, word, entry=None):
+        """한 단어의 오디오를 (필요하면) 내려받고 매니페스트 항목을 반환"""
+        import requests
+
+        relative_url, path = audio_location(word, self.audio_dir)
+        url = urljoin(self.audio_base_url, relative_url)
+        result = {'word': word, 'audio_path': str(path), 'url': url}
+
+        if self.is_valid(entry, path):
+            instrumentation.incr('audio.skipped')
+            return dict(entry, **result)
+
+        # 매니페스트에 없지만 이미 받아 둔 파일은 끝까지 온전한 mp3 프레임으로 이어질 때만 그대로 사용
+        # (예전 다운로더가 쓰다 만 파일이나 손상된 파일은 다시 받음)
+        if (entry is None or entry.get('status') != STATUS_OK) and path.exists() and path.stat().st_size > 0:
+            from audio_pack import is_complete_mp3
+
+            if is_complete_mp3(path.read_bytes()):
+                size, digest = file_digest(path)
+                instrumentation.incr('audio.adopted')
+                return dict(result, status=STATUS_OK, size=size, sha256=digest)
+            instrumentation.incr('audio.invalid')
+
+        # 서버에 없던(404) 단어는 retry_missing일 때만 다시 요청
+        if entry is not None and entry.get('status') == STATUS_NOT_FOUND and not self.retry_missing:
+            instrumentation.incr('audio.skipped')
+            return dict(entry, word=word, url=url)
+
+        for attempt in range(self.retries + 1):
+            try:
+                size, digest = self._stream_to_file(url, path)
+                return dict(result, status=STATUS_OK, size=size, sha256=digest)
+            except requests.RequestException as e:
+                status = e.response.status_code if e.response is not None else None
+                if status == 404:
+                    instrumentation.incr('audio.not_found')
+                    return dict(result, audio_path='', status=STATUS_NOT_FOUND, size='', sha256='')
+                if attempt == self.retries or (status is not None and status not in RETRY_STATUS):
+                    print(f"Error downloading {word}: {e}")
+                    instrumentation.incr('http.failures')
+                    return dict(result, audio_path='', status=STATUS_FAILED, size='', sha256='')
+                instrumentation.incr('http.retries')
+                time.sleep(retry_delay(attempt, self.backoff, e.response))
+
+    def download_all(self, words, manifest, manifest_path=MANIFEST_PATH, save_every=50):
+        """단어 목록을 병렬로 내려받고 매니페스트를 주기적으로 저장"""
+        from tqdm import tqdm
+
+        words = list(dict.fromkeys(words))
         try:
-            # 파일 다운로드
-            response = requests.get(audio_url)
-            if response.status_code == 200:
-                with open(local_path, 'wb') as f:
-                    f.write(response.content)
-                results.append(relative_path)
-            else:
-                results.append("DOWNLOAD_FAILED")
-        except Exception as e:
-            print(f"Error downloading {word}: {str(e)}")
-            results.append("DOWNLOAD_FAILED")
-    
-    # CSV에 결과 추가
-    df['audio_path'] = results
-    df.to_csv(csv_path, index=False)
-    print(f"Updated CSV saved to {csv_path}")
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                futures = {executor.submit(self.download, word, manifest.get(word)): word for word in words}
+                for done, future in enumerate(tqdm(as_completed(futures), total=len(futures), desc="오디오 다운로드 중"), 1):
+                    try:
+                        entry = future.result()
+                    except Exception as e:
+                        # 요청 외의 오류(디스크 쓰기 실패 등)도 그 단어만 실패로 기록하고 계속 진행
+                        word = futures[future]
+                        print(f"Error downloading {word}: {e!r}")
+                        instrumentation.incr('audio.errors')
+                        relative_url, _ = audio_location(word, self.audio_dir)
+                        entry = {'word': word, 'audio_path': '', 'status': STATUS_FAILED, 'size': '', 'sha256': '',
+                                 'url': urljoin(self.audio_base_url, relative_url)}
+                    manifest[entry['word']] = entry
+                    if done % save_every == 0:
+                        save_manifest(manifest, manifest_path)
+        finally:
+            # 중단(KeyboardInterrupt 등)되더라도 그때까지의 결과는 저장
+            save_manifest(manifest, manifest_path)
+        return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="단어 발음 오디오 다운로드")
+    parser.add_argument('--csv', default=CSV_PATH, help="word 컬럼이 있는 입력 CSV (수정하지 않음)")
+    parser.add_argument('--base-url', default=AUDIO_BASE_URL)
+    parser.add_argument('--audio-dir', default=AUDIO_DIR)
+    parser.add_argument('--manifest', default=MANIFEST_PATH, help="결과를 기록할 오디오 매니페스트 CSV")
+    parser.add_argument('--workers', type=int, default=8, help="동시 다운로드 수")
+    parser.add_argument('--retries', type=int, default=3, help="파일당 최대 재시도 횟수")
+    parser.add_argument('--backoff', type=float, default=1.0, help="재시도 대기 시간의 기준(초)")
+    parser.add_argument('--timeout', type=float, default=30.0, help="요청 타임아웃(초)")
+    parser.add_argument('--verify', action='store_true', help="기존 파일의 SHA-256까지 다시 확인")
+    parser.add_argument('--retry-missing', action='store_true', help="매니페스트에 없음(404)으로 기록된 단어도 다시 요청")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+
+    with instrumentation.from_args(args), instrumentation.stage('download'):
+        run(args)
+
+
+def run(args):
+    import pandas as pd
+
+    df = pd.read_csv(args.csv)
+    manifest = load_manifest(args.manifest)
+
+    downloader = AudioDownloader(
+        audio_base_url=args.base_url,
+        audio_dir=args.audio_dir,
+        workers=args.workers,
+        retries=args.retries,
+        backoff=args.backoff,
+        timeout=args.timeout,
+        verify=args.verify,
+        retry_missing=args.retry_missing,
+    )
+    manifest = downloader.download_all(df['word'], manifest, args.manifest)
+
+    statuses = [manifest[word]['status'] for word in dict.fromkeys(df['word'])]
+    print(f"매니페스트 저장: {args.manifest} "
+          f"(성공 {statuses.count(STATUS_OK)}, 없음 {statuses.count(STATUS_NOT_FOUND)}, "
+          f"실패 {statuses.count(STATUS_FAILED)})")
+
 
 if __name__ == "__main__":
-    # 사용 예시
-    csv_path = "dict/kss_with_naive_mnemonics.csv"
-    audio_base_url = "https://ssl.gstatic.com/dictionary/static/pronunciation/2024-04-19/audio/"
-    download_audio_and_update_csv(csv_path, audio_base_url) 
\ No newline at end of file
+    main()
@@ -0,0 +1,60 @@
+"""
+수집 스크립트들이 함께 쓰는 HTTP 유틸리티
+
+연결 풀을 갖춘 requests.Session, 초당 요청 수 제한용 토큰 버킷, 재시도 대기 시간 계산을
+제공합니다.
+"""
+
+import random
+import threading
+import time
+
+# 재시도할 HTTP 상태 코드
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+def pooled_session(pool_size):
+    """동시에 pool_size개의 연결을 재사용하는 requests.Session"""
+    import requests
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def retry_delay(attempt, backoff, response=None):
+    """지수 백오프 + 지터 (429/503의 Retry-After 헤더가 있으면 우선)"""
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after is not None:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+    return backoff * (2 ** attempt) * (1 + random.random())
+
+
+class TokenBucket:
+    """초당 rate개의 요청을 허용하는 스레드 안전 토큰 버킷 (rate <= 0이면 제한 없음)"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
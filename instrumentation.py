@@ -0,0 +1,280 @@
+"""
+파이프라인 공통 계측 모듈 (카운터, 타이머, 단계별 요약)
+
+    import instrumentation
+
+    instrumentation.incr('dp_cells', 120)
+    with instrumentation.timer('http.request'):
+        ...
+    with instrumentation.stage('mapping'):
+        ...
+
+꺼져 있을 때(기본값)는 incr/observe가 바로 반환하고 timer/stage는 공유하는 빈 컨텍스트를 돌려주므로
+비용이 거의 없습니다. 스크립트에서는 add_arguments/from_args로 --instrument 옵션을 붙이면
+실행이 끝날 때 단계별 카운터, 타이머 요약(선택적으로 cProfile 상위 함수, tracemalloc 최대
+메모리와 상위 할당 위치)을 JSON 파일로 저장합니다.
+
+카운터와 타이머는 기록 시점의 단계(stage)에 속합니다. 단계는 프로세스 전체에서 하나이므로
+스레드 풀의 작업도 현재 단계에 기록되지만, 다른 프로세스(multiprocessing 작업자)의 기록은
+모이지 않습니다.
+
+cProfile, pstats, tracemalloc은 --profile/--trace-memory를 켰을 때만 불러오므로 이 모듈을
+import하는 비용은 작습니다.
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+
+# 계측이 켜져 있는지 (핫 루프에서는 함수 호출 전에 이 값을 직접 확인)
+ENABLED = False
+
+DEFAULT_STAGE = 'main'
+
+_NULL_CONTEXT = contextlib.nullcontext()
+
+
+class _StageStats:
+    def __init__(self):
+        self.counters = {}
+        self.timers = {}
+        self.wall_seconds = 0.0
+        self.entries = 0
+        self.profile = None
+        self.memory = None
+
+
+class Registry:
+    """단계별 카운터와 타이머를 모으는 스레드 안전 저장소"""
+
+    def __init__(self, profile=False, trace_memory=False, profile_limit=30):
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.profile_limit = profile_limit
+        self.stages = {}
+        self.current = DEFAULT_STAGE
+        self.depth = 0
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def _stage(self, name):
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = _StageStats()
+        return stats
+
+    def incr(self, name, value=1):
+        with self._lock:
+            counters = self._stage(self.current).counters
+            counters[name] = counters.get(name, 0) + value
+
+    def observe(self, name, seconds):
+        with self._lock:
+            timers = self._stage(self.current).timers
+            count, total, maximum = timers.get(name, (0, 0.0, 0.0))
+            timers[name] = (count + 1, total + seconds, max(maximum, seconds))
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """name 단계에서 실행 (끝나면 이전 단계로 돌아감)
+
+        cProfile과 tracemalloc은 가장 바깥 단계에서만 사용하며, 안쪽 단계의 결과는 바깥
+        단계의 결과에 포함됩니다.
+        """
+        previous = self.current
+        self.current = name
+        outermost = self.depth == 0
+        self.depth += 1
+        profiler = None
+        if self.profile and outermost:
+            import cProfile
+
+            profiler = cProfile.Profile()
+        memory = self.trace_memory and outermost
+        tracing = False
+        if memory:
+            import tracemalloc
+
+            tracing = not tracemalloc.is_tracing()
+            if tracing:
+                tracemalloc.start()
+            else:
+                tracemalloc.reset_peak()
+        if profiler is not None:
+            profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if profiler is not None:
+                profiler.disable()
+            with self._lock:
+                stats = self._stage(name)
+                stats.wall_seconds += elapsed
+                stats.entries += 1
+                if profiler is not None:
+                    stats.profile = _profile_summary(profiler, self.profile_limit)
+                if memory:
+                    stats.memory = _memory_summary()
+                self.current = previous
+                self.depth -= 1
+            if tracing:
+                tracemalloc.stop()
+
+    def summary(self):
+        """JSON으로 저장할 수 있는 단계별 요약"""
+        with self._lock:
+            stages = {}
+            for name, stats in self.stages.items():
+                stage = {
+                    'wall_seconds': stats.wall_seconds,
+                    'entries': stats.entries,
+                    'counters': dict(stats.counters),
+                    'timers': {
+                        timer: {
+                            'count': count,
+                            'total_seconds': total,
+                            'mean_ms': total / count * 1000,
+                            'max_ms': maximum * 1000,
+                        }
+                        for timer, (count, total, maximum) in stats.timers.items()
+                    },
+                }
+                if stats.profile is not None:
+                    stage['profile'] = stats.profile
+                if stats.memory is not None:
+                    stage['memory'] = stats.memory
+                stages[name] = stage
+        return {
+            'pid': os.getpid(),
+            'wall_seconds': time.perf_counter() - self.started,
+            'stages': stages,
+        }
+
+
+def _profile_summary(profiler, limit):
+    """누적 시간 상위 limit개 함수"""
+    import pstats
+
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, function), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            'function': f'{os.path.basename(filename)}:{line}({function})',
+            'ncalls': ncalls,
+            'tottime': tottime,
+            'cumtime': cumtime,
+        })
+    rows.sort(key=lambda row: -row['cumtime'])
+    return rows[:limit]
+
+
+def _memory_summary(limit=10):
+    """tracemalloc 최대 메모리와 현재 할당량 상위 위치"""
+    import tracemalloc
+
+    current, peak = tracemalloc.get_traced_memory()
+    top = tracemalloc.take_snapshot().statistics('lineno')[:limit]
+    return {
+        'current_mb': current / 2 ** 20,
+        'peak_mb': peak / 2 ** 20,
+        'top': [
+            {'location': str(stat.traceback[0]), 'size_kb': stat.size / 1024, 'count': stat.count}
+            for stat in top
+        ],
+    }
+
+
+_registry = None
+
+
+def enable(profile=False, trace_memory=False):
+    """계측을 켜고 새 저장소를 반환"""
+    global ENABLED, _registry
+    _registry = Registry(profile=profile, trace_memory=trace_memory)
+    ENABLED = True
+    return _registry
+
+
+def disable():
+    global ENABLED
+    ENABLED = False
+
+
+def incr(name, value=1):
+    """현재 단계의 카운터 증가"""
+    if ENABLED:
+        _registry.incr(name, value)
+
+
+def observe(name, seconds):
+    """현재 단계의 타이머에 소요 시간 기록"""
+    if ENABLED:
+        _registry.observe(name, seconds)
+
+
+class _Timer:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _registry.observe(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def timer(name):
+    """with 블록의 소요 시간을 현재 단계의 타이머에 기록"""
+    if not ENABLED:
+        return _NULL_CONTEXT
+    return _Timer(name)
+
+
+def stage(name):
+    """with 블록을 name 단계로 기록 (꺼져 있으면 아무것도 하지 않음)"""
+    if not ENABLED:
+        return _NULL_CONTEXT
+    return _registry.stage(name)
+
+
+def summary():
+    return _registry.summary() if _registry is not None else None
+
+
+def dump(path):
+    """단계별 요약을 JSON으로 저장"""
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(summary(), f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def add_arguments(parser):
+    """--instrument, --profile, --trace-memory 옵션 추가"""
+    parser.add_argument('--instrument', metavar='PATH', help="계측 결과(단계별 카운터/타이머)를 저장할 JSON 파일")
+    parser.add_argument('--profile', action='store_true', help="--instrument와 함께 단계별 cProfile 상위 함수 기록")
+    parser.add_argument('--trace-memory', action='store_true', help="--instrument와 함께 단계별 tracemalloc 결과 기록")
+
+
+@contextlib.contextmanager
+def from_args(args):
+    """args.instrument가 있으면 with 블록 동안 계측을 켜고 끝나면 결과를 저장"""
+    if not getattr(args, 'instrument', None):
+        yield
+        return
+
+    enable(profile=args.profile, trace_memory=args.trace_memory)
+    try:
+        yield
+    finally:
+        dump(args.instrument)
+        disable()
+        print(f"계측 결과 저장: {args.instrument}")
@@ -0,0 +1,431 @@
+"""
+영어 단어의 IPA(또는 사전식 발음 표기)를 한글 발음으로 바꾸는 규칙 기반 변환기
+
+aha-dic 크롤링(crawl_korean_pronunciation.py) 없이 이미 가지고 있는 IPA 컬럼에서 바로 한글
+발음을 만듭니다. 크롤링 결과와 같은 방식으로 1차 강세 음절을 <>로 감쌉니다.
+
+    >>> transliterate('ˈfelən')
+    '<펠>런'
+    >>> transliterate('dəˈmäliSH')
+    '디<말>리쉬'
+    >>> [transliterate(ipa) for ipa in ('m', 'n', 'nt', 'mz', 'ˈmpaʊ')]
+    ['므', '느', '느트', '므즈', '므<파>우']
+
+    python ipa_hangul_transliterator.py convert --column naver_ipa
+    python ipa_hangul_transliterator.py validate --golden dict/kss_data.csv
+
+변환 규칙은 국립국어원 외래어 표기법(영어)을 따르되, 크롤링한 발음에 맞추어 어말의 [ʃ]는
+'쉬'로, [ə]/[ʌ]/[ɜ]는 '어'로 적습니다. 입력 표기는 두 가지를 받습니다.
+
+    ipa         IPA (네이버 사전의 |, │ 강세 표시와 é 같은 강세 부호, 괄호 생략 표시 포함)
+    respelling  구글/옥스퍼드 사전식 표기 (ä, ē, ō, SH, ZH, j=[dʒ], y=[j] 등)
+"""
+
+import argparse
+import re
+import time
+import unicodedata
+
+from korean_phonetic_levenshtein import _to_text
+
+KSS_PATH = 'dict/kss_with_naive_mnemonics.csv'
+GOLDEN_PATH = 'dict/kss_data.csv'
+OUTPUT_PATH = 'dict/kss_data_transliterated.csv'
+
+CHOSUNG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+JUNGSUNG = 'ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ'
+JONGSUNG = ' ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ'
+
+PRIMARY = 'ˈ'
+SECONDARY = 'ˌ'
+
+# 단모음 (ː가 붙으면 장모음으로 봄)
+VOWELS = {
+    'i': 'ㅣ', 'ɪ': 'ㅣ', 'e': 'ㅔ', 'ɛ': 'ㅔ', 'æ': 'ㅐ', 'a': 'ㅏ', 'ɑ': 'ㅏ', 'ɒ': 'ㅗ', 'ɔ': 'ㅗ',
+    'o': 'ㅗ', 'ʌ': 'ㅓ', 'ə': 'ㅓ', 'ɜ': 'ㅓ', 'ɐ': 'ㅓ', 'u': 'ㅜ', 'ʊ': 'ㅜ', 'ɨ': 'ㅣ', 'y': 'ㅟ',
+}
+
+# 이중모음 (두 번째 모음은 'ㅇ' 음절로 따로 적음)
+DIPHTHONGS = {
+    'aɪ': 'ㅏㅣ', 'aʊ': 'ㅏㅜ', 'eɪ': 'ㅔㅣ', 'ɔɪ': 'ㅗㅣ', 'oʊ': 'ㅗ', 'əʊ': 'ㅗ',
+    'ɪə': 'ㅣㅓ', 'eə': 'ㅔㅓ', 'ɛə': 'ㅔㅓ', 'ʊə': 'ㅜㅓ',
+}
+
+# 받침 규칙에서 짧은 모음으로 보는 모음 (외래어 표기법 제3항의 "짧은 모음")
+SHORT_VOWELS = set('ɪeɛæʌəɒʊɐɑɔao')
+
+# 모음 앞 자음의 초성
+ONSETS = {
+    'p': 'ㅍ', 'b': 'ㅂ', 't': 'ㅌ', 'd': 'ㄷ', 'k': 'ㅋ', 'g': 'ㄱ', 'f': 'ㅍ', 'v': 'ㅂ', 'θ': 'ㅅ',
+    'ð': 'ㄷ', 's': 'ㅅ', 'z': 'ㅈ', 'ʃ': 'ㅅ', 'ʒ': 'ㅈ', 'tʃ': 'ㅊ', 'dʒ': 'ㅈ', 'm': 'ㅁ', 'n': 'ㄴ',
+    'ŋ': 'ㅇ', 'l': 'ㄹ', 'r': 'ㄹ', 'h': 'ㅎ', 'x': 'ㅎ',
+}
+CONSONANTS = set(ONSETS) | {'j', 'w'}
+
+# 짧은 모음 뒤 어말 또는 자음 앞의 무성 파열음은 받침으로 적음
+STOP_CODAS = {'p': 'ㅂ', 't': 'ㅅ', 'k': 'ㄱ'}
+NASAL_CODAS = {'m': 'ㅁ', 'n': 'ㄴ', 'ŋ': 'ㅇ'}
+
+# 성절 자음([l], [n]) 앞에서 'ㅡ' 대신 '어'를 넣는 자음 (나머지는 bl 블, tn 튼)
+SCHWA_SYLLABIC = {('n', 'l'), ('s', 'n'), ('z', 'n'), ('ʃ', 'n'), ('ʃ', 'l'), ('ʒ', 'n'), ('ʒ', 'l')}
+
+# 자음 뒤에 붙이는 모음 (기본은 'ㅡ')
+EPENTHETIC = {'ʒ': 'ㅣ', 'tʃ': 'ㅣ', 'dʒ': 'ㅣ'}
+
+# [j], [w]와 결합한 모음
+J_VOWELS = {'ㅏ': 'ㅑ', 'ㅐ': 'ㅒ', 'ㅔ': 'ㅖ', 'ㅗ': 'ㅛ', 'ㅜ': 'ㅠ', 'ㅓ': 'ㅕ', 'ㅣ': 'ㅣ', 'ㅟ': 'ㅟ'}
+W_VOWELS = {'ㅏ': 'ㅘ', 'ㅐ': 'ㅙ', 'ㅔ': 'ㅞ', 'ㅣ': 'ㅟ', 'ㅓ': 'ㅝ', 'ㅗ': 'ㅝ', 'ㅜ': 'ㅜ', 'ㅟ': 'ㅟ'}
+
+# IPA 변형 기호와 합자를 기본 기호로 통일
+IPA_REPLACEMENTS = {
+    'ʧ': 'tʃ', 'ʤ': 'dʒ', 'ʦ': 'ts', 'ʣ': 'dz', 'ɝ': 'ɜr', 'ɚ': 'ər', 'ɫ': 'l', 'ɹ': 'r', 'ɾ': 't',
+    'ɡ': 'g', 'c': 'k', 'q': 'k', ':': 'ː', '|': PRIMARY, "'": PRIMARY, ',': SECONDARY,
+}
+
+# 구글/옥스퍼드 사전식 표기 -> IPA (긴 것부터 치환)
+RESPELLING = {
+    'o͞o': 'u', 'o͝o': 'ʊ', 'T͟H': 'ð', 'SH': 'ʃ', 'ZH': 'ʒ', 'CH': 'tʃ', 'TH': 'θ', 'NG': 'ŋ', 'KH': 'x',
+    'ä': 'ɑ', 'ā': 'eɪ', 'ē': 'i', 'ī': 'aɪ', 'ō': 'oʊ', 'ô': 'ɔ', 'ou': 'aʊ', 'oi': 'ɔɪ',
+    'j': 'dʒ', 'y': 'j', 'a': 'æ', 'e': 'ɛ', 'i': 'ɪ', 'o': 'ɑ',
+}
+_RESPELLING_RE = re.compile('|'.join(map(re.escape, sorted(RESPELLING, key=len, reverse=True))))
+
+# 이 문자가 있으면 사전식 표기로 판단 (notation='auto')
+_RESPELLING_HINT = re.compile('[äāēīōôyA-Z]|o͞o|o͝o')
+
+_TOKENS = sorted(list(DIPHTHONGS) + list(VOWELS) + list(CONSONANTS), key=len, reverse=True)
+
+
+def detect_notation(text):
+    """'respelling' (사전식 표기) 또는 'ipa'"""
+    return 'respelling' if _RESPELLING_HINT.search(text) else 'ipa'
+
+
+def normalize_ipa(text, notation='auto'):
+    """발음 표기를 이 모듈의 기본 IPA 기호와 강세 기호(ˈ, ˌ)만 쓰는 문자열로 변환
+
+    여러 발음이 ; , / 로 나뉘어 있으면 첫 번째만 사용하고, 괄호로 표시된 생략 가능한 소리는
+    괄호만 지웁니다. 네이버 표기에서 |와 │가 함께 쓰이면 │가 1차, |가 2차 강세입니다.
+    """
+    text = _to_text(text).strip()
+    text = next((part for part in re.split(r'[;/]|,\s', text) if part.strip()), '')
+    if notation == 'auto':
+        notation = detect_notation(text)
+    if notation == 'respelling':
+        text = _RESPELLING_RE.sub(lambda m: RESPELLING[m.group()], text)
+        # 강세 바로 앞의 re-, de- 같은 열린 첫 음절의 [ə]는 IPA 표기처럼 [ɪ]로 (dəˈmäliSH 디말리쉬)
+        text = re.sub(f'^([bdklmnprstv])ə(?={PRIMARY})', r'\1ɪ', text)
+
+    if '│' in text:
+        text = text.replace('|', SECONDARY).replace('│', PRIMARY)
+    # 성절 [l] 앞의 생략 가능한 (ə)는 지우고 (b(ə)l -> bl), 나머지 괄호는 괄호만 지움
+    text = text.replace('(ə)l', 'l').replace('(', '').replace(')', '')
+    # 어말 -ism([ɪzəm])은 '이즘'으로
+    text = re.sub('zəm$', 'zm', text)
+
+    # é, è 처럼 강세 부호가 붙은 모음은 모음 앞에 강세 기호를 둠
+    chars = []
+    for char in unicodedata.normalize('NFD', text):
+        if char == '́' and chars:
+            chars.insert(len(chars) - 1, PRIMARY)
+        elif char == '̀' and chars:
+            chars.insert(len(chars) - 1, SECONDARY)
+        elif not unicodedata.combining(char):
+            chars.append(char)
+    text = unicodedata.normalize('NFC', ''.join(chars))
+
+    for old, new in IPA_REPLACEMENTS.items():
+        text = text.replace(old, new)
+    return text.lower() if notation == 'ipa' else text
+
+
+def tokenize(text):
+    """기본 IPA 문자열을 (기호, 장음 여부, 강세) 토큰 리스트로 분리
+
+    강세 기호는 바로 다음 모음의 강세(1차 1, 2차 2)가 되며, 모르는 기호는 건너뜁니다.
+
+    >>> tokenize('ˈmeɪhem')
+    [('m', False, 0), ('eɪ', False, 1), ('h', False, 0), ('e', False, 0), ('m', False, 0)]
+    """
+    tokens = []
+    stress = 0
+    i = 0
+    while i < len(text):
+        if text[i] in (PRIMARY, SECONDARY):
+            stress = 1 if text[i] == PRIMARY else stress or 2
+            i += 1
+            continue
+        symbol = next((token for token in _TOKENS if text.startswith(token, i)), None)
+        if symbol is None:
+            i += 1
+            continue
+        i += len(symbol)
+        long = text.startswith('ː', i)
+        if long:
+            i += 1
+        if symbol in CONSONANTS:
+            tokens.append((symbol, False, 0))
+        else:
+            tokens.append((symbol, long, stress))
+            stress = 0
+    return tokens
+
+
+def _is_vowel(token):
+    return token is not None and token[0] not in CONSONANTS
+
+
+def _is_syllabic(tokens, i):
+    """tokens[i]가 자음 뒤, 모음 앞이 아닌 곳의 [l], [n] (성절 자음)인지"""
+    return (tokens[i][0] in ('l', 'n') and i > 0 and tokens[i - 1][0] in CONSONANTS
+            and not (i + 1 < len(tokens) and _is_vowel(tokens[i + 1])))
+
+
+def reduce_vowels(tokens):
+    """강세 없는 가운데 음절의 [ɪ]를 [ə]로 (미국식 발음처럼 detriment 데트러먼트)
+
+    성절 [l], [n]도 음절로 세므로 reticent([ˈretɪsnt])의 [ɪ]도 가운데 음절입니다.
+    """
+    nuclei = [i for i, token in enumerate(tokens) if _is_vowel(token) or _is_syllabic(tokens, i)]
+    reduced = list(tokens)
+    for i in nuclei[1:-1]:
+        symbol, long, stress = tokens[i]
+        if symbol == 'ɪ' and not long and not stress:
+            reduced[i] = ('ə', long, stress)
+    return reduced
+
+
+class _Syllable:
+    __slots__ = ('cho', 'jung', 'jong', 'stressed', 'short', 'epenthetic')
+
+    def __init__(self, cho, jung, stressed=False, short=False, epenthetic=False):
+        self.cho = cho
+        self.jung = jung
+        self.jong = None
+        self.stressed = stressed
+        self.short = short
+        self.epenthetic = epenthetic
+
+    def __str__(self):
+        return chr(0xAC00 + (CHOSUNG.index(self.cho) * 21 + JUNGSUNG.index(self.jung)) * 28
+                   + JONGSUNG.index(self.jong or ' '))
+
+
+class _SyllableBuilder:
+    """토큰을 앞에서부터 읽어 한글 음절 리스트를 만드는 클래스"""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.syllables = []
+
+    def token(self, i):
+        return self.tokens[i] if 0 <= i < len(self.tokens) else None
+
+    def free_coda(self):
+        """받침을 붙일 수 있는 앞 음절 (없으면 None)"""
+        if self.syllables and self.syllables[-1].jong is None:
+            return self.syllables[-1]
+        return None
+
+    def add_vowel(self, cho, glide, vowel):
+        symbol, long, stress = vowel
+        parts = DIPHTHONGS.get(symbol) or VOWELS[symbol]
+        jung = parts[0]
+        if glide == 'j' and cho not in ('ㅈ', 'ㅊ'):
+            jung = J_VOWELS.get(jung, jung)
+        elif glide == 'w':
+            jung = W_VOWELS.get(jung, jung)
+        short = symbol in SHORT_VOWELS and not long
+        self.syllables.append(_Syllable(cho, jung, stressed=stress == 1, short=short))
+        for part in parts[1:]:
+            self.syllables.append(_Syllable('ㅇ', part))
+
+    def add_onset(self, consonant, glide, vowel):
+        if consonant == 'ŋ':
+            # 모음 앞의 [ŋ]은 앞 음절 받침 'ㅇ'과 초성 'ㅇ'으로 (singer 싱어)
+            previous = self.free_coda()
+            if previous is not None:
+                previous.jong = 'ㅇ'
+        elif consonant == 'l':
+            # 모음 앞의 [l]은 'ㄹㄹ'로 (slide 슬라이드, film 필름)
+            previous = self.free_coda()
+            if previous is not None:
+                previous.jong = 'ㄹ'
+        if consonant == 'ʃ' and glide is None:
+            glide = 'j'
+        self.add_vowel(ONSETS[consonant], glide, vowel)
+
+    def add_coda(self, consonant, i):
+        """모음이 뒤따르지 않는 자음 (받침 또는 '으' 음절로)"""
+        following = self.token(i + 1)
+        previous = self.free_coda()
+        if consonant in ('r', 'h'):
+            # 모음 뒤의 [r]과 모음 앞이 아닌 [h]는 적지 않음
+            return
+        if consonant in NASAL_CODAS or consonant == 'l':
+            if consonant in ('m', 'n') and previous is None and i > 0 and self.tokens[i - 1][0] == 'l':
+                # 모음 없이 [l] 뒤에 오는 비음은 'ㄹ' 초성 음절의 받침으로 (film 필름)
+                syllable = _Syllable('ㄹ', 'ㅡ', epenthetic=True)
+                syllable.jong = NASAL_CODAS[consonant]
+                self.syllables.append(syllable)
+                return
+            if previous is not None:
+                previous.jong = NASAL_CODAS.get(consonant, 'ㄹ')
+                return
+        elif consonant in STOP_CODAS:
+            if (previous is not None and previous.short and not previous.epenthetic
+                    and (following is None or following[0] not in ('l', 'r', 'm', 'n', 'j', 'w'))):
+                previous.jong = STOP_CODAS[consonant]
+                return
+        elif consonant == 'ʃ':
+            self.syllables.append(_Syllable('ㅅ', 'ㅟ' if following is None else 'ㅠ', epenthetic=True))
+            return
+        elif consonant in ('j', 'w'):
+            self.syllables.append(_Syllable('ㅇ', 'ㅣ' if consonant == 'j' else 'ㅜ', epenthetic=True))
+            return
+        self.syllables.append(_Syllable(ONSETS[consonant], EPENTHETIC.get(consonant, 'ㅡ'), epenthetic=True))
+
+    def build(self):
+        i = 0
+        while i < len(self.tokens):
+            symbol = self.tokens[i][0]
+            following = self.token(i + 1)
+            if symbol not in CONSONANTS:
+                self.add_vowel('ㅇ', None, self.tokens[i])
+                i += 1
+            elif _is_vowel(following):
+                if symbol in ('j', 'w'):
+                    self.add_vowel('ㅇ', symbol, following)
+                else:
+                    self.add_onset(symbol, None, following)
+                i += 2
+            elif following is not None and (symbol, following[0]) in SCHWA_SYLLABIC and _is_syllabic(self.tokens, i + 1):
+                # 성절 자음 앞에서는 '어'를 넣음 (-tion 션, channel 채널)
+                self.add_onset(symbol, None, ('ə', False, 0))
+                i += 1
+            elif (following is not None and following[0] in ('j', 'w') and _is_vowel(self.token(i + 2))
+                  and symbol not in ('j', 'w', 'r', 'h')
+                  and (following[0] == 'j' or symbol in ('k', 'g'))):
+                # [kw], [gw]와 자음 뒤 [j]는 한 음절로 (quarter 쿼터, cube 큐브)
+                self.add_onset(symbol, following[0], self.token(i + 2))
+                i += 3
+            else:
+                self.add_coda(symbol, i)
+                i += 1
+        return self.syllables
+
+
+def transliterate_word(text, notation='auto', accents=True):
+    """공백 없는 한 단어의 발음 표기를 한글로 변환 (accents면 1차 강세 음절을 <>로 감쌈)"""
+    syllables = _SyllableBuilder(reduce_vowels(tokenize(normalize_ipa(text, notation)))).build()
+    result = []
+    opened = False
+    for syllable in syllables:
+        stressed = accents and syllable.stressed
+        if stressed and not opened:
+            result.append('<')
+        elif opened and not stressed:
+            result.append('>')
+        opened = stressed
+        result.append(str(syllable))
+    if opened:
+        result.append('>')
+    return ''.join(result)
+
+
+def transliterate(text, notation='auto', accents=True):
+    """발음 표기를 한글 발음으로 변환 (공백으로 나뉜 단어는 각각 변환하여 공백으로 연결)
+
+    text가 문자열이 아니거나(NaN) 비어 있으면 빈 문자열을 반환합니다.
+    """
+    return ' '.join(transliterate_word(word, notation, accents) for word in _to_text(text).split())
+
+
+def transliterate_many(texts, notation='auto', accents=True):
+    return [transliterate(text, notation, accents) for text in texts]
+
+
+def strip_accents(pronunciation):
+    """크롤링 발음의 강세 표시(<>) 제거"""
+    return _to_text(pronunciation).replace('<', '').replace('>', '')
+
+
+def validate(golden, ipas, notation='auto'):
+    """크롤링한 발음(golden)과 변환 결과를 비교한 (지표 딕셔너리, 행별 결과 리스트)
+
+    지표는 강세 표시까지 같은 비율, 강세 표시를 빼고 같은 비율, 강세 표시를 뺀 발음의
+    KoreanPhoneticSimilarity 평균 유사도입니다. 발음이 비어 있는 행은 제외합니다.
+    """
+    from korean_phonetic_levenshtein import KoreanPhoneticSimilarity
+
+    kps = KoreanPhoneticSimilarity()
+    rows = []
+    for expected, ipa in zip(golden, ipas):
+        expected = _to_text(expected)
+        if not expected or not _to_text(ipa):
+            continue
+        predicted = transliterate(ipa, notation)
+        rows.append({
+            'ipa': ipa,
+            'expected': expected,
+            'predicted': predicted,
+            'exact': predicted == expected,
+            'unaccented': strip_accents(predicted) == strip_accents(expected),
+            'similarity': kps.weighted_levenshtein(strip_accents(predicted), strip_accents(expected)),
+        })
+    count = max(len(rows), 1)
+    metrics = {
+        'rows': len(rows),
+        'exact': sum(row['exact'] for row in rows) / count,
+        'unaccented': sum(row['unaccented'] for row in rows) / count,
+        'similarity': sum(row['similarity'] for row in rows) / count,
+    }
+    return metrics, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IPA/사전식 발음 표기 -> 한글 발음 변환")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    convert_parser = subparsers.add_parser('convert', help="CSV의 발음 표기 컬럼을 한글 발음 컬럼으로 변환")
+    convert_parser.add_argument('--input', default=KSS_PATH)
+    convert_parser.add_argument('--output', default=OUTPUT_PATH)
+    convert_parser.add_argument('--column', nargs='+', default=['naver_ipa', 'google_ipa'],
+                                help="변환할 컬럼 (앞 컬럼이 비어 있으면 다음 컬럼 사용)")
+    convert_parser.add_argument('--target', default='pronunciation', help="한글 발음을 저장할 컬럼")
+
+    validate_parser = subparsers.add_parser('validate', help="크롤링한 발음과 비교")
+    validate_parser.add_argument('--golden', default=GOLDEN_PATH, help="크롤링 결과 CSV (pronunciation 컬럼)")
+    validate_parser.add_argument('--column', nargs='+', default=['naver_ipa', 'google_ipa'])
+    validate_parser.add_argument('--show', type=int, default=10, help="출력할 불일치 행 수 (유사도 낮은 순)")
+
+    for sub in (convert_parser, validate_parser):
+        sub.add_argument('--notation', choices=['auto', 'ipa', 'respelling'], default='auto')
+    args = parser.parse_args()
+
+    import pandas as pd
+
+    if args.command == 'validate':
+        df = pd.read_csv(args.golden)
+        for column in args.column:
+            metrics, rows = validate(df['pronunciation'], df[column], args.notation)
+            print(f"{column}: {metrics['rows']}개 행, 강세 포함 일치 {metrics['exact']:.1%}, "
+                  f"강세 제외 일치 {metrics['unaccented']:.1%}, 평균 유사도 {metrics['similarity']:.3f}")
+            for row in sorted(rows, key=lambda row: row['similarity'])[:args.show]:
+                if not row['exact']:
+                    print(f"  {row['ipa']:<20} {row['expected']:<16} {row['predicted']:<16} {row['similarity']:.3f}")
+        return
+
+    df = pd.read_csv(args.input)
+    start = time.perf_counter()
+    source = df[args.column[0]]
+    for column in args.column[1:]:
+        source = source.where(source.notna() & (source.astype(str).str.strip() != ''), df[column])
+    df[args.target] = transliterate_many(source, args.notation)
+    elapsed = time.perf_counter() - start
+    df.to_csv(args.output, index=False, encoding='utf-8-sig')
+    print(f"{len(df)}개 단어 변환 ({len(df) / max(elapsed, 1e-9):.0f}개/초) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+영어 단어의 IPA를 강세 기호로 나눈 조각마다 IPA가 비슷한 한국어 단어를 찾는 모듈
+
+test/test-0412.ipynb의 프로토타입(split_ipa, phoneme_groups, get_top_matches_with_constraint)을
+옮긴 것입니다. 프로토타입은 조각마다 한국어 사전 전체를 복사하고 apply를 두 번 돌린 뒤 전체를
+정렬했지만, 여기서는 사전을 한 번 토큰화하여 첫 음소 클래스별로 묶어 두고, 모든 영어 단어의
+조각을 모아 같은 클래스/길이끼리 한꺼번에 레벤슈타인 거리를 계산한 뒤 상위 k개만 고릅니다.
+
+    python ipa_segment_matcher.py --en dict/en-dict-ipa.csv --ko dict/ko-dict-ipa.csv
+
+IPA는 문자 단위가 아니라 음소 기호 단위로 비교합니다. 타이 바로 이어진 파찰음(t͡ɕ),
+기식/구개음화 등의 보조 기호(tʰ), 결합 분음 기호는 앞 기호와 하나의 토큰이 됩니다.
+"""
+
+import argparse
+import re
+import time
+import unicodedata
+
+import numpy as np
+
+from korean_phonetic_levenshtein import _to_text, _top_k_indices_by
+
+EN_IPA_PATH = 'dict/en-dict-ipa.csv'
+KO_IPA_PATH = 'dict/ko-dict-ipa.csv'
+OUTPUT_PATH = 'dict/en-dict-ipa-keyword-matches.csv'
+
+# Ladefoged, P. & Johnson, K. (2014). A Course in Phonetics.
+# International Phonetic Association (IPA) Chart – https://www.internationalphoneticalphabet.org/ipa-charts/ipa-symbols-chart-complete/
+PHONEME_GROUPS = [
+    {"t", "d", "tʰ", "ɾ"},               # 치조 파열/플랩
+    {"k", "g", "kʰ"},                   # 연구개 파열
+    {"p", "b", "pʰ"},                   # 양순 파열
+    {"m", "n", "ŋ"},                    # 비음 (nasals)
+    {"s", "ʃ", "ɕ"},                    # 무성 치조/치경 마찰음
+    {"ʧ", "ʤ", "t͡ɕ", "d͡ʑ", "t͡ʃ", "d͡ʒ"},  # 파찰음
+    {"a", "ɑ", "ʌ", "ɐ"},               # 저모음 중심 (유사성 있음)
+    {"i", "ɪ"},                         # 앞 고모음
+    {"u", "ʊ"},                         # 뒤 고모음
+    {"e", "ɛ"},                         # 앞 중모음
+    {"o", "ɔ"},                         # 뒤 중모음
+]
+
+TIE_BARS = {'͡', '͜'}
+
+# 앞 기호에 붙는 보조 기호 (기식, 구개음화, 원순음화, 장음 등)
+MODIFIERS = set('ʰʲʷˠˤⁿˡʼːˑ˞')
+
+# 비교에서 제외하는 기호 (강세, 음절 경계, 생략 가능 표시의 괄호, 공백)
+IGNORED = set('ˈˌ.()‿ ')
+
+# 타이 바 없이 쓰인 파찰음 (한국어 IPA의 tɕ 등)은 타이 바 표기로 통일
+AFFRICATES = {'tɕ': 't͡ɕ', 'dʑ': 'd͡ʑ', 'tʃ': 't͡ʃ', 'dʒ': 'd͡ʒ'}
+
+
+def split_ipa(ipa):
+    """IPA 문자열을 강세 기호(ˈ, ˌ) 기준으로 나눈 조각 리스트 (문자열이 아니면 빈 리스트)"""
+    if not isinstance(ipa, str):
+        return []
+
+    # 맨 앞/뒤에 있는 ˈ 또는 ˌ 제거
+    ipa = re.sub(r'^[ˈˌ]', '', ipa)
+    ipa = re.sub(r'[ˈˌ]$', '', ipa)
+
+    # 중간에 ˈ 또는 ˌ 가 있을 경우 split
+    if 'ˈ' in ipa or 'ˌ' in ipa:
+        # split 시, ˈ 또는 ˌ 기준으로 나누고 빈 string은 제거
+        parts = re.split(r'[ˈˌ]', ipa)
+        return [p for p in parts if p.strip()]
+    else:
+        return [ipa]
+
+
+def tokenize_ipa(ipa):
+    """IPA 문자열을 음소 기호 토큰 리스트로 변환
+
+    >>> tokenize_ipa('tɕilpʰʌni')
+    ['t͡ɕ', 'i', 'l', 'pʰ', 'ʌ', 'n', 'i']
+    """
+    tokens = []
+    join_next = False
+    for char in unicodedata.normalize('NFC', _to_text(ipa)):
+        if char in IGNORED:
+            join_next = False
+            continue
+        if char in TIE_BARS:
+            join_next = bool(tokens)
+            if join_next:
+                tokens[-1] += char
+            continue
+        if tokens and (join_next or char in MODIFIERS or unicodedata.combining(char)):
+            tokens[-1] += char
+        elif tokens and tokens[-1] + char in AFFRICATES:
+            tokens[-1] = AFFRICATES[tokens[-1] + char]
+        else:
+            tokens.append(char)
+        join_next = False
+    return tokens
+
+
+def _levenshtein_matrix(queries, codes):
+    """같은 길이의 쿼리 토큰 ID 배열 (Q, M)과 후보 배열 (C, L) 간의 레벤슈타인 거리 (Q, C)"""
+    query_count, query_len = queries.shape
+    count, length = codes.shape
+    prev = np.broadcast_to(np.arange(length + 1, dtype=np.int32), (query_count, count, length + 1)).copy()
+    for i in range(query_len):
+        # 삭제, 대체 비용은 이전 행만으로 한 번에 계산
+        substitution = (queries[:, i, None, None] != codes[None, :, :]).astype(np.int32)
+        best = np.minimum(prev[:, :, :-1] + substitution, prev[:, :, 1:] + 1)
+        cur = np.empty_like(prev)
+        cur[:, :, 0] = i + 1
+        # 삽입 비용은 같은 행의 왼쪽 칸에 의존하므로 열 단위로 진행
+        for j in range(length):
+            cur[:, :, j + 1] = np.minimum(best[:, :, j], cur[:, :, j] + 1)
+        prev = cur
+    return prev[:, :, length]
+
+
+def ipa_similarity(distance, query_len, candidate_len):
+    """토큰 거리를 두 토큰열 중 긴 쪽의 길이로 나눈 유사도 (1 - 거리 / 긴 쪽 길이, NumPy 배열도 가능)"""
+    return 1.0 - distance / np.maximum(np.maximum(query_len, candidate_len), 1)
+
+
+class IPASegmentMatcher:
+    """한국어 IPA 사전을 첫 음소 클래스별로 색인해 두고 IPA 조각과 비슷한 단어를 찾는 클래스
+
+    첫 음소가 같거나 같은 PHONEME_GROUPS에 속하는 단어만 후보로 삼고, 음소 토큰 단위
+    레벤슈타인 거리가 작은 순(같으면 사전에 먼저 나온 단어 우선)으로 상위 k개를 고릅니다.
+    normalized=True이면 거리 대신 길이로 정규화한 유사도(ipa_similarity)가 큰 순으로 고릅니다.
+    """
+
+    # 한 번에 계산하는 (쿼리 수 x 후보 수 x 후보 길이)의 상한
+    max_block = 1 << 22
+
+    def __init__(self, ipas, words=None, groups=PHONEME_GROUPS):
+        self.ipas = [_to_text(ipa) for ipa in ipas]
+        self.words = list(words) if words is not None else list(self.ipas)
+        if len(self.words) != len(self.ipas):
+            raise ValueError("words와 ipas의 길이가 다릅니다.")
+
+        self.group_of = {symbol: i for i, group in enumerate(groups) for symbol in group}
+        self.token_ids = {}
+        encoded = []
+        members = {}
+        for i, ipa in enumerate(self.ipas):
+            tokens = tokenize_ipa(ipa)
+            encoded.append([self.token_ids.setdefault(token, len(self.token_ids)) for token in tokens])
+            if tokens:
+                members.setdefault(self.phoneme_class(tokens), []).append(i)
+
+        # 첫 음소 클래스 -> 후보 길이 -> (사전 인덱스 배열, (후보 수, 길이) 토큰 ID 배열)
+        self.classes = {}
+        for key, index in members.items():
+            lengths = np.array([len(encoded[i]) for i in index])
+            by_length = {}
+            for length in np.unique(lengths):
+                group = np.array(index)[lengths == length]
+                by_length[int(length)] = (group, np.array([encoded[i] for i in group], dtype=np.int32))
+            self.classes[key] = by_length
+
+    def __len__(self):
+        return len(self.words)
+
+    @classmethod
+    def from_csv(cls, path=KO_IPA_PATH, groups=PHONEME_GROUPS):
+        """한국어 IPA 사전 CSV(word, ipa)로부터 생성"""
+        import pandas as pd
+
+        df = pd.read_csv(path)
+        return cls(df['ipa'], df['word'], groups=groups)
+
+    def phoneme_class(self, tokens):
+        """첫 음소 토큰의 클래스 (그룹에 속하면 그룹 번호, 아니면 토큰 자체)"""
+        if not tokens:
+            return None
+        return self.group_of.get(tokens[0], tokens[0])
+
+    def encode(self, tokens):
+        """토큰 ID 배열 (사전에 없는 토큰은 어떤 후보와도 일치하지 않는 ID)"""
+        unknown = len(self.token_ids)
+        return np.array([self.token_ids.get(token, unknown) for token in tokens], dtype=np.int32)
+
+    def match_many(self, segments, k=5, normalized=False):
+        """IPA 조각 목록 각각에 대한 상위 k개의 (단어, IPA, 거리) 리스트를 입력 순서대로 반환
+
+        같은 조각은 한 번만 계산하고, 첫 음소 클래스와 토큰 수가 같은 조각끼리 묶어
+        클래스 후보와의 거리를 한꺼번에 계산합니다. normalized이면 ipa_similarity 순으로 고릅니다.
+        """
+        unique = list(dict.fromkeys(_to_text(segment) for segment in segments))
+        tokenized = {segment: tokenize_ipa(segment) for segment in unique}
+
+        batches = {}
+        for segment in unique:
+            tokens = tokenized[segment]
+            key = self.phoneme_class(tokens)
+            if key in self.classes:
+                batches.setdefault((key, len(tokens)), []).append(segment)
+
+        results = {segment: [] for segment in unique}
+        for (key, query_len), batch in batches.items():
+            queries = np.array([self.encode(tokenized[segment]) for segment in batch])
+            by_length = self.classes[key]
+
+            index = np.concatenate([group for group, _ in by_length.values()])
+            lengths = np.concatenate([np.full(len(group), codes.shape[1]) for group, codes in by_length.values()])
+            distances = np.empty((len(batch), len(index)), dtype=np.int32)
+            column = 0
+            for group, codes in by_length.values():
+                step = max(1, self.max_block // (len(group) * (codes.shape[1] + 1)))
+                for start in range(0, len(batch), step):
+                    distances[start:start + step, column:column + len(group)] = \
+                        _levenshtein_matrix(queries[start:start + step], codes)
+                column += len(group)
+
+            for segment, row in zip(batch, distances):
+                scores = ipa_similarity(row, query_len, lengths) if normalized else -row
+                top = _top_k_indices_by(scores, index, k)
+                results[segment] = [(self.words[i], self.ipas[i], int(row[j])) for i, j in zip(index[top], top)]
+
+        return [results[_to_text(segment)] for segment in segments]
+
+    def match(self, segment, k=5, normalized=False):
+        """IPA 조각 하나에 대한 상위 k개의 (단어, IPA, 거리) 리스트"""
+        return self.match_many([segment], k, normalized)[0]
+
+    def keyword_matches(self, ipa_lists, k=5):
+        """단어별 IPA 조각 리스트 각각에 대해, 조각별 상위 k개 단어 집합의 리스트를 반환
+
+        프로토타입의 get_kwd_match_list를 모든 단어에 대해 한 번에 계산합니다.
+        """
+        ipa_lists = [ipa_list if isinstance(ipa_list, list) else [] for ipa_list in ipa_lists]
+        matches = iter(self.match_many([segment for ipa_list in ipa_lists for segment in ipa_list], k))
+        return [[{word for word, _, _ in next(matches)} for _ in ipa_list] for ipa_list in ipa_lists]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="영어 IPA 조각과 비슷한 한국어 단어 찾기")
+    parser.add_argument('--en', default=EN_IPA_PATH, help="영어 단어 IPA CSV (word, ipa)")
+    parser.add_argument('--ko', default=KO_IPA_PATH, help="한국어 단어 IPA CSV (word, ipa)")
+    parser.add_argument('--output', default=OUTPUT_PATH)
+    parser.add_argument('--top-k', type=int, default=5, help="조각별로 찾을 한국어 단어 수")
+    args = parser.parse_args()
+
+    import pandas as pd
+
+    start = time.perf_counter()
+    matcher = IPASegmentMatcher.from_csv(args.ko)
+    print(f"한국어 IPA 사전 색인: {len(matcher)}개 단어, {len(matcher.classes)}개 첫 음소 클래스 "
+          f"({time.perf_counter() - start:.2f}초)")
+
+    df_en = pd.read_csv(args.en)
+    df_en['ipa_list'] = df_en['ipa'].apply(split_ipa)
+
+    start = time.perf_counter()
+    df_en['kwd_match'] = matcher.keyword_matches(df_en['ipa_list'].tolist(), args.top_k)
+    print(f"{len(df_en)}개 영어 단어 매칭 완료 ({time.perf_counter() - start:.2f}초)")
+
+    df_en.to_csv(args.output, index=False)
+    print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+"""
+영어 단어 사전과 KO 발음 사전 사이의 양방향 k-최근접 이웃 그래프 생성
+
+    python korean_phonetic_knn.py build --lexicon dict/final/ko-dict-pronunciation.lexicon.bin
+    python korean_phonetic_knn.py build --en dict/en-dict-ipa.csv --k 20 --min-similarity 0.6 --resume
+    python korean_phonetic_knn.py info
+    python korean_phonetic_knn.py neighbors felon
+    python korean_phonetic_knn.py neighbors 사과 --direction ko-en
+
+EN 사전(pronunciation 컬럼이 있으면 그 한글 발음, 없으면 ipa 컬럼을 ipa_hangul_transliterator로
+변환한 발음)의 모든 행에 대해 가장 유사한 KO 단어 k개(EN->KO)를, KO 사전의 모든 행에 대해 가장
+유사한 EN 단어 k개(KO->EN)를 구합니다. 유사도가 --min-similarity 미만인 이웃은 저장하지 않습니다.
+
+두 사전 모두 같은 발음끼리 묶은 고유 발음 키 단위로 계산하며, (EN 키 tile_rows개) x (KO 키
+tile_cols개) 타일마다 KoreanPhoneticLexicon.score_many로 유사도 행렬을 구합니다. 유사도는
+대칭이므로 한 타일로 두 방향의 행별 top-k를 함께 갱신하고 타일은 버립니다. 따라서 메모리는
+전체 유사도 행렬 대신 (키 수 x k)의 top-k 배열과 타일 하나만큼만 사용합니다.
+
+계산 중에는 --checkpoint-seconds마다 top-k 배열과 완료한 타일을 <output>.checkpoint.npz에
+저장하므로, 중단된 작업은 --resume으로 남은 타일부터 이어서 실행합니다. 입력 발음, 점수
+파라미터, k, 타일 크기 중 하나라도 바뀌면 체크포인트를 쓰지 않습니다.
+
+파일 형식은 korean_phonetic_store.write_sections의 섹션 파일이며, 방향별로 CSR 형식의
+offsets(행 수 + 1), indices(상대 사전의 행 인덱스), scores 배열을 저장합니다. i번째 행의 이웃은
+indices[offsets[i]:offsets[i + 1]]이며 유사도 내림차순(같으면 앞 행 우선)입니다.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+import instrumentation
+from korean_phonetic_levenshtein import SCORING_MODES, _to_text
+from korean_phonetic_levenshtein_mapper import PronunciationMatcher, load_matcher
+from korean_phonetic_store import StringTable, group_pronunciations, read_sections, write_sections
+
+EN_PATH = 'dict/final/kss-dict-ipa-pronunciation.csv'
+KO_DICT_PATH = 'dict/final/ko-dict-pronunciation.csv'
+GRAPH_PATH = 'dict/final/en-ko-knn.graph.bin'
+
+MAGIC = b'KPKNN\x00\x00\x01'
+VERSION = 1
+
+# 타일 크기 (EN 발음 키 x KO 발음 키). 음절 단위 점수는 쿼리별 비용 행렬을 재사용하도록
+# tile_rows가 KoreanPhoneticLexicon.query_costs_size 이하여야 빠름
+TILE_ROWS = 64
+TILE_COLS = 4096
+
+CHECKPOINT_SECONDS = 30.0
+
+DIRECTIONS = ('en-ko', 'ko-en')
+
+
+def load_en(path=EN_PATH):
+    """EN 사전 CSV에서 (단어 리스트, 한글 발음 리스트) 읽기
+
+    pronunciation 컬럼이 없으면 ipa 컬럼을 강세 표시 없이 한글로 변환합니다.
+    """
+    import pandas as pd
+
+    df = pd.read_csv(path)
+    words = [str(word) for word in df['word']]
+    if 'pronunciation' in df.columns:
+        return words, [_to_text(pronunciation) for pronunciation in df['pronunciation']]
+
+    from ipa_hangul_transliterator import transliterate_many
+
+    return words, transliterate_many([_to_text(ipa) for ipa in df['ipa']], accents=False)
+
+
+def merge_top_k(best_index, best_scores, index, scores, k):
+    """행별 상위 k개 (인덱스, 유사도) 배열에 새 후보 행렬을 병합
+
+    유사도 내림차순이며 같으면 인덱스가 작은 쪽이 앞입니다. 빈 자리는 인덱스 -1, 유사도 -inf입니다.
+    """
+    index = np.concatenate([best_index, index], axis=1)
+    scores = np.concatenate([best_scores, scores], axis=1)
+    order = np.lexsort((index, -scores), axis=1)[:, :k]
+    return np.take_along_axis(index, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+
+class KnnGraphBuilder:
+    """EN 발음 키 x KO 발음 키 유사도를 타일 단위로 계산하며 두 방향의 키별 top-k를 유지하는 클래스
+
+    Attributes:
+        en_index, en_scores: EN 키별 상위 k개 KO 키와 유사도 (빈 자리는 -1, -inf)
+        ko_index, ko_scores: KO 키별 상위 k개 EN 키와 유사도
+        done: (EN 타일 수, KO 타일 수) 완료한 타일
+    """
+
+    def __init__(self, en_pronunciations, ko_lexicon, k=10, min_similarity=0.5, scoring='jamo',
+                 tile_rows=TILE_ROWS, tile_cols=TILE_COLS):
+        self.en = list(en_pronunciations)
+        self.ko = ko_lexicon
+        self.k = k
+        self.min_similarity = min_similarity
+        self.scoring = scoring
+        self.tile_rows = tile_rows
+        self.tile_cols = tile_cols
+
+        self.done = np.zeros((-(-len(self.en) // tile_rows), -(-len(self.ko) // tile_cols)), dtype=bool)
+        self.en_index = np.full((len(self.en), k), -1, dtype=np.int64)
+        self.en_scores = np.full((len(self.en), k), -np.inf)
+        self.ko_index = np.full((len(self.ko), k), -1, dtype=np.int64)
+        self.ko_scores = np.full((len(self.ko), k), -np.inf)
+        self.fingerprint = self._fingerprint()
+
+    def _fingerprint(self):
+        """체크포인트를 이어서 쓸 수 있는지 판단하는 입력과 파라미터의 SHA-256"""
+        sha256 = hashlib.sha256()
+        params = [self.ko.kps.model.fingerprint(), self.scoring, self.k, self.min_similarity,
+                  self.tile_rows, self.tile_cols]
+        sha256.update(json.dumps(params).encode('utf-8'))
+        for pronunciations in (self.en, self.ko.pronunciations):
+            sha256.update(b'\0')
+            for pronunciation in pronunciations:
+                sha256.update(pronunciation.encode('utf-8') + b'\n')
+        return sha256.hexdigest()
+
+    def run_tile(self, i, j):
+        """(i, j) 타일의 유사도를 계산하여 두 방향의 top-k에 병합"""
+        rows = np.arange(i * self.tile_rows, min((i + 1) * self.tile_rows, len(self.en)))
+        cols = np.arange(j * self.tile_cols, min((j + 1) * self.tile_cols, len(self.ko)))
+
+        scores = np.empty((len(rows), len(cols)))
+        for r, en_key in enumerate(rows.tolist()):
+            scores[r] = self.ko.score_many(self.en[en_key], cols, self.scoring)
+
+        # 하한 미만은 빈 자리와 같게 표시하여 병합
+        keep = scores >= self.min_similarity
+        scores = np.where(keep, scores, -np.inf)
+        self.en_index[rows], self.en_scores[rows] = merge_top_k(
+            self.en_index[rows], self.en_scores[rows], np.where(keep, cols, -1), scores, self.k)
+        self.ko_index[cols], self.ko_scores[cols] = merge_top_k(
+            self.ko_index[cols], self.ko_scores[cols], np.where(keep.T, rows, -1), scores.T, self.k)
+        self.done[i, j] = True
+
+        if instrumentation.ENABLED:
+            instrumentation.incr('tiles')
+            instrumentation.incr('pairs_scored', scores.size)
+            instrumentation.incr('pairs_kept', int(keep.sum()))
+
+    def run(self, checkpoint_path=None, checkpoint_seconds=CHECKPOINT_SECONDS, progress=True):
+        """남은 타일을 모두 계산 (checkpoint_path가 있으면 checkpoint_seconds마다 저장)"""
+        pending = list(zip(*np.nonzero(~self.done)))
+        if progress:
+            from tqdm import tqdm
+
+            pending = tqdm(pending, desc="타일 계산 중")
+        last_saved = time.monotonic()
+        for i, j in pending:
+            with instrumentation.timer('tile'):
+                self.run_tile(int(i), int(j))
+            if checkpoint_path and time.monotonic() - last_saved >= checkpoint_seconds:
+                self.save_checkpoint(checkpoint_path)
+                last_saved = time.monotonic()
+
+    def save_checkpoint(self, path):
+        """top-k 배열과 완료한 타일을 임시 파일에 쓴 뒤 이름을 바꾸어 저장"""
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, fingerprint=np.array(self.fingerprint), done=self.done,
+                     en_index=self.en_index, en_scores=self.en_scores,
+                     ko_index=self.ko_index, ko_scores=self.ko_scores)
+        os.replace(tmp_path, path)
+
+    def load_checkpoint(self, path):
+        """같은 입력과 파라미터로 저장한 체크포인트가 있으면 불러오고 True, 아니면 False"""
+        if not os.path.exists(path):
+            return False
+        with np.load(path) as data:
+            if str(data['fingerprint']) != self.fingerprint:
+                return False
+            self.done = data['done']
+            self.en_index, self.en_scores = data['en_index'], data['en_scores']
+            self.ko_index, self.ko_scores = data['ko_index'], data['ko_scores']
+        return True
+
+
+def expand_rows(key_index, key_scores, row_offsets, row_members, target_offsets, target_members, k):
+    """키 단위 top-k를 행 단위 CSR (offsets, indices, scores)로 펼치기
+
+    각 행은 자기 발음 키의 상위 키들에 속한 상대 사전 행 중 상위 k개를 가집니다 (유사도가 같으면
+    앞 행 우선). 키는 처음 나온 순서로 번호가 매겨지므로 상위 k개 키만으로 행 단위 top-k가 정확합니다.
+    """
+    target_offsets = target_offsets.tolist()
+    target_members = target_members.tolist()
+    per_key = []
+    for keys, scores in zip(key_index.tolist(), key_scores.tolist()):
+        candidates = [
+            (score, i)
+            for key, score in zip(keys, scores) if key >= 0
+            for i in target_members[target_offsets[key]:target_offsets[key + 1]]
+        ]
+        candidates.sort(key=lambda item: (-item[0], item[1]))
+        per_key.append(candidates[:k])
+
+    key_of_row = np.empty(len(row_members), dtype=np.int64)
+    key_of_row[row_members] = np.repeat(np.arange(len(row_offsets) - 1), np.diff(row_offsets))
+    neighbors = [per_key[key] for key in key_of_row.tolist()]
+
+    offsets = np.zeros(len(neighbors) + 1, dtype=np.int64)
+    np.cumsum([len(row) for row in neighbors], out=offsets[1:])
+    indices = np.array([i for row in neighbors for _, i in row], dtype=np.int32)
+    scores = np.array([score for row in neighbors for score, _ in row], dtype=np.float64)
+    return offsets, indices, scores
+
+
+def build_graph(en_words, en_pronunciations, matcher, output=GRAPH_PATH, k=10, min_similarity=0.5,
+                scoring='jamo', tile_rows=TILE_ROWS, tile_cols=TILE_COLS, resume=False,
+                checkpoint_seconds=CHECKPOINT_SECONDS, sources=None):
+    """EN 사전과 KO 사전(PronunciationMatcher)의 양방향 kNN 그래프를 output에 저장하고 메타데이터 반환"""
+    en_keys, en_offsets, en_members = group_pronunciations(en_pronunciations)
+    builder = KnnGraphBuilder(en_keys, matcher.lexicon, k, min_similarity, scoring, tile_rows, tile_cols)
+
+    checkpoint_path = f'{output}.checkpoint.npz'
+    if resume and builder.load_checkpoint(checkpoint_path):
+        print(f"체크포인트에서 이어서 실행합니다: {int(builder.done.sum())}/{builder.done.size}개 타일 완료")
+
+    with instrumentation.stage('tiles'):
+        builder.run(checkpoint_path, checkpoint_seconds)
+        builder.save_checkpoint(checkpoint_path)
+
+    with instrumentation.stage('write'):
+        en_ko = expand_rows(builder.en_index, builder.en_scores, en_offsets, en_members,
+                            matcher.key_offsets, matcher.key_members, k)
+        ko_en = expand_rows(builder.ko_index, builder.ko_scores, matcher.key_offsets, matcher.key_members,
+                            en_offsets, en_members, k)
+
+        arrays = {}
+        for prefix, strings in (('en_word', en_words), ('en_pron', en_pronunciations), ('ko_word', matcher.words)):
+            arrays[f'{prefix}_data'], arrays[f'{prefix}_offsets'] = StringTable.encode(strings)
+        for direction, (offsets, indices, scores) in zip(DIRECTIONS, (en_ko, ko_en)):
+            name = direction.replace('-', '_')
+            arrays[f'{name}_offsets'] = offsets
+            arrays[f'{name}_indices'] = indices
+            arrays[f'{name}_scores'] = scores
+
+        metadata = {
+            'version': VERSION,
+            'k': k,
+            'min_similarity': min_similarity,
+            'scoring': scoring,
+            'model_fingerprint': matcher.lexicon.kps.model.fingerprint(),
+            'en_words': len(en_words),
+            'ko_words': len(matcher.words),
+            'en_pronunciations': len(en_keys),
+            'ko_pronunciations': len(matcher.lexicon),
+            'edges': {direction: len(edges[1]) for direction, edges in zip(DIRECTIONS, (en_ko, ko_en))},
+            'sources': sources or {},
+        }
+        metadata = write_sections(output, MAGIC, metadata, arrays)
+    os.remove(checkpoint_path)
+    return metadata
+
+
+class KnnGraph:
+    """kNN 그래프 파일을 mmap으로 연 결과"""
+
+    def __init__(self, path=GRAPH_PATH):
+        self.path = path
+        self.metadata, self._mmap, arrays = read_sections(path, MAGIC, "kNN 그래프 파일")
+        if self.metadata['version'] != VERSION:
+            raise ValueError(f"지원하지 않는 그래프 파일 버전입니다: {self.metadata['version']}")
+
+        self.en_words = StringTable(arrays['en_word_data'], arrays['en_word_offsets'])
+        self.en_pronunciations = StringTable(arrays['en_pron_data'], arrays['en_pron_offsets'])
+        self.ko_words = StringTable(arrays['ko_word_data'], arrays['ko_word_offsets'])
+        self.edges = {
+            direction: tuple(arrays[f"{direction.replace('-', '_')}_{part}"] for part in ('offsets', 'indices', 'scores'))
+            for direction in DIRECTIONS
+        }
+
+    def neighbors(self, i, direction='en-ko'):
+        """i번째 행의 (상대 사전 단어, 유사도) 리스트"""
+        offsets, indices, scores = self.edges[direction]
+        targets = self.ko_words if direction == 'en-ko' else self.en_words
+        start, end = offsets[i], offsets[i + 1]
+        return [(targets[j], float(score)) for j, score in zip(indices[start:end].tolist(), scores[start:end])]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EN 사전과 KO 사전 사이의 양방향 kNN 그래프 생성 및 조회")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="타일 단위로 계산하여 그래프 파일 생성")
+    build_parser.add_argument('--en', default=EN_PATH, help="word와 pronunciation(또는 ipa) 컬럼이 있는 CSV")
+    build_parser.add_argument('--ko', default=KO_DICT_PATH, help="KO 사전 발음 CSV")
+    build_parser.add_argument('--lexicon', help="KO 사전 바이너리 파일 (주어지면 --ko 대신 사용)")
+    build_parser.add_argument('--output', default=GRAPH_PATH)
+    build_parser.add_argument('--k', type=int, default=10, help="행별로 저장할 이웃 수")
+    build_parser.add_argument('--min-similarity', type=float, default=0.5, help="저장할 이웃의 최소 유사도")
+    build_parser.add_argument('--scoring', choices=SCORING_MODES, default='jamo',
+                              help="jamo: 자모열별 정렬, syllable: 음절 단위 정렬")
+    build_parser.add_argument('--tile-rows', type=int, default=TILE_ROWS, help="타일의 EN 발음 키 수")
+    build_parser.add_argument('--tile-cols', type=int, default=TILE_COLS, help="타일의 KO 발음 키 수")
+    build_parser.add_argument('--checkpoint-seconds', type=float, default=CHECKPOINT_SECONDS,
+                              help="체크포인트 저장 간격(초)")
+    build_parser.add_argument('--resume', action='store_true', help="체크포인트의 완료한 타일을 건너뛰고 이어서 실행")
+    instrumentation.add_arguments(build_parser)
+
+    info_parser = subparsers.add_parser('info', help="그래프 파일 정보 출력")
+    info_parser.add_argument('--graph', default=GRAPH_PATH)
+
+    neighbors_parser = subparsers.add_parser('neighbors', help="단어의 이웃 출력")
+    neighbors_parser.add_argument('word')
+    neighbors_parser.add_argument('--graph', default=GRAPH_PATH)
+    neighbors_parser.add_argument('--direction', choices=DIRECTIONS, default='en-ko')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        with instrumentation.from_args(args):
+            run(args)
+        return
+
+    graph = KnnGraph(args.graph)
+    if args.command == 'info':
+        metadata = graph.metadata
+        print(f"{args.graph}: EN {metadata['en_words']}개 단어({metadata['en_pronunciations']}개 발음), "
+              f"KO {metadata['ko_words']}개 단어({metadata['ko_pronunciations']}개 발음)")
+        print(f"k={metadata['k']}, 최소 유사도 {metadata['min_similarity']}, 점수 방식 {metadata['scoring']}")
+        for direction, edges in metadata['edges'].items():
+            print(f"{direction}: {edges}개 간선")
+        return
+
+    words = graph.en_words if args.direction == 'en-ko' else graph.ko_words
+    rows = [i for i, word in enumerate(words) if word == args.word]
+    if not rows:
+        print(f"단어를 찾지 못했습니다: {args.word}")
+        return
+    for i in rows:
+        print(f"{args.word}:")
+        for rank, (word, similarity) in enumerate(graph.neighbors(i, args.direction), 1):
+            print(f"{rank}. {word} (유사도: {similarity:.4f})")
+
+
+def run(args):
+    start = time.perf_counter()
+    with instrumentation.stage('load'):
+        en_words, en_pronunciations = load_en(args.en)
+        if args.lexicon:
+            matcher = PronunciationMatcher.load(args.lexicon, scoring=args.scoring)
+        else:
+            matcher = load_matcher(args.ko, scoring=args.scoring)
+
+    sources = {'en': args.en, 'ko': args.lexicon or args.ko}
+    metadata = build_graph(en_words, en_pronunciations, matcher, args.output, args.k, args.min_similarity,
+                           args.scoring, args.tile_rows, args.tile_cols, args.resume, args.checkpoint_seconds,
+                           sources)
+    edges = metadata['edges']
+    print(f"kNN 그래프 생성 완료: EN->KO {edges['en-ko']}개, KO->EN {edges['ko-en']}개 간선 "
+          f"({time.perf_counter() - start:.2f}초) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,26 @@
 
 이 코드는 한글 단어의 발음 유사도를 측정하기 위한 라이브러리입니다.
 음성학적 특성을 고려한 가중치 레벤슈타인 거리(Weighted Levenshtein Distance)를 구현하였습니다.
+
+단어 하나를 비교하는 경로(weighted_levenshtein, top_k)는 순수 파이썬으로 동작하므로 이 모듈을
+import해도 NumPy를 불러오지 않습니다. NumPy는 KoreanPhoneticLexicon처럼 배열이 필요한 곳에서
+처음 사용할 때 불러옵니다 (soundle.py importtime으로 import 시간 예산을 확인합니다).
 """
 
-import re
-import numpy as np
+import hashlib
+import heapq
+import json
+import math
+import struct
+from collections import OrderedDict
+
+import instrumentation
+
+# 점수 방식: 초성/중성/종성 자모열을 따로 정렬(jamo)하거나 음절 단위로 정렬(syllable)
+SCORING_MODES = ('jamo', 'syllable')
 
 class KoreanPhoneticSimilarity:
-    def __init__(self):
+    def __init__(self, model=None):
         # 초성, 중성, 종성 분리를 위한 유니코드 정보
         self.CHOSUNG = ['ㄱ', 'ㄲ', 'ㄴ', 'ㄷ', 'ㄸ', 'ㄹ', 'ㅁ', 'ㅂ', 'ㅃ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅉ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ']
         self.JUNGSUNG = ['ㅏ', 'ㅐ', 'ㅑ', 'ㅒ', 'ㅓ', 'ㅔ', 'ㅕ', 'ㅖ', 'ㅗ', 'ㅘ', 'ㅙ', 'ㅚ', 'ㅛ', 'ㅜ', 'ㅝ', 'ㅞ', 'ㅟ', 'ㅠ', 'ㅡ', 'ㅢ', 'ㅣ']
@@ -85,10 +98,35 @@ class KoreanPhoneticSimilarity:
             'ㅀ': ['ㄹ', 'ㅎ'],
             'ㅄ': ['ㅂ', 'ㅅ']
         }
+        
+        # 초성, 중성, 종성 거리에 대한 가중치
+        self.position_weights = [0.4, 0.4, 0.2]
+        
+        # 자음, 모음 특성별 가중치
+        self.consonant_weights = [0.4, 0.3, 0.15, 0.15]  # 조음위치, 조음방법, 유/무성, 긴장성
+        self.vowel_weights = [0.4, 0.4, 0.2]  # 전설/후설, 고/중/저, 원순성
+        
+        # 거리 계산에 사용하는 컴파일된 발음 모델 (주어지지 않으면 처음 사용할 때 생성)
+        self._model = model
+    
+    @property
+    def model(self):
+        """자모 ID와 대체 비용 행렬을 미리 계산한 KoreanPhoneticModel"""
+        if self._model is None:
+            self.compile()
+        return self._model
+    
+    def compile(self):
+        """현재 특성과 가중치로 발음 모델을 다시 생성
+        
+        consonant_features, vowel_features나 가중치를 바꾼 뒤에는 다시 호출해야 합니다.
+        """
+        self._model = KoreanPhoneticModel.from_similarity(self)
+        return self._model
     
     def decompose(self, char):
         """한글 문자를 초성, 중성, 종성으로 분해"""
-        if re.match('[가-힣]', char):
+        if '가' <= char <= '힣':
             char_code = ord(char) - ord('가')
             cho = char_code // (21 * 28)
             jung = (char_code % (21 * 28)) // 28
@@ -108,7 +146,7 @@ class KoreanPhoneticSimilarity:
         features2 = self.consonant_features[cons2]
         
         # 특성별 가중치
-        weights = [0.4, 0.3, 0.15, 0.15]  # 조음위치, 조음방법, 유/무성, 긴장성
+        weights = self.consonant_weights
         
         distance = 0
         for i in range(len(features1)):
@@ -130,7 +168,7 @@ class KoreanPhoneticSimilarity:
         features2 = self.vowel_features[vowel2]
         
         # 특성별 가중치
-        weights = [0.4, 0.4, 0.2]  # 전설/후설, 고/중/저, 원순성
+        weights = self.vowel_weights
         
         distance = 0
         for i in range(len(features1)):
@@ -163,47 +201,109 @@ class KoreanPhoneticSimilarity:
     def weighted_levenshtein(self, str1, str2):
         """가중치 레벤슈타인 거리 계산"""
         # 문자열을 초성, 중성, 종성으로 분해
-        jamos1 = [self.decompose(char) for char in str1]
-        jamos2 = [self.decompose(char) for char in str2]
+        model = self.model
+        seqs1 = model.encode(str1)
+        seqs2 = model.encode(str2)
         
-        # 초성, 중성, 종성 각각에 대한 문자열 생성
-        cho1 = [j[0] for j in jamos1]
-        jung1 = [j[1] for j in jamos1]
-        jong1 = [j[2] for j in jamos1]
+        # 초성, 중성, 종성에 대한 가중치
+        weights = model.position_weights
         
-        cho2 = [j[0] for j in jamos2]
-        jung2 = [j[1] for j in jamos2]
-        jong2 = [j[2] for j in jamos2]
+        # 각 자모열에 대해 가중치 레벤슈타인 거리 계산 후 최대 길이로 정규화
+        dists = []
+        for seq1, seq2 in zip(seqs1, seqs2):
+            dist = model.distance(seq1, seq2)
+            max_len = max(len(seq1), len(seq2))
+            if max_len > 0:
+                dist /= max_len
+            dists.append(dist)
         
-        # 복합 종성 처리: 복합 종성을 개별 자음으로 확장
-        expanded_cho1, expanded_jung1, expanded_jong1 = self._expand_jamos(cho1, jung1, jong1)
-        expanded_cho2, expanded_jung2, expanded_jong2 = self._expand_jamos(cho2, jung2, jong2)
+        # 가중 평균 거리
+        total_dist = weights[0] * dists[0] + weights[1] * dists[1] + weights[2] * dists[2]
         
-        # 각 자모열에 대해 가중치 레벤슈타인 거리 계산
-        cho_dist = self._weighted_levenshtein_jamo(expanded_cho1, expanded_cho2)
-        jung_dist = self._weighted_levenshtein_jamo(expanded_jung1, expanded_jung2)
-        jong_dist = self._weighted_levenshtein_jamo(expanded_jong1, expanded_jong2)
+        # 유사도 반환 (0: 완전히 다름, 1: 동일)
+        return 1.0 - total_dist
+    
+    def syllable_similarity(self, str1, str2):
+        """음절 단위로 정렬한 가중치 레벤슈타인 유사도
         
-        # 초성, 중성, 종성에 대한 가중치
-        weights = [0.4, 0.4, 0.2]
+        weighted_levenshtein과 달리 두 문자열을 음절(문자) 단위로 한 번만 정렬하므로 빈 종성을
+        생략해 자모열끼리 어긋나는 일이 없습니다. 음절 대체 비용은 같은 자모 특성 모델에서
+        구하며(KoreanPhoneticModel.syllable_cost), 거리는 긴 쪽의 음절 수로 정규화합니다.
+        """
+        max_len = max(len(str1), len(str2))
+        if max_len == 0:
+            return 1.0
+        return 1.0 - self.model.syllable_distance(str1, str2) / max_len
+    
+    def weighted_levenshtein_bounded(self, str1, str2, min_similarity):
+        """유사도가 min_similarity 이상일 때만 끝까지 계산하는 weighted_levenshtein
         
-        # 각 자모열의 최대 길이로 정규화
-        max_cho_len = max(len(expanded_cho1), len(expanded_cho2))
-        max_jung_len = max(len(expanded_jung1), len(expanded_jung2))
-        max_jong_len = max(len(expanded_jong1), len(expanded_jong2))
+        초성, 중성, 종성 거리의 길이 차이 하한으로 먼저 걸러낸 뒤, 앞 자모열에서 쓴
+        거리만큼 남은 한도를 줄여 가며 밴드 DP로 계산합니다.
         
-        if max_cho_len > 0:
-            cho_dist /= max_cho_len
-        if max_jung_len > 0:
-            jung_dist /= max_jung_len
-        if max_jong_len > 0:
-            jong_dist /= max_jong_len
+        Returns:
+            float | None: weighted_levenshtein과 같은 유사도, min_similarity 미만이면 None
+        """
+        model = self.model
+        seqs1 = model.encode(str1)
+        seqs2 = model.encode(str2)
+        weights = model.position_weights
+        max_lens = [max(len(seq1), len(seq2)) for seq1, seq2 in zip(seqs1, seqs2)]
         
-        # 가중 평균 거리
-        total_dist = weights[0] * cho_dist + weights[1] * jung_dist + weights[2] * jong_dist
+        # 각 자모열의 정규화된 거리 하한 (길이 차이)
+        lower = [
+            weight * abs(len(seq1) - len(seq2)) / max_len if max_len > 0 else 0.0
+            for weight, seq1, seq2, max_len in zip(weights, seqs1, seqs2, max_lens)
+        ]
+        max_total = 1.0 - min_similarity + 1e-9
+        if sum(lower) > max_total:
+            return None
         
-        # 유사도 반환 (0: 완전히 다름, 1: 동일)
-        return 1.0 - total_dist
+        dists = []
+        spent = 0.0
+        for p, (seq1, seq2) in enumerate(zip(seqs1, seqs2)):
+            if max_lens[p] == 0:
+                dists.append(0.0)
+                continue
+            
+            # 이 자모열에 쓸 수 있는 거리 한도
+            remaining = max_total - spent - sum(lower[p + 1:])
+            budget = remaining * max_lens[p] / weights[p] if weights[p] > 0 else math.inf
+            dist = model.distance_bounded(seq1, seq2, budget)
+            if dist == math.inf:
+                return None
+            
+            dist /= max_lens[p]
+            dists.append(dist)
+            spent += weights[p] * dist
+        
+        total_dist = weights[0] * dists[0] + weights[1] * dists[1] + weights[2] * dists[2]
+        similarity = 1.0 - total_dist
+        return similarity if similarity >= min_similarity else None
+    
+    def top_k(self, query, candidates, k=5):
+        """(단어, 발음) 목록에서 query와 가장 유사한 k개의 (단어, 유사도) 리스트
+        
+        힙이 k개로 차면 k번째 유사도를 한도로 weighted_levenshtein_bounded를 사용합니다.
+        유사도가 같으면 목록에서 먼저 나온 단어가 앞에 옵니다.
+        """
+        if k <= 0:
+            return []
+        
+        # (유사도, -순서, 단어) 최소 힙: 가장 먼저 밀려날 후보가 맨 위
+        heap = []
+        for order, (word, pronunciation) in enumerate(candidates):
+            pronunciation = _to_text(pronunciation)
+            if len(heap) < k:
+                heapq.heappush(heap, (self.weighted_levenshtein(query, pronunciation), -order, word))
+                continue
+            
+            similarity = self.weighted_levenshtein_bounded(query, pronunciation, heap[0][0])
+            if similarity is not None and similarity > heap[0][0]:
+                heapq.heapreplace(heap, (similarity, -order, word))
+        
+        heap.sort(key=lambda item: (-item[0], -item[1]))
+        return [(word, similarity) for similarity, _, word in heap]
     
     def _expand_jamos(self, cho, jung, jong):
         """복합 종성을 개별 자음으로 확장"""
@@ -228,33 +328,714 @@ class KoreanPhoneticSimilarity:
     
     def _weighted_levenshtein_jamo(self, seq1, seq2):
         """가중치 레벤슈타인 거리 계산 (자모 시퀀스)"""
-        len1, len2 = len(seq1), len(seq2)
+        model = self.model
+        return model.distance([model.jamo_id(j) for j in seq1], [model.jamo_id(j) for j in seq2])
+    
+    def encode(self, text):
+        """문자열을 초성, 중성, 종성 자모 ID 배열로 변환"""
+        return self.model.encode_arrays(text)
+    
+    def score_many(self, query, candidates):
+        """하나의 쿼리와 여러 후보 간의 유사도를 한 번에 계산
         
-        # DP 테이블 초기화
-        dp = np.zeros((len1 + 1, len2 + 1))
+        Args:
+            query (str): 비교할 발음 문자열
+            candidates: 발음 문자열 리스트 또는 미리 인코딩한 KoreanPhoneticLexicon
         
-        # 첫 행과 열 초기화
-        for i in range(len1 + 1):
-            dp[i, 0] = i
-        for j in range(len2 + 1):
-            dp[0, j] = j
+        Returns:
+            np.ndarray: 후보 순서대로의 weighted_levenshtein 유사도
+        """
+        if not isinstance(candidates, KoreanPhoneticLexicon):
+            candidates = KoreanPhoneticLexicon(candidates, kps=self)
+        return candidates.score_many(query)
+
+
+class KoreanPhoneticModel:
+    """자모 정수 ID, 대체 비용 행렬, 음절 분해 테이블을 미리 계산해 둔 발음 모델
+    
+    KoreanPhoneticSimilarity의 특성과 가중치로부터 한 번 만들어 두면 DP의 각 칸은
+    배열 인덱싱만으로 계산됩니다. 일반 객체이므로 pickle로 다른 프로세스에 넘기거나
+    save()/load()로 파일에 저장해 재사용할 수 있습니다.
+    
+    NumPy 배열로 받은 비용 행렬(mmap 등)은 복사하지 않고 그대로 보관하며, 순수 파이썬 DP가
+    쓰는 리스트 사본과 음절 분해 테이블은 처음 필요할 때 만듭니다 (모델을 여는 것만으로는
+    11172개 음절 테이블을 만들지 않음). 리스트로 받은 테이블의 costs/cho_ids/jung_ids/jong_ids
+    NumPy 배열도 처음 접근할 때 만듭니다. 음절 단위 점수의 음절 쌍 대체 비용은 syllable_costs
+    캐시에 처음 쓸 때 계산해 둡니다.
+    """
+    
+    SYLLABLE_BASE = 0xAC00
+    SYLLABLE_COUNT = 11172
+    
+    # syllable_costs에 보관할 최대 음절 쌍 수 (11172 x 11172 쌍 중 실제로 나온 것만 계산)
+    SYLLABLE_CACHE_SIZE = 1 << 18
+    
+    # 한글이 아닌 문자가 종성 자리에 남기는 빈 자모
+    EMPTY = ''
+    
+    def __init__(self, jamo_list, costs, position_weights, cho_ids, jung_ids, jong_ids):
+        self.jamo_list = list(jamo_list)
+        self.jamo_ids = {jamo: i for i, jamo in enumerate(self.jamo_list)}
+        self.position_weights = list(position_weights)
+        self._cho = [int(i) for i in _as_sequence(cho_ids)]
+        self._jung = [int(i) for i in _as_sequence(jung_ids)]
+        self._jong = [[int(j) for j in row] for row in _as_sequence(jong_ids)]
+        self.empty_id = self.jamo_ids[self.EMPTY]
+        self._arrays = {}
+        self._costs = costs
+        self._cost_list = None
+        if hasattr(costs, 'dtype'):
+            self._arrays['costs'] = costs
+        self._syllable_list = None
+        self.syllable_costs = SyllableCostCache(self, self.SYLLABLE_CACHE_SIZE)
+    
+    @property
+    def _cost_rows(self):
+        """자모 간 대체 비용 행렬의 리스트 사본 (순수 파이썬 DP용, 처음 쓸 때 생성)"""
+        if self._cost_list is None:
+            self._cost_list = [[float(cost) for cost in row] for row in _as_sequence(self._costs)]
+        return self._cost_list
+    
+    @property
+    def _syllables(self):
+        """음절 코드 -> (초성 ID, 중성 ID, 종성 ID 튜플) 테이블 (처음 쓸 때 생성)"""
+        if self._syllable_list is None:
+            cho, jung = self._cho, self._jung
+            jong = [tuple(j for j in row if j >= 0) for row in self._jong]
+            self._syllable_list = [
+                (cho[code // (21 * 28)], jung[(code % (21 * 28)) // 28], jong[code % 28])
+                for code in range(self.SYLLABLE_COUNT)
+            ]
+        return self._syllable_list
+    
+    def _array(self, name, values, dtype):
+        array = self._arrays.get(name)
+        if array is None:
+            import numpy as np
+            
+            array = self._arrays[name] = np.array(values, dtype=dtype)
+        return array
+    
+    @property
+    def costs(self):
+        """자모 간 대체 비용 행렬 (NumPy 배열)"""
+        return self._array('costs', self._cost_rows, float)
+    
+    @property
+    def cho_ids(self):
+        return self._array('cho_ids', self._cho, 'int32')
+    
+    @property
+    def jung_ids(self):
+        return self._array('jung_ids', self._jung, 'int32')
+    
+    @property
+    def jong_ids(self):
+        return self._array('jong_ids', self._jong, 'int32')
+    
+    @classmethod
+    def from_similarity(cls, kps):
+        """KoreanPhoneticSimilarity의 자모 정의와 거리 함수로 모델을 생성"""
+        jamo_list = [cls.EMPTY]
+        ids = {cls.EMPTY: 0}
+        
+        def jamo_id(jamo):
+            if jamo not in ids:
+                ids[jamo] = len(jamo_list)
+                jamo_list.append(jamo)
+            return ids[jamo]
+        
+        for jamo in list(kps.consonant_features) + list(kps.vowel_features):
+            jamo_id(jamo)
+        
+        cho_ids = [jamo_id(cho) for cho in kps.CHOSUNG]
+        jung_ids = [jamo_id(jung) for jung in kps.JUNGSUNG]
+        
+        # 종성은 _expand_jamos와 같이 복합 종성을 분해하고 빈 종성(' ')은 생략
+        jong_ids = []
+        for jong in kps.JONGSUNG:
+            if jong == ' ':
+                expanded = []
+            else:
+                expanded = kps.complex_jongsung.get(jong, [jong])
+            row = [jamo_id(j) for j in expanded]
+            jong_ids.append(row + [-1] * (2 - len(row)))
+        
+        # 자모 간 대체 비용은 jamo_distance로 한 번만 계산
+        costs = [[kps.jamo_distance(a, b) for b in jamo_list] for a in jamo_list]
+        
+        return cls(jamo_list, costs, kps.position_weights, cho_ids, jung_ids, jong_ids)
+    
+    def jamo_id(self, jamo):
+        """자모(또는 한글이 아닌 문자)의 정수 ID
+        
+        처음 보는 문자는 새 ID를 받으며, 다른 모든 자모와의 대체 비용은 1입니다.
+        """
+        jamo_id = self.jamo_ids.get(jamo)
+        if jamo_id is None:
+            jamo_id = len(self.jamo_list)
+            self.jamo_ids[jamo] = jamo_id
+            self.jamo_list.append(jamo)
+            
+            cost_rows = self._cost_rows
+            for row in cost_rows:
+                row.append(1.0)
+            cost_rows.append([1.0] * jamo_id + [0.0])
+            self._arrays.pop('costs', None)
+        return jamo_id
+    
+    def encode(self, text):
+        """문자열을 초성, 중성, 종성 자모 ID 리스트로 변환
+        
+        KoreanPhoneticSimilarity.decompose와 _expand_jamos의 규칙을 그대로 따릅니다.
+        """
+        cho, jung, jong = [], [], []
+        syllables = self._syllables
+        for char in text:
+            code = ord(char) - self.SYLLABLE_BASE
+            if 0 <= code < self.SYLLABLE_COUNT:
+                cho_id, jung_id, jong_id = syllables[code]
+                cho.append(cho_id)
+                jung.append(jung_id)
+                jong.extend(jong_id)
+            else:
+                # 한글이 아닌 경우 초성 자리에 문자 그대로, 종성 자리에 빈 자모
+                cho.append(self.jamo_id(char))
+                jong.append(self.empty_id)
+        return cho, jung, jong
+    
+    def encode_arrays(self, text):
+        """encode의 결과를 int32 배열로 반환"""
+        import numpy as np
         
-        # DP 테이블 채우기
-        for i in range(1, len1 + 1):
-            for j in range(1, len2 + 1):
-                if seq1[i-1] == seq2[j-1]:
-                    dp[i, j] = dp[i-1, j-1]
+        return tuple(np.array(seq, dtype=np.int32) for seq in self.encode(text))
+    
+    def distance(self, seq1, seq2):
+        """자모 ID 시퀀스 간의 가중치 레벤슈타인 거리"""
+        if instrumentation.ENABLED:
+            instrumentation.incr('dp_cells', len(seq1) * len(seq2))
+        cost_rows = self._cost_rows
+        prev = [float(j) for j in range(len(seq2) + 1)]
+        for i, jamo1 in enumerate(seq1, 1):
+            costs = cost_rows[jamo1]
+            cur = [float(i)]
+            for j, jamo2 in enumerate(seq2, 1):
+                if jamo1 == jamo2:
+                    cur.append(prev[j - 1])
                 else:
                     # 삭제, 삽입, 대체 중 최소값 선택
-                    del_cost = dp[i-1, j] + 1
-                    ins_cost = dp[i, j-1] + 1
-                    
-                    # 음성학적 특성을 고려한 대체 비용
-                    sub_cost = dp[i-1, j-1] + self.jamo_distance(seq1[i-1], seq2[j-1])
-                    
-                    dp[i, j] = min(del_cost, ins_cost, sub_cost)
-        
-        return dp[len1, len2]
+                    cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + costs[jamo2]))
+            prev = cur
+        return prev[-1]
+    
+    def distance_bounded(self, seq1, seq2, max_distance):
+        """max_distance를 넘으면 math.inf를 반환하는 가중치 레벤슈타인 거리
+        
+        (i, j) 칸을 지나는 경로의 비용은 |j - i| + |(len2 - j) - (len1 - i)| 이상이므로
+        이 하한이 max_distance를 넘는 칸은 계산하지 않고(밴드), 한 행의 모든 칸이
+        한도를 넘으면 바로 종료합니다. 한도 이내이면 결과는 distance와 같습니다.
+        """
+        if max_distance == math.inf:
+            return self.distance(seq1, seq2)
+        
+        len1, len2 = len(seq1), len(seq2)
+        diff = len2 - len1
+        if abs(diff) > max_distance:
+            return math.inf
+        
+        # 허용되는 대각선(j - i)의 범위
+        slack = int((max_distance - abs(diff)) // 2)
+        lo = min(0, diff) - slack
+        hi = max(0, diff) + slack
+        
+        inf = math.inf
+        cost_rows = self._cost_rows
+        cells = 0
+        prev = [float(j) if j <= hi else inf for j in range(len2 + 1)]
+        for i, jamo1 in enumerate(seq1, 1):
+            costs = cost_rows[jamo1]
+            cur = [inf] * (len2 + 1)
+            if -i >= lo:
+                cur[0] = float(i)
+            row_bound = cur[0] + abs(i + diff)
+            columns = range(max(1, i + lo), min(len2, i + hi) + 1)
+            cells += len(columns)
+            for j in columns:
+                jamo2 = seq2[j - 1]
+                if jamo1 == jamo2:
+                    value = prev[j - 1]
+                else:
+                    value = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + costs[jamo2])
+                cur[j] = value
+                # 남은 부분의 길이 차이를 더한 하한
+                bound = value + abs(j - i - diff)
+                if bound < row_bound:
+                    row_bound = bound
+            if row_bound > max_distance:
+                if instrumentation.ENABLED:
+                    instrumentation.incr('dp_cells', cells)
+                    instrumentation.incr('dp_early_exits')
+                return inf
+            prev = cur
+        if instrumentation.ENABLED:
+            instrumentation.incr('dp_cells', cells)
+        return prev[len2] if prev[len2] <= max_distance else inf
+    
+    def syllable_cost(self, char1, char2):
+        """두 문자(코드 포인트)를 음절로 대체하는 비용 (0~1)
+        
+        초성과 중성의 대체 비용, 종성 자모열(복합 종성은 두 자모, 빈 종성은 빈 열)의 길이로
+        정규화한 거리를 자모열 가중치로 평균합니다. 한글 음절이 아닌 문자는 같으면 0, 다르면
+        1입니다.
+        """
+        if char1 == char2:
+            return 0.0
+        code1 = char1 - self.SYLLABLE_BASE
+        code2 = char2 - self.SYLLABLE_BASE
+        if not (0 <= code1 < self.SYLLABLE_COUNT and 0 <= code2 < self.SYLLABLE_COUNT):
+            return 1.0
+        
+        syllables = self._syllables
+        cho1, jung1, jong1 = syllables[code1]
+        cho2, jung2, jong2 = syllables[code2]
+        jong_len = max(len(jong1), len(jong2))
+        jong = self.distance(jong1, jong2) / jong_len if jong_len else 0.0
+        weights = self.position_weights
+        cost_rows = self._cost_rows
+        return (weights[0] * cost_rows[cho1][cho2]
+                + weights[1] * cost_rows[jung1][jung2]
+                + weights[2] * jong)
+    
+    def syllable_distance(self, text1, text2, max_distance=math.inf):
+        """음절(문자) 단위로 정렬한 가중치 레벤슈타인 거리
+        
+        대체 비용은 syllable_costs 캐시를 거친 syllable_cost, 삽입/삭제 비용은 1입니다.
+        max_distance가 주어지면 한 행의 (값 + 남은 길이 차이) 하한이 모두 이를 넘을 때
+        math.inf를 반환하며, 한도 이내이면 결과는 한도가 없을 때와 같습니다.
+        """
+        cost = self.syllable_costs.cost
+        codes2 = [ord(char) for char in text2]
+        len1, len2 = len(text1), len(codes2)
+        bounded = max_distance != math.inf
+        prev = [float(j) for j in range(len2 + 1)]
+        for i, char1 in enumerate(text1, 1):
+            code1 = ord(char1)
+            cur = [float(i)]
+            for j, code2 in enumerate(codes2, 1):
+                if code1 == code2:
+                    cur.append(prev[j - 1])
+                else:
+                    cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost(code1, code2)))
+            if bounded:
+                rest = len1 - i
+                if min(value + abs(len2 - j - rest) for j, value in enumerate(cur)) > max_distance:
+                    if instrumentation.ENABLED:
+                        instrumentation.incr('syllable_cells', i * len2)
+                        instrumentation.incr('dp_early_exits')
+                    return math.inf
+            prev = cur
+        if instrumentation.ENABLED:
+            instrumentation.incr('syllable_cells', len1 * len2)
+        return prev[-1] if prev[-1] <= max_distance else math.inf
+    
+    def to_arrays(self):
+        """모델을 NumPy 배열 딕셔너리로 변환 (np.savez에 그대로 넘길 수 있음)"""
+        import numpy as np
+        
+        return {
+            'jamo_list': np.array(self.jamo_list, dtype=str),
+            'costs': self.costs,
+            'position_weights': np.array(self.position_weights, dtype=float),
+            'cho_ids': self.cho_ids,
+            'jung_ids': self.jung_ids,
+            'jong_ids': self.jong_ids,
+        }
+    
+    @classmethod
+    def from_arrays(cls, arrays):
+        """to_arrays()의 결과로부터 모델 복원"""
+        return cls(
+            arrays['jamo_list'].tolist(),
+            arrays['costs'],
+            arrays['position_weights'].tolist(),
+            arrays['cho_ids'],
+            arrays['jung_ids'],
+            arrays['jong_ids'],
+        )
+    
+    def fingerprint(self):
+        """점수에 영향을 주는 파라미터(한글 자모 간 대체 비용, 자모열 가중치)의 SHA-256
+        
+        처음 보는 문자는 항상 비용 1로 등록되므로 음절 테이블의 자모만 사용합니다. 따라서
+        jamo_id로 문자가 추가되거나 자모 ID 순서가 달라도 같은 파라미터면 같은 값입니다.
+        """
+        ids = {self.empty_id, *self._cho, *self._jung}
+        ids.update(j for row in self._jong for j in row if j >= 0)
+        ids = sorted(ids, key=lambda i: self.jamo_list[i])
+        
+        sha256 = hashlib.sha256()
+        sha256.update(json.dumps([[self.jamo_list[i] for i in ids], self.position_weights]).encode('utf-8'))
+        # 행 우선 float64 리틀 엔디언 (NumPy 배열의 tobytes()와 같은 바이트)
+        values = [self._cost_rows[a][b] for a in ids for b in ids]
+        sha256.update(struct.pack(f'<{len(values)}d', *values))
+        return sha256.hexdigest()
+    
+    def save(self, path):
+        """모델을 .npz 파일로 저장"""
+        import numpy as np
+        
+        np.savez(path, **self.to_arrays())
+    
+    @classmethod
+    def load(cls, path):
+        """save()로 저장한 모델 불러오기"""
+        import numpy as np
+        
+        with np.load(path) as data:
+            return cls.from_arrays(data)
+
+
+class SyllableCostCache:
+    """두 음절 코드 포인트 쌍의 대체 비용을 처음 쓸 때 계산해 보관하는 크기 제한 LRU 캐시
+    
+    비용은 대칭이므로 (작은 코드 포인트, 큰 코드 포인트) 쌍 하나로 저장합니다.
+    """
+    
+    def __init__(self, model, max_size=KoreanPhoneticModel.SYLLABLE_CACHE_SIZE):
+        self.model = model
+        self.max_size = max_size
+        self._costs = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def __len__(self):
+        return len(self._costs)
+    
+    def cost(self, char1, char2):
+        """model.syllable_cost(char1, char2)를 캐시를 거쳐 반환"""
+        # 코드 포인트는 21비트 이내이므로 두 값을 정수 하나로 묶어 키로 사용
+        key = char1 << 21 | char2 if char1 <= char2 else char2 << 21 | char1
+        cost = self._costs.get(key)
+        if cost is not None:
+            self.hits += 1
+            self._costs.move_to_end(key)
+            return cost
+        
+        self.misses += 1
+        cost = self._costs[key] = self.model.syllable_cost(char1, char2)
+        if len(self._costs) > self.max_size:
+            self._costs.popitem(last=False)
+        return cost
+    
+    def stats(self):
+        """캐시 크기와 적중률"""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._costs),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+
+def _to_text(value):
+    """None/NaN을 빈 문자열로 바꾸어 문자열로 변환"""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ''
+    return str(value)
+
+
+def _as_sequence(values):
+    """NumPy 배열은 리스트로 바꾸고 그 밖의 시퀀스는 그대로 사용"""
+    return values.tolist() if hasattr(values, 'tolist') else values
+
+
+def _batch_levenshtein_jamo(query, codes, costs):
+    """하나의 자모 ID 시퀀스와 같은 길이의 후보 시퀀스 묶음 간의 가중치 레벤슈타인 거리
+    
+    KoreanPhoneticModel.distance와 같은 점화식을 후보 축으로 벡터화하여 계산합니다.
+    """
+    import numpy as np
+    
+    count, length = codes.shape
+    prev = np.tile(np.arange(length + 1, dtype=float), (count, 1))
+    for i, jamo in enumerate(query, 1):
+        # 삭제, 대체 비용은 이전 행만으로 한 번에 계산
+        best = np.minimum(prev[:, :-1] + costs[jamo][codes], prev[:, 1:] + 1)
+        cur = np.empty_like(prev)
+        cur[:, 0] = i
+        # 삽입 비용은 같은 행의 왼쪽 칸에 의존하므로 열 단위로 진행
+        for j in range(length):
+            cur[:, j + 1] = np.minimum(best[:, j], cur[:, j] + 1)
+        prev = cur
+    return prev[:, length]
+
+
+def _top_k_indices_by(scores, keys, k):
+    """유사도 내림차순 상위 k개의 위치 (동점이면 keys가 작은 쪽 우선)"""
+    import numpy as np
+    
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.array([], dtype=np.int64)
+    kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+    candidates = np.flatnonzero(scores >= kth)
+    return candidates[np.lexsort((keys[candidates], -scores[candidates]))][:k]
+
+
+class KoreanPhoneticLexicon:
+    """발음 사전을 자모 ID 배열로 한 번 인코딩해 두고 쿼리와 일괄 비교하는 클래스
+    
+    후보를 초성/중성/종성 시퀀스 길이별로 묶어 각 묶음에 대해 DP를 NumPy로
+    한꺼번에 수행합니다. 결과는 weighted_levenshtein과 일치합니다.
+    
+    score_many/top_k_indices/top_k에 scoring='syllable'을 주면 syllable_similarity로 계산합니다.
+    이때는 후보를 음절 어휘 ID 배열로 한 번 인코딩해 두고, 쿼리 음절과 어휘 음절 간 비용
+    행렬로 같은 일괄 DP를 수행합니다.
+    """
+    
+    # top_k에서 한 번에 점수를 계산하는 후보 수
+    chunk_size = 2048
+    
+    # 음절 단위 점수에서 비용 행렬을 보관할 최근 쿼리 수 (한 쿼리를 여러 후보 묶음과 비교할 때 재사용)
+    query_costs_size = 64
+    
+    def __init__(self, pronunciations, words=None, kps=None):
+        import numpy as np
+        
+        self.kps = kps if kps is not None else KoreanPhoneticSimilarity()
+        self.pronunciations = [_to_text(p) for p in pronunciations]
+        self.words = list(words) if words is not None else list(self.pronunciations)
+        if len(self.words) != len(self.pronunciations):
+            raise ValueError("words와 pronunciations의 길이가 다릅니다.")
+        
+        model = self.kps.model
+        encoded = [model.encode(p) for p in self.pronunciations]
+        
+        # 초성, 중성, 종성 각각을 (후보 수, 최대 길이) 배열로 패딩하여 저장
+        self.lengths = []
+        self.codes = []
+        for stream in range(3):
+            seqs = [codes[stream] for codes in encoded]
+            lengths = np.array([len(seq) for seq in seqs], dtype=np.int64)
+            codes = np.full((len(seqs), max(lengths, default=0)), -1, dtype=np.int32)
+            for i, seq in enumerate(seqs):
+                codes[i, :len(seq)] = seq
+            self.lengths.append(lengths)
+            self.codes.append(codes)
+        self._syllables = None
+        self._query_costs = OrderedDict()
+    
+    def __len__(self):
+        return len(self.pronunciations)
+    
+    def to_arrays(self):
+        """인코딩된 사전을 NumPy 배열 딕셔너리로 변환 (모델은 포함하지 않음)"""
+        import numpy as np
+        
+        arrays = {
+            'words': np.array([str(word) for word in self.words], dtype=str),
+            'pronunciations': np.array(self.pronunciations, dtype=str),
+        }
+        for stream, (lengths, codes) in enumerate(zip(self.lengths, self.codes)):
+            arrays[f'lengths_{stream}'] = lengths
+            arrays[f'codes_{stream}'] = codes
+        return arrays
+    
+    @classmethod
+    def from_arrays(cls, arrays, kps):
+        """to_arrays()의 결과로부터 다시 인코딩하지 않고 사전을 복원
+        
+        kps의 모델은 사전을 인코딩할 때 사용한 것과 같은 자모 ID를 가져야 합니다.
+        words/pronunciations는 NumPy 배열 대신 인덱싱 가능한 문자열 목록이어도 됩니다.
+        """
+        lexicon = cls.__new__(cls)
+        lexicon.kps = kps
+        lexicon.words = _as_sequence(arrays['words'])
+        lexicon.pronunciations = _as_sequence(arrays['pronunciations'])
+        lexicon.lengths = [arrays[f'lengths_{stream}'] for stream in range(3)]
+        lexicon.codes = [arrays[f'codes_{stream}'] for stream in range(3)]
+        lexicon._syllables = None
+        lexicon._query_costs = OrderedDict()
+        return lexicon
+    
+    def score_many(self, query, index=None, scoring='jamo'):
+        """쿼리와 사전의 유사도를 사전 순서대로 반환
+        
+        Args:
+            query (str): 비교할 발음 문자열
+            index (np.ndarray, optional): 일부 후보만 계산할 때의 후보 인덱스
+            scoring (str): 'jamo'면 weighted_levenshtein, 'syllable'이면 syllable_similarity
+        """
+        import numpy as np
+        
+        if scoring == 'syllable':
+            return self._syllable_score_many(_to_text(query), index)
+        
+        model = self.kps.model
+        query_codes = model.encode_arrays(_to_text(query))
+        costs = model.costs
+        if index is None:
+            index = np.arange(len(self))
+        
+        total_dist = np.zeros(len(index))
+        for weight, seq, lengths, codes in zip(model.position_weights, query_codes, self.lengths, self.codes):
+            lengths = lengths[index]
+            if instrumentation.ENABLED:
+                instrumentation.incr('dp_cells', len(seq) * int(lengths.sum()))
+            dist = np.empty(len(index))
+            for length in np.unique(lengths):
+                group = np.flatnonzero(lengths == length)
+                dist[group] = _batch_levenshtein_jamo(seq, codes[index[group], :length], costs)
+            
+            # 각 자모열의 최대 길이로 정규화
+            max_len = np.maximum(len(seq), lengths)
+            np.divide(dist, max_len, out=dist, where=max_len > 0)
+            total_dist += weight * dist
+        
+        return 1.0 - total_dist
+    
+    def _syllable_encoding(self):
+        """후보 발음의 음절 어휘(코드 포인트 리스트), 음절 수, (후보 수, 최대 길이) 어휘 ID 배열
+        
+        음절 단위 점수를 처음 계산할 때 한 번 만듭니다.
+        """
+        if self._syllables is None:
+            import numpy as np
+            
+            vocab = {}
+            seqs = [[vocab.setdefault(ord(char), len(vocab)) for char in p] for p in self.pronunciations]
+            lengths = np.array([len(seq) for seq in seqs], dtype=np.int64)
+            codes = np.full((len(seqs), max(lengths, default=0)), -1, dtype=np.int32)
+            for i, seq in enumerate(seqs):
+                codes[i, :len(seq)] = seq
+            self._syllables = (list(vocab), lengths, codes)
+        return self._syllables
+    
+    def _syllable_query_costs(self, query):
+        """쿼리의 각 음절과 어휘의 모든 음절 간 대체 비용 행렬 (최근 query_costs_size개 쿼리는 재사용)
+        
+        비용은 모델의 syllable_costs 캐시를 거치므로 처음 보는 쿼리라도 이미 나온 음절 쌍은
+        다시 계산하지 않습니다.
+        """
+        import numpy as np
+        
+        costs = self._query_costs.get(query)
+        if costs is not None:
+            self._query_costs.move_to_end(query)
+            return costs
+        
+        vocab = self._syllable_encoding()[0]
+        cache = self.kps.model.syllable_costs
+        hits, misses = cache.hits, cache.misses
+        cost = cache.cost
+        costs = np.array([[cost(ord(char), code) for code in vocab] for char in query], dtype=float)
+        costs = costs.reshape(len(query), len(vocab))
+        if instrumentation.ENABLED:
+            instrumentation.incr('syllable_cost_hits', cache.hits - hits)
+            instrumentation.incr('syllable_cost_misses', cache.misses - misses)
+        self._query_costs[query] = costs
+        while len(self._query_costs) > self.query_costs_size:
+            self._query_costs.popitem(last=False)
+        return costs
+    
+    def _syllable_score_many(self, query, index=None):
+        """score_many의 음절 단위 점수 (syllable_similarity와 일치)"""
+        import numpy as np
+        
+        _, lengths, codes = self._syllable_encoding()
+        costs = self._syllable_query_costs(query)
+        if index is None:
+            index = np.arange(len(self))
+        
+        lengths = lengths[index]
+        if instrumentation.ENABLED:
+            instrumentation.incr('syllable_cells', len(query) * int(lengths.sum()))
+        dist = np.empty(len(index))
+        for length in np.unique(lengths):
+            group = np.flatnonzero(lengths == length)
+            # 쿼리의 i번째 음절 비용은 costs[i] 행이므로 쿼리 자리에 위치 번호를 넘김
+            dist[group] = _batch_levenshtein_jamo(range(len(query)), codes[index[group], :length], costs)
+        
+        max_len = np.maximum(len(query), lengths)
+        np.divide(dist, max_len, out=dist, where=max_len > 0)
+        return 1.0 - dist
+    
+    def similarity_upper_bounds(self, query, scoring='jamo'):
+        """자모열(음절 단위 점수면 음절) 길이 차이만으로 구한 후보별 유사도 상한
+        
+        삽입/삭제 비용이 1이므로 각 자모열의 거리는 길이 차이 이상입니다.
+        score_many와 같은 순서로 연산하므로 실제 유사도는 항상 이 값 이하입니다.
+        """
+        import numpy as np
+        
+        if scoring == 'syllable':
+            _, lengths, _ = self._syllable_encoding()
+            query_len = len(_to_text(query))
+            dist = np.abs(lengths - query_len).astype(float)
+            max_len = np.maximum(query_len, lengths)
+            np.divide(dist, max_len, out=dist, where=max_len > 0)
+            return 1.0 - dist
+        
+        model = self.kps.model
+        query_codes = model.encode(_to_text(query))
+        
+        total_dist = np.zeros(len(self))
+        for weight, seq, lengths in zip(model.position_weights, query_codes, self.lengths):
+            dist = np.abs(lengths - len(seq)).astype(float)
+            max_len = np.maximum(len(seq), lengths)
+            np.divide(dist, max_len, out=dist, where=max_len > 0)
+            total_dist += weight * dist
+        
+        return 1.0 - total_dist
+    
+    def top_k_indices(self, query, k=5, scoring='jamo'):
+        """쿼리와 가장 유사한 k개의 (후보 인덱스, 유사도) 배열
+        
+        유사도 상한이 높은 후보부터 묶음 단위로 계산하며, 현재 k번째 유사도를
+        넘을 수 없는 후보는 DP 없이 건너뛰고 남은 상한이 모두 그보다 낮으면 종료합니다.
+        """
+        import numpy as np
+        
+        if scoring not in SCORING_MODES:
+            raise ValueError(f"지원하지 않는 점수 방식입니다: {scoring}")
+        if k <= 0 or len(self) == 0:
+            return np.array([], dtype=np.int64), np.array([])
+        
+        bounds = self.similarity_upper_bounds(query, scoring)
+        order = np.argsort(-bounds, kind='stable')
+        
+        best_index = np.array([], dtype=np.int64)
+        best_scores = np.array([])
+        scored = 0
+        for start in range(0, len(order), self.chunk_size):
+            chunk = order[start:start + self.chunk_size]
+            if len(best_index) == k:
+                kth = best_scores[-1]
+                if bounds[chunk[0]] < kth:
+                    break
+                chunk = chunk[bounds[chunk] >= kth]
+            
+            index = np.concatenate([best_index, chunk])
+            scores = np.concatenate([best_scores, self.score_many(query, chunk, scoring)])
+            top = _top_k_indices_by(scores, index, k)
+            best_index, best_scores = index[top], scores[top]
+            scored += len(chunk)
+        
+        if instrumentation.ENABLED:
+            instrumentation.incr('topk_queries')
+            instrumentation.incr('candidates_scored', scored)
+            instrumentation.incr('candidates_pruned', len(self) - scored)
+        return best_index, best_scores
+    
+    def top_k(self, query, k=5, scoring='jamo'):
+        """쿼리와 가장 유사한 k개의 (단어, 유사도) 리스트
+        
+        유사도가 같으면 사전에 먼저 나온 단어가 앞에 옵니다.
+        """
+        index, scores = self.top_k_indices(query, k, scoring)
+        return [(self.words[i], float(score)) for i, score in zip(index, scores)]
 
 
 # 사용 예시
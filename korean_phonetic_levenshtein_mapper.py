@@ -1,68 +1,579 @@
-import pandas as pd
-from korean_phonetic_levenshtein import KoreanPhoneticSimilarity
-from tqdm import tqdm
-
-# CSV 파일 읽기
-kss_df = pd.read_csv('dict/final/kss-dict-ipa-pronunciation.csv')
-ko_df = pd.read_csv('dict/final/ko-dict-pronunciation.csv')
-
-# 발음 유사도 계산기 초기화
-kps = KoreanPhoneticSimilarity()
-
-# 결과를 저장할 리스트
-result_data = []
-
-# 각 KSS 단어에 대해 처리
-for _, kss_row in tqdm(kss_df.iterrows(), total=len(kss_df), desc="단어 매핑 중"):
-    word = kss_row['word']
-    # NaN 값 처리
-    if pd.isna(kss_row['pronunciation']):
-        pronunciation = ''
-    else:
-        pronunciation = str(kss_row['pronunciation'])
-    
-    # 유사도 계산 결과를 저장할 리스트
-    similarities = []
-    
-    # 각 KO 단어와의 유사도 계산
-    for _, ko_row in ko_df.iterrows():
+"""
+KSS 단어 발음과 가장 유사한 KO 사전 단어를 찾아 매핑하는 스크립트
+
+    python korean_phonetic_levenshtein_mapper.py --workers 8
+
+KO 사전은 같은 발음끼리 묶어 고유 발음만 한 번 인코딩하고, 쿼리 발음별 결과는 LRU 캐시에
+보관합니다. --workers가 2 이상이면 KSS 단어 목록을 여러 프로세스에 나누어 처리합니다.
+각 단어의 결과는 작업자 수나 캐시 크기와 관계없이 항상 같습니다.
+
+결과는 일정 개수마다 출력 CSV에 이어 쓰고 완료된 단어를 체크포인트 파일에 기록하므로,
+중단된 작업은 --resume으로 이어서 실행할 수 있습니다.
+
+--lexicon으로 korean_phonetic_store.py build가 만든 바이너리 사전을 주면 CSV 파싱과 인코딩 없이
+파일을 메모리 매핑하여 바로 사용합니다. pandas와 tqdm은 CSV를 읽거나 진행 상황을 표시할 때만
+불러오므로 PronunciationMatcher.load만 쓰는 단어 조회(soundle.py similar)는 빨리 시작합니다.
+
+--scoring syllable은 자모열별 정렬 대신 음절 단위로 정렬한 syllable_similarity로 순위를 매깁니다.
+DP 길이가 약 1/3로 줄고 음절 쌍 대체 비용은 캐시에 한 번만 계산합니다.
+
+실행이 끝나면 입력 행과 점수 파라미터의 지문, 단어별 top-k를 <output>.state.json에 저장합니다.
+--incremental로 실행하면 바뀐 부분만 계산합니다: 새 KSS 단어(또는 발음이 바뀐 단어)는 전체 사전과,
+기존 단어는 새로 추가된 KO 항목과만 비교하여 저장된 top-k에 병합하고, top-k에 있던 KO 항목이
+삭제된 단어만 다시 계산합니다. 가중치 등 점수 파라미터가 바뀌면 전체를 다시 계산합니다.
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import multiprocessing
+import os
+from collections import OrderedDict
+
+import instrumentation
+from korean_phonetic_levenshtein import SCORING_MODES, KoreanPhoneticSimilarity, KoreanPhoneticLexicon, _to_text
+from korean_phonetic_store import LexiconFile, group_pronunciations
+
+KSS_PATH = 'dict/final/kss-dict-ipa-pronunciation.csv'
+KO_PATH = 'dict/final/ko-dict-pronunciation.csv'
+OUTPUT_PATH = 'dict/final/kss-dict-ipa-pronunciation-mapped-result.csv'
+
+# 증분 매핑 상태 파일 형식 버전
+STATE_VERSION = 1
+
+# 작업자 프로세스에서 공유하는 KO 사전 (풀 초기화 때 한 번만 설정)
+_worker_matcher = None
+_worker_k = 5
+
+
+class PronunciationMatcher:
+    """같은 발음의 KO 단어를 하나의 발음 키로 묶어 계산하고 쿼리 결과를 캐시하는 클래스
+
+    유사도는 발음 키 단위로 계산하며, 쿼리 발음별 상위 키 순위는 LRU 캐시에 보관합니다.
+    단어로는 출력할 때만 펼치며, 펼친 결과는 단어별로 계산한 top-k와 같습니다
+    (유사도가 같으면 사전에 먼저 나온 단어가 앞).
+
+    scoring은 KoreanPhoneticLexicon.top_k_indices의 점수 방식('jamo' 또는 'syllable')입니다.
+    """
+
+    def __init__(self, pronunciations, words, kps=None, cache_size=4096, scoring='jamo'):
+        self.words = list(words)
+        self.scoring = scoring
+
+        # 발음 키 i의 단어 인덱스: key_members[key_offsets[i]:key_offsets[i + 1]] (사전 순서)
+        unique, self.key_offsets, self.key_members = group_pronunciations(pronunciations)
+        self.lexicon = KoreanPhoneticLexicon(unique, kps=kps)
+        self.path = None
+        self._init_cache(cache_size)
+
+    def _init_cache(self, cache_size):
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, path, cache_size=4096, scoring='jamo'):
+        """바이너리 사전 파일(korean_phonetic_store.py)을 메모리 매핑하여 생성"""
+        lexicon_file = LexiconFile(path)
+        matcher = cls.__new__(cls)
+        matcher.scoring = scoring
+        matcher.words = lexicon_file.words
+        matcher.key_offsets = lexicon_file.key_offsets
+        matcher.key_members = lexicon_file.key_members
+        matcher.lexicon = lexicon_file.lexicon
+        matcher.path = path
+        matcher._init_cache(cache_size)
+        return matcher
+
+    def __reduce__(self):
+        # 파일에서 불러온 경우 다른 프로세스에는 배열 대신 경로만 넘겨 같은 파일을 매핑
+        if self.path is not None:
+            return type(self).load, (self.path, self.cache_size, self.scoring)
+        return super().__reduce__()
+
+    def __len__(self):
+        return len(self.words)
+
+    def rank_keys(self, pronunciation, k):
+        """캐시를 거치지 않고 상위 k개의 (발음 키 인덱스, 유사도) 배열을 계산"""
+        return self.lexicon.top_k_indices(pronunciation, k, self.scoring)
+
+    def is_cached(self, pronunciation, k):
+        return (pronunciation, k) in self._cache
+
+    def remember(self, pronunciation, k, ranked):
+        """계산한 키 순위를 캐시에 저장 (캐시 미스로 집계)"""
+        self.misses += 1
+        instrumentation.incr('cache_misses')
+        if self.cache_size <= 0:
+            return
+        self._cache[(pronunciation, k)] = ranked
+        self._cache.move_to_end((pronunciation, k))
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def ranked_keys(self, pronunciation, k):
+        """캐시를 사용해 상위 k개의 (발음 키 인덱스, 유사도) 배열을 반환"""
+        ranked = self._cache.get((pronunciation, k))
+        if ranked is not None:
+            self.hits += 1
+            instrumentation.incr('cache_hits')
+            self._cache.move_to_end((pronunciation, k))
+            return ranked
+
+        ranked = self.rank_keys(pronunciation, k)
+        self.remember(pronunciation, k, ranked)
+        return ranked
+
+    def expand_indices(self, ranked, k):
+        """발음 키 순위를 상위 k개의 (단어 인덱스, 유사도) 리스트로 펼치기
+
+        상위 k개 키에 속한 단어만으로 단어 단위 top-k를 정확히 구할 수 있습니다.
+        """
+        keys, scores = ranked
+        offsets, members = self.key_offsets, self.key_members
+        candidates = [
+            (float(score), int(i))
+            for key, score in zip(keys, scores)
+            for i in members[offsets[key]:offsets[key + 1]]
+        ]
+        candidates.sort(key=lambda item: (-item[0], item[1]))
+        return [(i, score) for score, i in candidates[:k]]
+
+    def expand(self, ranked, k):
+        """발음 키 순위를 상위 k개의 (단어, 유사도) 리스트로 펼치기"""
+        return [(self.words[i], score) for i, score in self.expand_indices(ranked, k)]
+
+    def pronunciations(self):
+        """사전 순서의 단어별 발음 리스트"""
+        import numpy as np
+
+        key_of_word = np.empty(len(self.words), dtype=np.int64)
+        key_of_word[self.key_members] = np.repeat(np.arange(len(self.lexicon)), np.diff(self.key_offsets))
+        return [self.lexicon.pronunciations[key] for key in key_of_word.tolist()]
+
+    def top_k(self, pronunciation, k=5):
+        """쿼리 발음과 가장 유사한 k개의 (단어, 유사도) 리스트"""
+        pronunciation = _to_text(pronunciation)
+        return self.expand(self.ranked_keys(pronunciation, k), k)
+
+    def stats(self):
+        """중복 제거 비율과 캐시 적중률 (음절 단위 점수면 이 프로세스의 음절 쌍 비용 캐시 포함)"""
+        lookups = self.hits + self.misses
+        stats = {
+            'rows': len(self.words),
+            'unique_pronunciations': len(self.lexicon),
+            'dedup_ratio': len(self.lexicon) / len(self.words) if len(self.words) else 1.0,
+            'cache_hits': self.hits,
+            'cache_misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+        if self.scoring == 'syllable':
+            stats['syllable_costs'] = self.lexicon.kps.model.syllable_costs.stats()
+        return stats
+
+
+def load_queries(path=KSS_PATH):
+    """KSS CSV에서 (단어, 발음) 리스트를 읽기 (NaN 발음은 빈 문자열)"""
+    import pandas as pd
+
+    kss_df = pd.read_csv(path)
+
+    queries = []
+    for word, pronunciation in zip(kss_df['word'], kss_df['pronunciation']):
         # NaN 값 처리
-        if pd.isna(ko_row['pronunciation']):
-            ko_pronunciation = ''
+        if pd.isna(pronunciation):
+            pronunciation = ''
         else:
-            ko_pronunciation = str(ko_row['pronunciation'])
-            
-        similarity = kps.weighted_levenshtein(pronunciation, ko_pronunciation)
-        similarities.append((ko_row['word'], similarity))
-    
-    # 유사도 기준으로 정렬하고 상위 5개 선택
-    similarities.sort(key=lambda x: x[1], reverse=True)
-    top_5 = similarities[:5]
-    
-    # 결과 데이터에 추가
-    result_row = {
+            pronunciation = str(pronunciation)
+        queries.append((word, pronunciation))
+    return queries
+
+
+def load_matcher(path=KO_PATH, kps=None, cache_size=4096, scoring='jamo'):
+    """KO 사전 CSV를 고유 발음 단위로 한 번만 인코딩한 PronunciationMatcher로 읽기"""
+    import pandas as pd
+
+    ko_df = pd.read_csv(path)
+    return PronunciationMatcher(ko_df['pronunciation'], ko_df['word'], kps=kps, cache_size=cache_size,
+                                scoring=scoring)
+
+
+def _init_worker(matcher, k):
+    global _worker_matcher, _worker_k
+    _worker_matcher = matcher
+    _worker_k = k
+
+
+def _rank_query(pronunciation):
+    return _worker_matcher.rank_keys(pronunciation, _worker_k)
+
+
+def map_words(queries, matcher, k=5, workers=1, chunksize=4, indices=False):
+    """각 (단어, 발음)에 대해 (단어, 발음, 상위 k개 (유사 단어, 유사도)) 를 입력 순서대로 생성
+
+    indices가 True이면 유사 단어 대신 KO 사전의 단어 인덱스를 돌려줍니다.
+    workers가 2 이상이면 캐시에 없는 고유 발음만 프로세스 풀에서 계산합니다. 사전은
+    작업자마다 초기화 때 한 번만 전달되며, fork를 지원하는 환경에서는 복사 없이 부모
+    프로세스의 메모리를 그대로 읽습니다.
+    """
+    expand = matcher.expand_indices if indices else matcher.expand
+    if workers <= 1:
+        for word, pronunciation in queries:
+            yield word, pronunciation, expand(matcher.ranked_keys(_to_text(pronunciation), k), k)
+        return
+
+    queries = [(word, _to_text(pronunciation)) for word, pronunciation in queries]
+    pending = [p for p in dict.fromkeys(p for _, p in queries) if not matcher.is_cached(p, k)]
+
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+    with context.Pool(workers, initializer=_init_worker, initargs=(matcher, k)) as pool:
+        # 작업자 결과는 pending 순서(각 발음이 처음 나온 순서)대로 도착
+        results = pool.imap(_rank_query, pending, chunksize=chunksize)
+        next_pending = 0
+        for word, pronunciation in queries:
+            if next_pending < len(pending) and pronunciation == pending[next_pending]:
+                ranked = next(results)
+                matcher.remember(pronunciation, k, ranked)
+                next_pending += 1
+            else:
+                ranked = matcher.ranked_keys(pronunciation, k)
+            yield word, pronunciation, expand(ranked, k)
+
+
+def row_fingerprints(words, pronunciations):
+    """KO 사전 행별 지문 (같은 (단어, 발음) 행이 여러 번 나오면 몇 번째인지도 포함)"""
+    seen = {}
+    fingerprints = []
+    for word, pronunciation in zip(words, pronunciations):
+        row = f'{word}\t{_to_text(pronunciation)}'
+        occurrence = seen[row] = seen.get(row, -1) + 1
+        fingerprints.append(hashlib.sha1(f'{row}\t{occurrence}'.encode('utf-8')).hexdigest()[:16])
+    return fingerprints
+
+
+def query_key(word, pronunciation):
+    return f'{word}\t{_to_text(pronunciation)}'
+
+
+def load_state(path):
+    """증분 매핑 상태 읽기 (없거나 형식이 다르면 None)"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state if state.get('version') == STATE_VERSION else None
+
+
+def save_state(path, state):
+    """증분 매핑 상태를 임시 파일에 쓴 뒤 이름을 바꾸어 저장"""
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+class IncrementalMapper:
+    """이전 실행의 상태와 비교해 바뀐 부분만 계산하는 매핑
+
+    저장된 top-k는 이전 KO 사전 전체에 대한 결과이므로, 그 안의 항목이 하나도 삭제되지
+    않았다면 새 KO 항목에 대한 top-k와 병합한 결과가 새 사전 전체에 대한 top-k와 같습니다.
+    유사도가 같을 때는 사전 순서를 쓰므로, 남은 기존 항목의 상대 순서가 바뀌었으면 전체를
+    다시 계산합니다.
+    """
+
+    def __init__(self, matcher, state=None, k=5):
+        self.matcher = matcher
+        self.k = k
+        self.params = matcher.lexicon.kps.model.fingerprint()
+        self.scoring = matcher.scoring
+        self.fingerprints = row_fingerprints(matcher.words, matcher.pronunciations())
+        self.counts = {'reused': 0, 'merged': 0, 'full': 0}
+
+        self.previous = {}
+        self.added = list(range(len(self.fingerprints)))
+        self.removed = set()
+        reason = self._check(state)
+        if reason is None:
+            current = set(self.fingerprints)
+            old = set(state['ko_rows'])
+            self.previous = state['queries']
+            self.added = [i for i, fp in enumerate(self.fingerprints) if fp not in old]
+            self.removed = old - current
+        self.invalidated = reason
+
+    def _check(self, state):
+        """이전 상태를 쓸 수 없으면 그 이유, 쓸 수 있으면 None"""
+        if state is None:
+            return "이전 상태 없음"
+        if state['params'] != self.params:
+            return "점수 파라미터 변경"
+        if state.get('scoring', 'jamo') != self.scoring:
+            return "점수 방식 변경"
+        if state['k'] != self.k:
+            return "top-k 변경"
+        index = {fp: i for i, fp in enumerate(self.fingerprints)}
+        survivors = [index[fp] for fp in state['ko_rows'] if fp in index]
+        if any(a > b for a, b in zip(survivors, survivors[1:])):
+            return "KO 사전 순서 변경"
+        return None
+
+    def map_words(self, queries, workers=1):
+        """(단어, 발음, 상위 k개 (KO 단어 인덱스, 유사도))를 입력 순서대로 생성"""
+        queries = [(word, _to_text(pronunciation)) for word, pronunciation in queries]
+        index = {fp: i for i, fp in enumerate(self.fingerprints)}
+
+        full, merge = [], []
+        plan = []
+        for word, pronunciation in queries:
+            entry = self.previous.get(query_key(word, pronunciation))
+            if entry is None or any(fp in self.removed for fp, _ in entry):
+                plan.append('full')
+                full.append((word, pronunciation))
+            elif self.added:
+                plan.append('merged')
+                merge.append((word, pronunciation))
+            else:
+                plan.append('reused')
+
+        full_results = map_words(full, self.matcher, self.k, workers, indices=True)
+        merge_results = iter(())
+        if merge:
+            # 새 KO 항목만으로 만든 사전 (단어 자리에 전체 사전의 인덱스를 넣어 바로 병합)
+            pronunciations = self.matcher.pronunciations()
+            added = PronunciationMatcher([pronunciations[i] for i in self.added], self.added,
+                                         kps=self.matcher.lexicon.kps, scoring=self.scoring)
+            merge_results = map_words(merge, added, self.k, workers)
+
+        for (word, pronunciation), action in zip(queries, plan):
+            self.counts[action] += 1
+            if action == 'full':
+                yield next(full_results)
+                continue
+
+            stored = [(index[fp], score) for fp, score in self.previous[query_key(word, pronunciation)]]
+            if action == 'merged':
+                _, _, new = next(merge_results)
+                stored = sorted(stored + new, key=lambda item: (-item[1], item[0]))[:self.k]
+            yield word, pronunciation, stored
+
+    def state(self, results):
+        """{(단어, 발음): top-k 인덱스} 결과로 다음 실행에 쓸 상태 생성"""
+        return {
+            'version': STATE_VERSION,
+            'params': self.params,
+            'scoring': self.scoring,
+            'k': self.k,
+            'ko_rows': self.fingerprints,
+            'queries': {
+                query_key(word, pronunciation): [[self.fingerprints[i], score] for i, score in top]
+                for (word, pronunciation), top in results.items()
+            },
+        }
+
+
+def result_columns(k):
+    """출력 CSV의 컬럼 (word, pronunciation, similar_word_i, similarity_i)"""
+    columns = ['word', 'pronunciation']
+    for i in range(1, k + 1):
+        columns += [f'similar_word_{i}', f'similarity_{i}']
+    return columns
+
+
+def result_row(word, pronunciation, top):
+    """출력 CSV의 한 행 (word, pronunciation, similar_word_i, similarity_i)"""
+    row = {
         'word': word,
         'pronunciation': pronunciation
     }
-    
-    # 상위 5개 단어를 컬럼으로 추가
-    for i, (similar_word, similarity) in enumerate(top_5, 1):
-        result_row[f'similar_word_{i}'] = similar_word
-        result_row[f'similarity_{i}'] = similarity
-    
-    result_data.append(result_row)
-    
-    # 매핑 결과 출력
-    print(f"\n단어: {word}")
-    print(f"발음: {pronunciation}")
-    print("유사 단어:")
-    for i, (similar_word, similarity) in enumerate(top_5, 1):
-        print(f"{i}. {similar_word} (유사도: {similarity:.4f})")
-
-# DataFrame으로 변환
-result_df = pd.DataFrame(result_data)
-
-# 새로운 CSV 파일로 저장
-result_df.to_csv('dict/final/kss-dict-ipa-pronunciation-mapped-result.csv', index=False, encoding='utf-8-sig')
-
-print(f"\n총 {len(result_df)}개의 단어에 대한 유사 단어 매핑이 완료되었습니다.")
\ No newline at end of file
+
+    # 상위 단어를 컬럼으로 추가
+    for i, (similar_word, similarity) in enumerate(top, 1):
+        row[f'similar_word_{i}'] = similar_word
+        row[f'similarity_{i}'] = similarity
+    return row
+
+
+class CheckpointedCsvWriter:
+    """결과 행을 일정 개수마다 CSV에 이어 쓰고 완료된 단어를 체크포인트에 기록하는 클래스
+
+    체크포인트는 한 줄에 하나의 JSON({"offset": 출력 파일 크기, "words": [...]})을 덧붙이는
+    형식입니다. 출력 파일을 먼저 flush/fsync한 뒤 체크포인트를 기록하므로, 이어서 실행할 때는
+    마지막으로 기록된 offset 뒤의 (체크포인트에 없는) 행을 잘라내고 다시 계산합니다.
+    """
+
+    def __init__(self, path, columns, checkpoint_path=None, resume=False, batch_size=100):
+        self.path = path
+        self.columns = columns
+        self.checkpoint_path = checkpoint_path or f'{path}.checkpoint'
+        self.batch_size = batch_size
+        self.done = set()
+        self.written = 0
+        self._rows = []
+        self._words = []
+
+        offset = self._load_checkpoint() if resume else None
+        if offset is None:
+            # 새로 시작: 출력 파일과 체크포인트를 비우고 헤더 기록
+            self.done = set()
+            self._file = open(self.path, 'w', newline='', encoding='utf-8-sig')
+            csv.writer(self._file, lineterminator='\n').writerow(self.columns)
+            self._file.flush()
+            with open(self.checkpoint_path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({'offset': self._file.tell(), 'words': []}, ensure_ascii=False) + '\n')
+        else:
+            self._file = open(self.path, 'r+', newline='', encoding='utf-8')
+            self._file.truncate(offset)
+            self._file.seek(offset)
+        self._writer = csv.DictWriter(self._file, fieldnames=self.columns, lineterminator='\n')
+
+    def _load_checkpoint(self):
+        """체크포인트에서 완료된 단어를 읽고 마지막으로 확정된 출력 파일 크기를 반환"""
+        if not os.path.exists(self.checkpoint_path) or not os.path.exists(self.path):
+            return None
+
+        offset = None
+        with open(self.checkpoint_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # 기록 도중 중단된 마지막 줄은 무시
+                    break
+                offset = entry['offset']
+                self.done.update(entry['words'])
+
+        if offset is None or os.path.getsize(self.path) < offset:
+            return None
+        return offset
+
+    def write(self, word, row):
+        self._rows.append(row)
+        self._words.append(word)
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """버퍼의 행을 출력 파일에 쓰고 체크포인트에 완료된 단어를 기록"""
+        if not self._rows:
+            return
+        self._writer.writerows(self._rows)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+        with open(self.checkpoint_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'offset': self._file.tell(), 'words': self._words}, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+        self.done.update(self._words)
+        self.written += len(self._rows)
+        self._rows = []
+        self._words = []
+
+    def close(self, completed=False):
+        """남은 행을 기록하고 파일을 닫음 (모두 완료되면 체크포인트 삭제)"""
+        self.flush()
+        self._file.close()
+        if completed and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(completed=exc_type is None)
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KSS 단어와 발음이 유사한 KO 사전 단어 매핑")
+    parser.add_argument('--kss', default=KSS_PATH, help="KSS 단어/발음 CSV")
+    parser.add_argument('--ko', default=KO_PATH, help="KO 사전 발음 CSV")
+    parser.add_argument('--lexicon', help="KO 사전 바이너리 파일 (주어지면 --ko 대신 사용)")
+    parser.add_argument('--output', default=OUTPUT_PATH, help="매핑 결과 CSV")
+    parser.add_argument('--top-k', type=int, default=5, help="단어별로 저장할 유사 단어 수")
+    parser.add_argument('--scoring', choices=SCORING_MODES, default='jamo',
+                        help="jamo: 초성/중성/종성 자모열별 정렬, syllable: 음절 단위 정렬")
+    parser.add_argument('--workers', type=int, default=1, help="병렬 처리 프로세스 수")
+    parser.add_argument('--cache-size', type=int, default=4096, help="쿼리 발음별 결과 LRU 캐시 크기")
+    parser.add_argument('--batch-size', type=int, default=100, help="출력 파일에 한 번에 기록할 행 수")
+    parser.add_argument('--resume', action='store_true', help="체크포인트에 기록된 단어를 건너뛰고 이어서 실행")
+    parser.add_argument('--incremental', action='store_true', help="이전 실행 상태와 비교해 바뀐 부분만 계산")
+    parser.add_argument('--verbose', action='store_true', help="단어별 매핑 결과 출력")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+
+    with instrumentation.from_args(args):
+        run(args)
+
+
+def run(args):
+    from tqdm import tqdm
+
+    # CSV 파일 읽기 (KO 사전은 고유 발음 단위로 한 번만 인코딩)
+    with instrumentation.stage('load_kss'):
+        queries = load_queries(args.kss)
+    with instrumentation.stage('load_ko'):
+        if args.lexicon:
+            matcher = PronunciationMatcher.load(args.lexicon, cache_size=args.cache_size, scoring=args.scoring)
+        else:
+            matcher = load_matcher(args.ko, kps=KoreanPhoneticSimilarity(), cache_size=args.cache_size,
+                                   scoring=args.scoring)
+
+    state_path = f'{args.output}.state.json'
+    with instrumentation.stage('load_state'):
+        incremental = IncrementalMapper(matcher, load_state(state_path) if args.incremental else None,
+                                        k=args.top_k)
+    if args.incremental:
+        if incremental.invalidated:
+            print(f"전체를 다시 계산합니다: {incremental.invalidated}")
+        else:
+            print(f"KO 사전 변경: {len(incremental.added)}개 추가, {len(incremental.removed)}개 삭제")
+
+    results = {}
+    with instrumentation.stage('map'), CheckpointedCsvWriter(
+            args.output, result_columns(args.top_k), resume=args.resume, batch_size=args.batch_size) as writer:
+        # 이전 실행에서 완료된 단어는 건너뜀
+        remaining = [(word, pronunciation) for word, pronunciation in queries if word not in writer.done]
+        if len(remaining) < len(queries):
+            print(f"이전 실행에서 완료된 {len(queries) - len(remaining)}개 단어를 건너뜁니다.")
+
+        mapped = incremental.map_words(remaining, workers=args.workers)
+        for word, pronunciation, top_indices in tqdm(mapped, total=len(remaining), desc="단어 매핑 중"):
+            results[word, pronunciation] = top_indices
+            top = [(matcher.words[i], score) for i, score in top_indices]
+            writer.write(word, result_row(word, pronunciation, top))
+
+            # 매핑 결과 출력
+            if args.verbose:
+                print(f"\n단어: {word}")
+                print(f"발음: {pronunciation}")
+                print("유사 단어:")
+                for i, (similar_word, similarity) in enumerate(top, 1):
+                    print(f"{i}. {similar_word} (유사도: {similarity:.4f})")
+
+    print(f"\n총 {len(writer.done)}개의 단어에 대한 유사 단어 매핑이 완료되었습니다.")
+
+    # 이어서 실행한 경우 건너뛴 단어의 top-k를 모르므로 상태를 갱신하지 않음
+    if len(remaining) == len(queries):
+        save_state(state_path, incremental.state(results))
+    counts = incremental.counts
+    print(f"재사용 {counts['reused']}개, 병합 {counts['merged']}개, 전체 계산 {counts['full']}개")
+
+    stats = matcher.stats()
+    print(f"중복 제거: {stats['rows']}개 발음 -> {stats['unique_pronunciations']}개 고유 발음 "
+          f"({stats['dedup_ratio']:.1%})")
+    print(f"캐시 적중률: {stats['hit_rate']:.1%} ({stats['cache_hits']}/{stats['cache_hits'] + stats['cache_misses']})")
+    if 'syllable_costs' in stats:
+        costs = stats['syllable_costs']
+        print(f"음절 쌍 비용 캐시: {costs['size']}개 쌍, 적중률 {costs['hit_rate']:.1%} "
+              f"({costs['hits']}/{costs['hits'] + costs['misses']})")
+
+
+if __name__ == "__main__":
+    main()
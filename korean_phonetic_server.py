@@ -0,0 +1,254 @@
+"""
+KO 사전과 발음 모델을 한 번만 불러 두고 유사 발음 질의에 답하는 로컬 HTTP 서버
+
+    python korean_phonetic_server.py --lexicon dict/final/ko-dict-pronunciation.lexicon.bin
+
+    GET  /top_k?q=펠런&k=5            -> {"query": ..., "results": [{"word": ..., "similarity": ...}], "elapsed_ms": ...}
+    POST /batch {"queries": [...], "k": 5} -> {"results": [[...], ...], "elapsed_ms": ...}
+    GET  /stats                        -> 엔드포인트별 요청 수와 p50/p99 지연 시간(ms), 캐시 통계
+    GET  /health
+
+요청마다 스레드를 쓰므로 여러 클라이언트가 동시에 접속할 수 있습니다. 매칭 자체는 LRU 캐시와
+발음 모델을 공유하므로 잠금으로 한 번에 하나씩 수행합니다.
+"""
+
+import argparse
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from korean_phonetic_levenshtein import SCORING_MODES, _to_text
+
+KO_PATH = 'dict/final/ko-dict-pronunciation.csv'
+HOST = '127.0.0.1'
+PORT = 8765
+
+# 한 번의 batch 요청에서 받을 최대 쿼리 수
+MAX_BATCH = 1000
+
+
+class LatencyStats:
+    """엔드포인트별 최근 지연 시간을 보관하고 백분위수를 계산하는 스레드 안전 집계기"""
+
+    def __init__(self, window=10000):
+        self.window = window
+        self._samples = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, seconds):
+        with self._lock:
+            self._samples.setdefault(endpoint, deque(maxlen=self.window)).append(seconds)
+            self._counts[endpoint] = self._counts.get(endpoint, 0) + 1
+
+    def summary(self):
+        """{엔드포인트: {requests, p50_ms, p99_ms, max_ms}} (백분위수는 최근 window개 기준)"""
+        with self._lock:
+            samples = {endpoint: np.array(values) * 1000 for endpoint, values in self._samples.items()}
+            counts = dict(self._counts)
+        return {
+            endpoint: {
+                'requests': counts[endpoint],
+                'p50_ms': float(np.percentile(values, 50)),
+                'p99_ms': float(np.percentile(values, 99)),
+                'max_ms': float(values.max()),
+            }
+            for endpoint, values in samples.items()
+        }
+
+
+class SimilarityService:
+    """top_k(query, k)를 가진 매처를 감싸 스레드 안전하게 질의를 처리하는 클래스"""
+
+    def __init__(self, matcher, default_k=5):
+        self.matcher = matcher
+        self.default_k = default_k
+        self.latency = LatencyStats()
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def top_k(self, query, k=None):
+        k = self.default_k if k is None else k
+        with self._lock:
+            return self.matcher.top_k(_to_text(query), k)
+
+    def batch(self, queries, k=None):
+        return [self.top_k(query, k) for query in queries]
+
+    def stats(self):
+        stats = {
+            'uptime_seconds': time.time() - self.started,
+            'endpoints': self.latency.summary(),
+        }
+        if hasattr(self.matcher, 'stats'):
+            stats['matcher'] = self.matcher.stats()
+        return stats
+
+
+def _results_json(results):
+    return [{'word': str(word), 'similarity': float(similarity)} for word, similarity in results]
+
+
+class SimilarityRequestHandler(BaseHTTPRequestHandler):
+    """SimilarityService를 HTTP로 노출하는 핸들러 (server.service에 서비스가 있어야 함)"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _parse_k(self, value):
+        k = int(value) if value is not None else None
+        if k is not None and not 1 <= k <= 100:
+            raise ValueError("k는 1 이상 100 이하여야 합니다.")
+        return k
+
+    def do_GET(self):
+        service = self.server.service
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+
+        if url.path == '/health':
+            self._send_json(200, {'status': 'ok', 'entries': len(service.matcher)})
+        elif url.path == '/stats':
+            self._send_json(200, service.stats())
+        elif url.path == '/top_k':
+            start = time.perf_counter()
+            try:
+                query = params.get('q', [''])[0]
+                k = self._parse_k(params.get('k', [None])[0])
+            except ValueError as e:
+                self._send_json(400, {'error': str(e)})
+                return
+            results = service.top_k(query, k)
+            elapsed = time.perf_counter() - start
+            service.latency.record('top_k', elapsed)
+            self._send_json(200, {'query': query, 'results': _results_json(results), 'elapsed_ms': elapsed * 1000})
+        else:
+            self._send_json(404, {'error': f'unknown path: {url.path}'})
+
+    def do_POST(self):
+        service = self.server.service
+        url = urlparse(self.path)
+        if url.path != '/batch':
+            self._send_json(404, {'error': f'unknown path: {url.path}'})
+            return
+
+        start = time.perf_counter()
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            queries = payload['queries']
+            if not isinstance(queries, list) or len(queries) > MAX_BATCH:
+                raise ValueError(f"queries는 최대 {MAX_BATCH}개의 문자열 리스트여야 합니다.")
+            k = self._parse_k(payload.get('k'))
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, {'error': str(e)})
+            return
+
+        results = service.batch(queries, k)
+        elapsed = time.perf_counter() - start
+        service.latency.record('batch', elapsed)
+        self._send_json(200, {'results': [_results_json(r) for r in results], 'elapsed_ms': elapsed * 1000})
+
+
+def make_server(service, host=HOST, port=PORT, verbose=False):
+    """서비스를 노출하는 ThreadingHTTPServer 생성 (port=0이면 빈 포트 사용)"""
+    server = ThreadingHTTPServer((host, port), SimilarityRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    server.verbose = verbose
+    return server
+
+
+def load_service(ko=KO_PATH, lexicon=None, index=None, num_candidates=1000, cache_size=4096, default_k=5,
+                 scoring='jamo'):
+    """KO 사전을 불러 SimilarityService 생성
+
+    index가 주어지면 후보 색인(korean_phonetic_index.py)으로 근사 top-k를, 아니면 바이너리
+    사전(lexicon) 또는 CSV(ko)로 정확한 top-k를 계산합니다. scoring과 cache_size는 정확한 top-k의
+    점수 방식과 LRU 캐시 크기이며, 색인은 자모 단위 점수만 지원하고 캐시를 쓰지 않습니다.
+    """
+    if index:
+        from korean_phonetic_index import KoreanPhoneticIndex
+
+        if scoring != 'jamo':
+            raise ValueError(f"후보 색인은 jamo 점수만 지원합니다: {scoring}")
+
+        phonetic_index = KoreanPhoneticIndex.load(index)
+
+        class IndexMatcher:
+            def __len__(self):
+                return len(phonetic_index)
+
+            def top_k(self, query, k):
+                return phonetic_index.top_k(query, k, num_candidates)
+
+        matcher = IndexMatcher()
+    else:
+        from korean_phonetic_levenshtein_mapper import PronunciationMatcher, load_matcher
+
+        if lexicon:
+            matcher = PronunciationMatcher.load(lexicon, cache_size=cache_size, scoring=scoring)
+        else:
+            matcher = load_matcher(ko, cache_size=cache_size, scoring=scoring)
+    return SimilarityService(matcher, default_k=default_k)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="유사 발음 질의 로컬 HTTP 서버")
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--ko', default=KO_PATH, help="KO 사전 발음 CSV")
+    parser.add_argument('--lexicon', help="KO 사전 바이너리 파일 (주어지면 --ko 대신 사용)")
+    parser.add_argument('--index', help="후보 색인 파일 (주어지면 근사 top-k 사용, 기본은 전체 탐색)")
+    parser.add_argument('--num-candidates', type=int, default=1000, help="색인 사용 시 정확히 계산할 후보 수")
+    parser.add_argument('--cache-size', type=int, help="쿼리 발음별 결과 LRU 캐시 크기 (기본 4096, --index와 함께 쓸 수 없음)")
+    parser.add_argument('--top-k', type=int, default=5, help="k를 주지 않은 요청의 기본값")
+    parser.add_argument('--scoring', choices=SCORING_MODES, default='jamo',
+                        help="정확한 top-k의 점수 방식 (jamo: 자모열별 정렬, syllable: 음절 단위 정렬, "
+                             "--index는 jamo만 지원)")
+    parser.add_argument('--verbose', action='store_true', help="요청 로그 출력")
+    args = parser.parse_args()
+    # 색인 경로에는 점수 방식과 캐시가 적용되지 않으므로 조용히 무시하지 않고 거부
+    if args.index and args.scoring != 'jamo':
+        parser.error("--index는 --scoring jamo만 지원합니다.")
+    if args.index and args.cache_size is not None:
+        parser.error("--index와 --cache-size는 함께 쓸 수 없습니다.")
+
+    start = time.perf_counter()
+    cache_size = args.cache_size if args.cache_size is not None else 4096
+    service = load_service(args.ko, args.lexicon, args.index, args.num_candidates, cache_size, args.top_k,
+                           args.scoring)
+    # 첫 요청이 모델 컴파일 비용을 치르지 않도록 미리 한 번 실행
+    service.top_k('가', 1)
+    print(f"사전 로드 완료: {len(service.matcher)}개 항목 ({time.perf_counter() - start:.2f}초)")
+
+    server = make_server(service, args.host, args.port, args.verbose)
+    print(f"http://{args.host}:{server.server_port} 에서 대기 중 (Ctrl+C로 종료)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        for endpoint, summary in service.latency.summary().items():
+            print(f"{endpoint}: {summary['requests']}건, p50 {summary['p50_ms']:.1f}ms, p99 {summary['p99_ms']:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""
+메모리 매핑으로 읽는 KO 발음 사전 바이너리 파일
+
+ko-dict-pronunciation.csv를 매번 pandas로 파싱하고 다시 인코딩하지 않도록, 단어/고유 발음
+문자열 테이블(UTF-8 바이트 + 오프셋 배열), 발음별 단어 묶음, 초성/중성/종성 자모 ID 배열과
+발음 모델을 하나의 파일로 컴파일해 둡니다. 불러올 때는 파일을 mmap하여 각 배열을 복사 없이
+그대로 사용하므로 NumPy import(수십 ms)를 빼면 1ms 이내에 열리고, 여러 작업자 프로세스가
+페이지 캐시의 한 사본을 공유합니다. 음절 분해 테이블은 첫 쿼리를 인코딩할 때 (약 2ms) 만듭니다.
+
+    python korean_phonetic_store.py build
+    python korean_phonetic_store.py info
+
+파일 형식: 8바이트 매직, 메타데이터 JSON 길이(uint64, little endian), 메타데이터 JSON,
+그리고 64바이트 경계에 맞춘 배열 섹션들. 메타데이터의 sections에는 각 배열의
+dtype, shape, 파일 내 offset이 기록됩니다.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import struct
+import time
+
+from korean_phonetic_levenshtein import (
+    KoreanPhoneticLexicon,
+    KoreanPhoneticModel,
+    KoreanPhoneticSimilarity,
+    _to_text,
+)
+
+KO_DICT_PATH = 'dict/final/ko-dict-pronunciation.csv'
+LEXICON_PATH = 'dict/final/ko-dict-pronunciation.lexicon.bin'
+
+MAGIC = b'KPLEX\x00\x00\x01'
+VERSION = 1
+ALIGNMENT = 64
+
+
+class StringTable:
+    """UTF-8 바이트 배열과 오프셋 배열로 저장된 읽기 전용 문자열 목록
+
+    문자열은 꺼낼 때만 디코딩하므로 불러올 때 파이썬 문자열을 만들지 않습니다.
+    """
+
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+
+    @staticmethod
+    def encode(strings):
+        """문자열 목록 -> (UTF-8 바이트 배열, 오프셋 배열)"""
+        import numpy as np
+
+        encoded = [str(s).encode('utf-8') for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self.data[self.offsets[i]:self.offsets[i + 1]].tobytes().decode('utf-8')
+
+    def __iter__(self):
+        data = self.data.tobytes()
+        offsets = self.offsets.tolist()
+        for start, end in zip(offsets, offsets[1:]):
+            yield data[start:end].decode('utf-8')
+
+
+def group_pronunciations(pronunciations):
+    """같은 발음끼리 묶기
+
+    Returns:
+        tuple: (고유 발음 리스트(처음 나온 순서), 발음별 단어 오프셋 배열, 발음 순서로 정렬한 단어 인덱스 배열)
+            고유 발음 i에 속한 단어는 members[offsets[i]:offsets[i + 1]] (사전 순서)입니다.
+    """
+    import numpy as np
+
+    key_index = {}
+    word_keys = []
+    for pronunciation in pronunciations:
+        pronunciation = _to_text(pronunciation)
+        word_keys.append(key_index.setdefault(pronunciation, len(key_index)))
+
+    word_keys = np.array(word_keys, dtype=np.int64)
+    members = np.argsort(word_keys, kind='stable').astype(np.int32)
+    offsets = np.searchsorted(word_keys[members], np.arange(len(key_index) + 1)).astype(np.int64)
+    return list(key_index), offsets, members
+
+
+def _file_sha256(path):
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def build_lexicon_file(words, pronunciations, path=LEXICON_PATH, kps=None, source=None):
+    """단어/발음 목록을 바이너리 사전 파일로 컴파일
+
+    Args:
+        source (str, optional): 원본 CSV 경로 (메타데이터에 경로와 SHA-256을 기록)
+    """
+    words = [str(word) for word in words]
+    unique, key_offsets, key_members = group_pronunciations(pronunciations)
+    lexicon = KoreanPhoneticLexicon(unique, kps=kps)
+    model = lexicon.kps.model
+
+    word_data, word_offsets = StringTable.encode(words)
+    pron_data, pron_offsets = StringTable.encode(unique)
+    arrays = {
+        'word_data': word_data,
+        'word_offsets': word_offsets,
+        'pron_data': pron_data,
+        'pron_offsets': pron_offsets,
+        'key_offsets': key_offsets,
+        'key_members': key_members,
+        'costs': model.costs,
+        'cho_ids': model.cho_ids,
+        'jung_ids': model.jung_ids,
+        'jong_ids': model.jong_ids,
+    }
+    for stream in range(3):
+        arrays[f'lengths_{stream}'] = lexicon.lengths[stream]
+        arrays[f'codes_{stream}'] = lexicon.codes[stream]
+
+    metadata = {
+        'version': VERSION,
+        'words': len(words),
+        'pronunciations': len(unique),
+        'jamo_list': model.jamo_list,
+        'position_weights': model.position_weights,
+        'source': source,
+        'source_sha256': _file_sha256(source) if source else None,
+    }
+    return write_sections(path, MAGIC, metadata, arrays)
+
+
+def write_sections(path, magic, metadata, arrays):
+    """매직, 메타데이터 JSON, 64바이트 경계에 맞춘 배열 섹션을 임시 파일에 쓴 뒤 이름을 바꾸어 저장
+
+    metadata에 섹션별 dtype/shape/offset을 'sections'로 추가하여 반환합니다.
+    """
+    import numpy as np
+
+    metadata = dict(metadata, sections={})
+
+    # 메타데이터 길이에 따라 섹션 offset이 달라지므로 길이가 고정될 때까지 반복
+    data_start = 0
+    while True:
+        offset = data_start
+        for name, array in arrays.items():
+            metadata['sections'][name] = {
+                'dtype': array.dtype.str,
+                'shape': list(array.shape),
+                'offset': offset,
+            }
+            offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+        header = json.dumps(metadata, ensure_ascii=False).encode('utf-8')
+        header_end = len(magic) + 8 + len(header)
+        aligned = -(-header_end // ALIGNMENT) * ALIGNMENT
+        if aligned == data_start:
+            break
+        data_start = aligned
+
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(magic)
+        f.write(struct.pack('<Q', len(header)))
+        f.write(header)
+        for name, array in arrays.items():
+            f.write(b'\0' * (metadata['sections'][name]['offset'] - f.tell()))
+            f.write(np.ascontiguousarray(array).tobytes())
+    os.replace(tmp_path, path)
+    return metadata
+
+
+def read_sections(path, magic, kind="바이너리 파일"):
+    """write_sections로 저장한 파일을 mmap으로 열어 (메타데이터, mmap, {이름: 배열}) 반환
+
+    배열은 mmap을 직접 가리키므로 복사하지 않습니다.
+    """
+    import numpy as np
+
+    with open(path, 'rb') as f:
+        if f.read(len(magic)) != magic:
+            raise ValueError(f"{kind}이 아닙니다: {path}")
+        (header_size,) = struct.unpack('<Q', f.read(8))
+        metadata = json.loads(f.read(header_size).decode('utf-8'))
+
+    mmap = np.memmap(path, dtype=np.uint8, mode='r')
+    arrays = {
+        name: np.ndarray(tuple(section['shape']), dtype=np.dtype(section['dtype']),
+                         buffer=mmap, offset=section['offset'])
+        for name, section in metadata['sections'].items()
+    }
+    return metadata, mmap, arrays
+
+
+class LexiconFile:
+    """바이너리 사전 파일을 mmap으로 연 결과
+
+    Attributes:
+        words (StringTable): 사전 순서의 단어
+        key_offsets, key_members (np.ndarray): 고유 발음별 단어 인덱스 (group_pronunciations 참고)
+        lexicon (KoreanPhoneticLexicon): 고유 발음의 인코딩된 사전 (배열은 파일을 직접 가리킴)
+    """
+
+    def __init__(self, path=LEXICON_PATH):
+        self.path = path
+        self.metadata, self._mmap, arrays = read_sections(path, MAGIC, "바이너리 사전 파일")
+        if self.metadata['version'] != VERSION:
+            raise ValueError(f"지원하지 않는 사전 파일 버전입니다: {self.metadata['version']}")
+
+        model = KoreanPhoneticModel(
+            self.metadata['jamo_list'],
+            arrays['costs'],
+            self.metadata['position_weights'],
+            arrays['cho_ids'],
+            arrays['jung_ids'],
+            arrays['jong_ids'],
+        )
+        pronunciations = StringTable(arrays['pron_data'], arrays['pron_offsets'])
+        lexicon_arrays = {'words': pronunciations, 'pronunciations': pronunciations}
+        for stream in range(3):
+            lexicon_arrays[f'lengths_{stream}'] = arrays[f'lengths_{stream}']
+            lexicon_arrays[f'codes_{stream}'] = arrays[f'codes_{stream}']
+
+        self.words = StringTable(arrays['word_data'], arrays['word_offsets'])
+        self.key_offsets = arrays['key_offsets']
+        self.key_members = arrays['key_members']
+        self.lexicon = KoreanPhoneticLexicon.from_arrays(lexicon_arrays, KoreanPhoneticSimilarity(model=model))
+
+    def __len__(self):
+        return len(self.words)
+
+    def is_stale(self, source=KO_DICT_PATH):
+        """원본 CSV가 컴파일 이후 바뀌었는지 (SHA-256 비교)"""
+        expected = self.metadata.get('source_sha256')
+        return expected is None or not os.path.exists(source) or _file_sha256(source) != expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KO 발음 사전 바이너리 파일 생성 및 확인")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="발음 사전 CSV를 바이너리 파일로 컴파일")
+    build_parser.add_argument('--input', default=KO_DICT_PATH)
+    build_parser.add_argument('--output', default=LEXICON_PATH)
+
+    info_parser = subparsers.add_parser('info', help="바이너리 파일 정보와 불러오는 시간 출력")
+    info_parser.add_argument('--lexicon', default=LEXICON_PATH)
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        import pandas as pd
+
+        start = time.perf_counter()
+        ko_df = pd.read_csv(args.input)
+        metadata = build_lexicon_file(ko_df['word'], ko_df['pronunciation'], args.output, source=args.input)
+        print(f"바이너리 사전 생성 완료: {metadata['words']}개 단어, {metadata['pronunciations']}개 고유 발음, "
+              f"{os.path.getsize(args.output) / 2 ** 20:.1f}MB ({time.perf_counter() - start:.2f}초) -> {args.output}")
+    else:
+        # NumPy import는 프로세스당 한 번이므로 파일을 여는 시간과 나누어 표시
+        start = time.perf_counter()
+        import numpy
+        import_elapsed = time.perf_counter() - start
+
+        start = time.perf_counter()
+        lexicon_file = LexiconFile(args.lexicon)
+        elapsed = time.perf_counter() - start
+        metadata = lexicon_file.metadata
+        print(f"{args.lexicon}: {metadata['words']}개 단어, {metadata['pronunciations']}개 고유 발음, "
+              f"원본 {metadata['source']} ({'변경됨' if lexicon_file.is_stale(metadata['source'] or KO_DICT_PATH) else '최신'})")
+        print(f"불러오기: {elapsed * 1000:.1f}ms (NumPy import {import_elapsed * 1000:.1f}ms 별도)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,116 @@
+"""
+KO 사전 IPA CSV의 '/'로 구분된 여러 발음을 (단어, 발음) 행으로 펼친 발음 사전 생성 스크립트
+
+    python korean_pronunciation_dict_generator.py
+    python korean_pronunciation_dict_generator.py --chunksize 500000 --lexicon dict/final/ko-dict-pronunciation.lexicon.bin
+
+입력을 chunksize행씩 읽어 str.split + explode + str.replace로 한꺼번에 펼치므로 입력 크기와
+관계없이 메모리는 한 청크 분량과 이미 저장한 행의 64비트 해시(행당 8바이트)만큼만 사용합니다.
+중복 제거는 청크를 넘어 전체 결과에서 처음 나온 행을 남기므로 한 번에 읽어 drop_duplicates
+하는 것과 같은 결과를 냅니다 (해시 충돌 확률은 수백만 행에서도 무시할 만큼 작습니다).
+
+--lexicon을 주면 생성한 발음 사전을 유사도 엔진이 바로 쓰는 자모 인코딩 바이너리 파일
+(korean_phonetic_store.py)로도 컴파일합니다.
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
 import pandas as pd
 
-# CSV 파일 읽기
-df = pd.read_csv('dict/final/ko-dict-ipa.csv')
-
-# 결과를 저장할 리스트
-result_data = []
-
-# 각 행에 대해 처리
-for _, row in df.iterrows():
-    word = row['word']
-    # NaN 값 처리
-    if pd.isna(row['pronunciation']):
-        pronunciations = ['']
-    else:
-        pronunciations = str(row['pronunciation']).split('/')
-    
-    # 각 발음에 대해 처리
-    for pron in pronunciations:
-        # ː 제거
-        pron = pron.replace('ː', '')
-        
-        # 결과 리스트에 추가
-        result_data.append({
-            'word': word,
-            'pronunciation': pron
-        })
-
-# DataFrame으로 변환
-result_df = pd.DataFrame(result_data)
-
-# 중복 제거
-result_df = result_df.drop_duplicates()
-
-# 새로운 CSV 파일로 저장
-result_df.to_csv('dict/final/ko-dict-pronunciation.csv', index=False, encoding='utf-8-sig')
-
-print(f"총 {len(result_df)}개의 고유한 발음이 저장되었습니다.")
\ No newline at end of file
+import instrumentation
+
+INPUT_PATH = 'dict/final/ko-dict-ipa.csv'
+OUTPUT_PATH = 'dict/final/ko-dict-pronunciation.csv'
+
+CHUNKSIZE = 200000
+
+
+def expand_pronunciations(df):
+    """'/'로 구분된 발음을 행으로 펼치고 장음 표시(ː)를 제거한 (word, pronunciation) DataFrame
+
+    NaN 발음은 빈 문자열 발음 하나로 처리합니다.
+    """
+    pronunciations = df['pronunciation'].fillna('').astype(str).str.split('/')
+    expanded = pd.DataFrame({'word': df['word'], 'pronunciation': pronunciations}).explode('pronunciation')
+    expanded['pronunciation'] = expanded['pronunciation'].str.replace('ː', '', regex=False)
+    return expanded.reset_index(drop=True)
+
+
+class RowDeduplicator:
+    """청크를 넘어 처음 나온 행만 남기는 중복 제거기 (저장한 행의 해시를 정렬된 배열로 보관)"""
+
+    def __init__(self):
+        self.seen = np.empty(0, dtype=np.uint64)
+
+    def __len__(self):
+        return len(self.seen)
+
+    def filter(self, df):
+        """df에서 청크 안의 중복과 이전 청크에 이미 나온 행을 뺀 DataFrame"""
+        hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        keep = ~pd.Series(hashes).duplicated().to_numpy()
+        if len(self.seen):
+            positions = np.minimum(np.searchsorted(self.seen, hashes), len(self.seen) - 1)
+            keep &= self.seen[positions] != hashes
+        self.seen = np.union1d(self.seen, hashes[keep])
+        return df[keep]
+
+
+def generate_dictionary(input_path=INPUT_PATH, output_path=OUTPUT_PATH, chunksize=CHUNKSIZE):
+    """입력 CSV를 청크 단위로 펼치고 중복을 제거하여 output_path에 저장한 뒤 저장한 행 수를 반환"""
+    dedup = RowDeduplicator()
+    tmp_path = f'{output_path}.tmp'
+    with instrumentation.stage('expand'):
+        # 청크마다 자료형을 따로 추정하면 숫자뿐인 단어가 float(123.0)로 읽혀 청크 크기에 따라
+        # 결과와 중복 판정이 달라지므로 문자열로 읽음
+        with pd.read_csv(input_path, chunksize=chunksize, dtype={'word': str, 'pronunciation': str}) as reader:
+            for i, chunk in enumerate(reader):
+                expanded = expand_pronunciations(chunk)
+                unique = dedup.filter(expanded)
+                instrumentation.incr('rows_in', len(chunk))
+                instrumentation.incr('rows_expanded', len(expanded))
+                instrumentation.incr('rows_out', len(unique))
+                # 첫 청크만 헤더와 BOM을 쓰고 나머지는 이어서 저장
+                if i == 0:
+                    unique.to_csv(tmp_path, index=False, encoding='utf-8-sig')
+                else:
+                    unique.to_csv(tmp_path, mode='a', header=False, index=False, encoding='utf-8')
+    if not os.path.exists(tmp_path):
+        # 헤더만 있는 입력은 청크가 하나도 없으므로 헤더만 저장
+        pd.DataFrame(columns=['word', 'pronunciation']).to_csv(tmp_path, index=False, encoding='utf-8-sig')
+    os.replace(tmp_path, output_path)
+    return len(dedup)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KO 사전의 여러 발음을 펼친 발음 사전 생성")
+    parser.add_argument('--input', default=INPUT_PATH, help="word, pronunciation('/'로 구분) 컬럼이 있는 CSV")
+    parser.add_argument('--output', default=OUTPUT_PATH)
+    parser.add_argument('--chunksize', type=int, default=CHUNKSIZE, help="한 번에 읽어 처리할 입력 행 수")
+    parser.add_argument('--lexicon', help="자모 인코딩 바이너리 사전 파일도 생성할 경로")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+
+    with instrumentation.from_args(args):
+        run(args)
+
+
+def run(args):
+    start = time.perf_counter()
+    total = generate_dictionary(args.input, args.output, args.chunksize)
+    print(f"총 {total}개의 고유한 발음이 저장되었습니다. ({time.perf_counter() - start:.2f}초)")
+
+    if args.lexicon:
+        from korean_phonetic_store import build_lexicon_file
+
+        with instrumentation.stage('lexicon'):
+            ko_df = pd.read_csv(args.output)
+            metadata = build_lexicon_file(ko_df['word'], ko_df['pronunciation'], args.lexicon, source=args.output)
+        print(f"바이너리 사전 생성 완료: {metadata['pronunciations']}개 고유 발음 -> {args.lexicon}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+크롤링 결과(dict/kss_data.csv)에서 매핑/kNN에 쓰는 KSS 최종 발음 사전을 만드는 스크립트
+
+    python kss_pronunciation_dict_generator.py
+    python kss_pronunciation_dict_generator.py --input dict/kss_data.csv --output dict/final/kss-dict-ipa-pronunciation.csv
+
+크롤링 결과에서 단어, IPA, 뜻 컬럼과 발음 컬럼만 남기고, 발음의 강세 표시(<>)를 제거합니다.
+크롤링한 발음을 손으로 고친 단어는 교정 파일(word, pronunciation)에 두며, 강세 표시를 제거한
+뒤에 덮어쓰므로 다시 생성해도 교정한 발음이 유지됩니다.
+"""
+
+import argparse
+import os
+
+import pandas as pd
+
+from ipa_hangul_transliterator import strip_accents
+
+INPUT_PATH = 'dict/kss_data.csv'
+OUTPUT_PATH = 'dict/final/kss-dict-ipa-pronunciation.csv'
+OVERRIDES_PATH = 'dict/kss-pronunciation-overrides.csv'
+
+COLUMNS = ['word', 'naver_ipa', 'google_ipa', 'pronounciation', 'meaning', 'pronunciation']
+
+
+def load_overrides(path):
+    """교정 파일을 {단어: 발음} 딕셔너리로 읽기 (없으면 빈 딕셔너리)"""
+    if not path or not os.path.exists(path):
+        return {}
+    overrides = pd.read_csv(path, dtype=str)
+    return dict(zip(overrides['word'], overrides['pronunciation']))
+
+
+def generate_dictionary(df, overrides=None):
+    """크롤링 결과 DataFrame에서 COLUMNS만 남기고 발음의 강세 표시를 제거한 뒤 교정 발음을 적용한 DataFrame"""
+    missing = [column for column in COLUMNS if column not in df.columns]
+    if missing:
+        raise ValueError(f"입력에 필요한 컬럼이 없습니다: {', '.join(missing)}")
+    overrides = overrides or {}
+    unknown = set(overrides) - set(df['word'])
+    if unknown:
+        print(f"입력에 없는 교정 단어: {', '.join(sorted(unknown))}")
+    result = df[COLUMNS].copy()
+    result['pronunciation'] = [
+        overrides.get(word, strip_accents(pronunciation))
+        for word, pronunciation in zip(result['word'], result['pronunciation'])
+    ]
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="크롤링한 KSS 발음에서 최종 발음 사전 생성")
+    parser.add_argument('--input', default=INPUT_PATH, help="crawl_korean_pronunciation.py 결과 CSV")
+    parser.add_argument('--output', default=OUTPUT_PATH)
+    parser.add_argument('--overrides', default=OVERRIDES_PATH, help="손으로 교정한 발음 CSV (word, pronunciation)")
+    args = parser.parse_args()
+
+    overrides = load_overrides(args.overrides)
+    df = generate_dictionary(pd.read_csv(args.input, dtype={'word': str}), overrides)
+    tmp_path = f'{args.output}.tmp'
+    df.to_csv(tmp_path, index=False, encoding='utf-8-sig')
+    os.replace(tmp_path, args.output)
+    print(f"{len(df)}개 단어의 발음 사전 생성 (교정 {len(overrides)}개 적용) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,50 @@
-import os
-import pandas as pd
+"""
+영어 단어의 니모닉(mnemonic_keyword, verbal_cue)을 OpenAI 모델로 생성하는 스크립트
+
+    python naive_mnemonic_generator.py run --concurrency 4 --rate 2
+    python naive_mnemonic_generator.py batch-emit --requests dict/mnemonic_batch_requests.jsonl
+    python naive_mnemonic_generator.py batch-ingest dict/mnemonic_batch_results.jsonl
+
+생성 결과는 (단어, 의미, 프롬프트, 모델, temperature)로 만든 키로 로컬 캐시(JSON lines)에
+저장하므로, 다시 실행하면 새로 추가되었거나 바뀐 행만 요청합니다. run은 여러 요청을 동시에
+보내되 토큰 버킷으로 초당 요청 수를 제한하고, batch-emit/batch-ingest는 같은 요청을 Batch API용
+JSONL 파일로 내보내고 그 결과 파일을 캐시에 반영합니다. --client fake를 주면 네트워크 없이
+가짜 클라이언트로 전체 흐름을 실행할 수 있습니다.
+"""
+
+import argparse
+import hashlib
 import json
-from dotenv import load_dotenv
-from openai import OpenAI
-from tqdm import tqdm
-import time
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
 from typing import Dict, Any
 
-# 환경 변수 로드
-load_dotenv()
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=OPENAI_API_KEY)
+import instrumentation
+from http_utils import TokenBucket
+
+INPUT_PATH = 'dict/kss.csv'
+OUTPUT_PATH = 'dict/kss_with_naive_mnemonics.csv'
+CACHE_PATH = 'dict/cache/mnemonics.jsonl'
+BATCH_REQUESTS_PATH = 'dict/mnemonic_batch_requests.jsonl'
+
+MODEL = "gpt-4.1"
+TEMPERATURE = 0.7
+
+SYSTEM_PROMPT = """당신은 언어 학습을 도와주는 어시스턴트입니다. 영어 단어를 기억하기 쉽게 하는 니모닉을 만들어주세요.
+    각 단어에 대해 다음을 제공해주세요:
+    1. mnemonic_keyword: 영어 단어와 발음이 비슷한 한글 단어나 표현
+    2. verbal_cue: mnemonic_keyword와 단어의 의미를 연결하는 설명
+    
+    응답은 다음 JSON 형식으로 반환해주세요:
+    {
+        "mnemonic_keyword": "한글로 된 니모닉 키워드",
+        "verbal_cue": "한글로 된 설명"
+    }
+    """
+
 
 def parse_model_response(content: str) -> Dict[str, Any]:
     """
@@ -23,7 +57,7 @@ def parse_model_response(content: str) -> Dict[str, Any]:
         if lines and lines[-1].strip().startswith("```"):
             lines = lines[:-1]
         content = "\n".join(lines)
-    
+
     try:
         return json.loads(content)
     except json.JSONDecodeError as e:
@@ -31,67 +65,315 @@ def parse_model_response(content: str) -> Dict[str, Any]:
         print("수신된 내용:", content)
         return {"mnemonic_keyword": None, "verbal_cue": None, "error": "JSON 파싱 오류"}
 
-def generate_mnemonic(word, meaning):
-    system_prompt = """당신은 언어 학습을 도와주는 어시스턴트입니다. 영어 단어를 기억하기 쉽게 하는 니모닉을 만들어주세요.
-    각 단어에 대해 다음을 제공해주세요:
-    1. mnemonic_keyword: 영어 단어와 발음이 비슷한 한글 단어나 표현
-    2. verbal_cue: mnemonic_keyword와 단어의 의미를 연결하는 설명
-    
-    응답은 다음 JSON 형식으로 반환해주세요:
-    {
-        "mnemonic_keyword": "한글로 된 니모닉 키워드",
-        "verbal_cue": "한글로 된 설명"
-    }
-    """
-    
+
+def build_messages(word, meaning, system_prompt=SYSTEM_PROMPT):
     user_prompt = f"단어: {word}\n의미: {meaning}\n\n이 단어에 대한 니모닉을 만들어주세요."
-    
-    response = client.chat.completions.create(
-        model="gpt-4.1",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ],
-        temperature=0.7
-    )
-    
-    content = response.choices[0].message.content
-    result = parse_model_response(content)
-    return result
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+
+
+def cache_key(word, meaning, system_prompt=SYSTEM_PROMPT, model=MODEL, temperature=TEMPERATURE):
+    """(단어, 의미, 프롬프트, 모델, temperature)의 SHA-256 캐시 키"""
+    payload = json.dumps([str(word), str(meaning), system_prompt, model, temperature], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def create_client(name='openai'):
+    """OpenAI 클라이언트 생성 (모듈을 불러올 때가 아니라 실제로 필요할 때 생성)"""
+    if name == 'fake':
+        return FakeClient()
+
+    from dotenv import load_dotenv
+    from openai import OpenAI
+
+    # 환경 변수 로드
+    load_dotenv()
+    return OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+
+class FakeClient:
+    """네트워크 없이 고정된 형식의 응답을 돌려주는 가짜 OpenAI 클라이언트 (테스트용)"""
+
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model, messages, temperature):
+        with self._lock:
+            self.calls += 1
+        word = messages[-1]["content"].splitlines()[0].removeprefix("단어: ")
+        content = json.dumps({
+            "mnemonic_keyword": f"{word}-키워드",
+            "verbal_cue": f"{word}-설명 ({model}, {temperature})",
+        }, ensure_ascii=False)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class MnemonicCache:
+    """캐시 키 -> 생성 결과를 저장하는 추가 전용 JSON lines 저장소
+
+    같은 키가 여러 번 기록되면 마지막 기록을 사용합니다.
+    """
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self._entries = {}
+        self._lock = threading.Lock()
+        if path is not None and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 중간에 끊긴 마지막 줄은 무시
+                        continue
+                    self._entries[record['key']] = record['result']
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        return self._entries.get(key)
+
+    def put(self, key, result):
+        with self._lock:
+            self._entries[key] = result
+            if self.path is None:
+                return
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'key': key, 'result': result}, ensure_ascii=False) + '\n')
+
+
+class MnemonicGenerator:
+    """캐시, 동시 요청, 요청 속도 제한을 갖춘 니모닉 생성기"""
+
+    def __init__(self, client=None, cache=None, model=MODEL, temperature=TEMPERATURE,
+                 system_prompt=SYSTEM_PROMPT, concurrency=4, rate=1.0):
+        self.client = client
+        self.cache = cache if cache is not None else MnemonicCache(None)
+        self.model = model
+        self.temperature = temperature
+        self.system_prompt = system_prompt
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(rate)
+        self._client_lock = threading.Lock()
+
+    def ensure_client(self):
+        """클라이언트가 없으면 한 번만 생성 (여러 스레드가 동시에 불러도 하나만 만듦)"""
+        with self._client_lock:
+            if self.client is None:
+                self.client = create_client()
+        return self.client
+
+    def key(self, word, meaning):
+        return cache_key(word, meaning, self.system_prompt, self.model, self.temperature)
+
+    def request_body(self, word, meaning):
+        return {
+            "model": self.model,
+            "messages": build_messages(word, meaning, self.system_prompt),
+            "temperature": self.temperature,
+        }
+
+    def generate_mnemonic(self, word, meaning):
+        """캐시에 없으면 모델을 호출하고, 정상적으로 파싱된 결과만 캐시에 저장"""
+        key = self.key(word, meaning)
+        cached = self.cache.get(key)
+        if cached is not None:
+            instrumentation.incr('llm.cache_hits')
+            return cached
+
+        client = self.ensure_client()
+        with instrumentation.timer('llm.rate_limit_wait'):
+            self.bucket.acquire()
+        instrumentation.incr('llm.requests')
+        with instrumentation.timer('llm.request'):
+            response = client.chat.completions.create(**self.request_body(word, meaning))
+
+        content = response.choices[0].message.content
+        result = parse_model_response(content)
+        if "error" not in result:
+            self.cache.put(key, result)
+        else:
+            instrumentation.incr('llm.parse_errors')
+        return result
+
+    def _generate_row(self, row):
+        word, meaning = row
+        try:
+            return self.generate_mnemonic(word, meaning)
+        except Exception as e:
+            instrumentation.incr('llm.failures')
+            print(f"Error generating mnemonic for {word}: {e}")
+            return {"mnemonic_keyword": None, "verbal_cue": None, "error": str(e)}
+
+    def pending(self, rows):
+        """캐시에 없는 (단어, 의미) 행 (중복 제거, 입력 순서 유지)"""
+        return [row for row in dict.fromkeys(rows) if self.key(*row) not in self.cache]
+
+    def generate_all(self, rows, progress=True):
+        """캐시에 없는 행만 동시에 생성하여 {(단어, 의미): 결과}를 반환"""
+        rows = list(dict.fromkeys(rows))
+        pending = self.pending(rows)
+        if pending:
+            # 작업을 나누기 전에 클라이언트를 만들어 모든 스레드가 같은 연결 풀을 공유
+            self.ensure_client()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            results = executor.map(self._generate_row, pending)
+            if progress:
+                from tqdm import tqdm
+
+                results = tqdm(results, total=len(pending), desc="니모닉 생성 중")
+            generated = dict(zip(pending, results))
+        return {row: generated.get(row) or self.cache.get(self.key(*row)) for row in rows}
+
+    def write_batch_requests(self, rows, path=BATCH_REQUESTS_PATH):
+        """캐시에 없는 행을 Batch API 요청 JSONL로 저장 (custom_id는 캐시 키)하고 요청 수를 반환"""
+        pending = self.pending(rows)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            for word, meaning in pending:
+                request = {
+                    "custom_id": self.key(word, meaning),
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": self.request_body(word, meaning),
+                }
+                f.write(json.dumps(request, ensure_ascii=False) + '\n')
+        return len(pending)
+
+    def ingest_batch_results(self, path):
+        """Batch API 결과 JSONL을 캐시에 반영하고 (반영한 수, 실패한 custom_id 목록)을 반환"""
+        ingested, failed = 0, []
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                response = record.get("response") or {}
+                if record.get("error") or response.get("status_code") != 200:
+                    failed.append(record.get("custom_id"))
+                    continue
+                content = response["body"]["choices"][0]["message"]["content"]
+                result = parse_model_response(content)
+                if "error" in result:
+                    failed.append(record["custom_id"])
+                    continue
+                self.cache.put(record["custom_id"], result)
+                ingested += 1
+        return ingested, failed
+
+
+def attach_results(df, results, previous=None):
+    """원본 DataFrame에 mnemonic_keyword, verbal_cue 컬럼 추가
+
+    결과가 없는 행은 previous(이전에 저장한 출력 DataFrame)에 같은 (단어, 의미)의 니모닉이
+    있으면 그 값을 유지하고, 없으면 빈 값으로 둡니다. previous에만 있는 컬럼(예전 다운로더가
+    추가한 audio_path 등)도 (단어, 의미)로 맞추어 유지합니다.
+    """
+    import pandas as pd
+
+    records = []
+    for (word, meaning), result in results.items():
+        result = result or {}
+        records.append({
+            'word': word,
+            'meaning': meaning,
+            'mnemonic_keyword': result.get('mnemonic_keyword'),
+            'verbal_cue': result.get('verbal_cue')
+        })
+    columns = ['word', 'meaning', 'mnemonic_keyword', 'verbal_cue']
+    result_df = pd.DataFrame(records, columns=columns)
+    merged = pd.merge(df, result_df, on=['word', 'meaning'], how='left')
+    if previous is None or not set(columns) <= set(previous.columns):
+        return merged
+
+    extra = [column for column in previous.columns if column not in merged.columns]
+    if extra:
+        merged = pd.merge(merged, previous[['word', 'meaning'] + extra].drop_duplicates(['word', 'meaning']),
+                          on=['word', 'meaning'], how='left')
+
+    kept = previous[columns].dropna(subset=['mnemonic_keyword']).drop_duplicates(['word', 'meaning'])
+    merged = pd.merge(merged, kept, on=['word', 'meaning'], how='left', suffixes=('', '_previous'))
+    missing = merged['mnemonic_keyword'].isna()
+    for column in ('mnemonic_keyword', 'verbal_cue'):
+        merged.loc[missing, column] = merged.loc[missing, f'{column}_previous']
+    return merged.drop(columns=['mnemonic_keyword_previous', 'verbal_cue_previous'])
+
 
 def main():
+    parser = argparse.ArgumentParser(description="영어 단어 니모닉 생성")
+    parser.add_argument('--input', default=INPUT_PATH)
+    parser.add_argument('--output', default=OUTPUT_PATH)
+    parser.add_argument('--cache', default=CACHE_PATH, help="생성 결과 캐시(JSON lines)")
+    parser.add_argument('--model', default=MODEL)
+    parser.add_argument('--temperature', type=float, default=TEMPERATURE)
+    parser.add_argument('--client', choices=['openai', 'fake'], default='openai',
+                        help="fake이면 네트워크 없이 가짜 응답 사용")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help="캐시에 없는 행을 동시에 생성하고 결과 저장")
+    run_parser.add_argument('--concurrency', type=int, default=4, help="동시 요청 수")
+    run_parser.add_argument('--rate', type=float, default=1.0, help="초당 최대 요청 수 (0이면 제한 없음)")
+
+    emit_parser = subparsers.add_parser('batch-emit', help="캐시에 없는 행을 Batch API 요청 JSONL로 저장")
+    emit_parser.add_argument('--requests', default=BATCH_REQUESTS_PATH)
+
+    ingest_parser = subparsers.add_parser('batch-ingest', help="Batch API 결과 JSONL을 캐시에 반영하고 결과 저장")
+    ingest_parser.add_argument('results', help="Batch API 결과 JSONL")
+    instrumentation.add_arguments(parser)
+
+    args = parser.parse_args()
+
+    with instrumentation.from_args(args), instrumentation.stage(f'mnemonic.{args.command}'):
+        return run(args)
+
+
+def run(args):
+    """명령을 실행하고 종료 코드 반환 (니모닉을 얻지 못한 행이 있으면 1)"""
+    import pandas as pd
+
     # CSV 파일 읽기
-    df = pd.read_csv('dict/kss.csv')
-    
-    # 결과를 저장할 리스트
-    results = []
-    
-    # 각 단어에 대해 니모닉 생성
-    for _, row in tqdm(df.iterrows(), total=len(df)):
-        word = row['word']
-        meaning = row['meaning']
-        
-        result = generate_mnemonic(word, meaning)
-        if result:
-            results.append({
-                'word': word,
-                'meaning': meaning,
-                'mnemonic_keyword': result['mnemonic_keyword'],
-                'verbal_cue': result['verbal_cue']
-            })
-        
-        # API 호출 간 딜레이 추가 (선택사항)
-        time.sleep(1)
-    
-    # 결과를 DataFrame으로 변환
-    result_df = pd.DataFrame(results)
-    
-    # 원본 DataFrame에 결과 추가
-    df = pd.merge(df, result_df, on=['word', 'meaning'], how='left')
-    
-    # 결과 저장
-    df.to_csv('dict/kss_with_naive_mnemonics.csv', index=False, encoding='utf-8-sig')
-    print("Results saved to dict/kss_with_naive_mnemonics.csv")
+    df = pd.read_csv(args.input)
+    rows = list(zip(df['word'], df['meaning']))
+
+    generator = MnemonicGenerator(
+        client=create_client('fake') if args.client == 'fake' else None,
+        cache=MnemonicCache(args.cache),
+        model=args.model,
+        temperature=args.temperature,
+        concurrency=getattr(args, 'concurrency', 1),
+        rate=getattr(args, 'rate', 0),
+    )
+
+    if args.command == 'batch-emit':
+        count = generator.write_batch_requests(rows, args.requests)
+        print(f"Batch 요청 {count}개 저장 (캐시된 행 {len(set(rows)) - count}개 제외): {args.requests}")
+        return 0
+
+    if args.command == 'batch-ingest':
+        ingested, failed = generator.ingest_batch_results(args.results)
+        print(f"Batch 결과 {ingested}개 반영, {len(failed)}개 실패")
+        results = {row: generator.cache.get(generator.key(*row)) for row in dict.fromkeys(rows)}
+    else:
+        results = generator.generate_all(rows)
+
+    # 원본 DataFrame에 결과 추가 후 저장 (이번에 실패한 행은 기존 출력의 니모닉을 유지)
+    previous = pd.read_csv(args.output) if os.path.exists(args.output) else None
+    df = attach_results(df, results, previous)
+    df.to_csv(args.output, index=False, encoding='utf-8-sig')
+    failed = sum(result is None or 'error' in result for result in results.values())
+    print(f"Results saved to {args.output} (니모닉을 얻지 못한 행 {failed}개, "
+          f"저장된 니모닉 없는 행 {int(df['mnemonic_keyword'].isna().sum())}개)")
+    return 1 if failed else 0
+
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main())
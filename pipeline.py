@@ -0,0 +1,370 @@
+"""
+데이터 생성 스크립트들을 입력/출력 파일로 연결한 DAG로 실행하는 파이프라인
+
+    python pipeline.py run                 # 바뀐 단계만 실행
+    python pipeline.py run mapping --jobs 2
+    python pipeline.py run mnemonics crawl # LLM/네트워크 단계는 이름을 주어야 실행
+    python pipeline.py status
+
+단계마다 (명령줄 인자, 스크립트와 스크립트가 가져오는 이 저장소 모듈의 소스, 입력 파일 내용)의
+SHA-256 지문을 상태 파일에 기록해 두고, 지문이 같고 출력 파일도 기록한 내용 그대로이면 그
+단계를 건너뜁니다. 파일 해시는 (크기, 수정 시각)이 같으면 다시 계산하지 않습니다.
+
+서로 의존하지 않는 단계(예: 오디오 다운로드와 발음 매핑)는 --jobs개까지 동시에 실행하며,
+각 단계의 출력은 LOG_DIR/<단계>.log에 기록합니다. 원본 입력 파일이 없는 단계는 출력 파일이
+이미 있으면 그 출력을 그대로 쓰고, 없으면 실패로 처리합니다.
+
+LLM 호출이나 외부 사이트 요청이 필요한 단계(니모닉 생성, 발음 크롤링, 오디오 다운로드와 팩)는
+선택 단계입니다. 이름을 직접 주었을 때만 실행하고, 그 외에는 저장소에 있는 출력 파일
+(dict/kss_with_naive_mnemonics.csv, dict/kss_data.csv 등)을 원본 입력으로 사용합니다.
+근사 후보 색인(index)도 기본 경로에서 쓰지 않으므로 선택 단계입니다.
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+STATE_PATH = 'dict/cache/pipeline-state.json'
+LOG_DIR = 'dict/cache/pipeline-logs'
+STATE_VERSION = 1
+
+KSS_PATH = 'dict/kss.csv'
+KSS_MNEMONICS_PATH = 'dict/kss_with_naive_mnemonics.csv'
+KSS_DATA_PATH = 'dict/kss_data.csv'
+KSS_OVERRIDES_PATH = 'dict/kss-pronunciation-overrides.csv'
+AUDIO_MANIFEST_PATH = 'audio/manifest.csv'
+AUDIO_PACK_INDEX_PATH = 'audio/pack/audio.index'
+KO_IPA_PATH = 'dict/final/ko-dict-ipa.csv'
+KO_DICT_PATH = 'dict/final/ko-dict-pronunciation.csv'
+LEXICON_PATH = 'dict/final/ko-dict-pronunciation.lexicon.bin'
+INDEX_PATH = 'dict/final/ko-dict-pronunciation.index.npz'
+KSS_IPA_PATH = 'dict/final/kss-dict-ipa-pronunciation.csv'
+MAPPED_RESULT_PATH = 'dict/final/kss-dict-ipa-pronunciation-mapped-result.csv'
+KNN_GRAPH_PATH = 'dict/final/en-ko-knn.graph.bin'
+
+# 단계 결과
+FRESH = 'fresh'
+RAN = 'ran'
+SOURCE_MISSING = 'source-missing'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+
+
+class Stage:
+    """스크립트 하나를 인자와 함께 실행하는 파이프라인 단계
+
+    Args:
+        inputs (list): 읽는 파일 (다른 단계의 출력이면 그 단계가 먼저 실행됨)
+        outputs (list): 만드는 파일
+        optional (bool): LLM/네트워크를 쓰는 단계 (이름을 직접 주었을 때만 실행)
+    """
+
+    def __init__(self, name, script, args=(), inputs=(), outputs=(), optional=False):
+        self.name = name
+        self.script = script
+        self.args = list(args)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.optional = optional
+
+    @property
+    def command(self):
+        return [sys.executable, self.script] + self.args
+
+
+STAGES = [
+    Stage('mnemonics', 'naive_mnemonic_generator.py',
+          ['--input', KSS_PATH, '--output', KSS_MNEMONICS_PATH, 'run'],
+          inputs=[KSS_PATH], outputs=[KSS_MNEMONICS_PATH], optional=True),
+    Stage('crawl', 'crawl_korean_pronunciation.py',
+          ['--input', KSS_MNEMONICS_PATH, '--output', KSS_DATA_PATH],
+          inputs=[KSS_MNEMONICS_PATH], outputs=[KSS_DATA_PATH], optional=True),
+    # 크롤링한 발음에서 강세 표시를 빼고 손으로 교정한 발음을 적용한 최종 KSS 발음 사전
+    # (매핑과 kNN 그래프의 입력)
+    Stage('kss_dict', 'kss_pronunciation_dict_generator.py',
+          ['--input', KSS_DATA_PATH, '--overrides', KSS_OVERRIDES_PATH, '--output', KSS_IPA_PATH],
+          inputs=[KSS_DATA_PATH, KSS_OVERRIDES_PATH], outputs=[KSS_IPA_PATH]),
+    Stage('audio', 'download_audio.py',
+          ['--csv', KSS_MNEMONICS_PATH, '--manifest', AUDIO_MANIFEST_PATH],
+          inputs=[KSS_MNEMONICS_PATH], outputs=[AUDIO_MANIFEST_PATH], optional=True),
+    # 매니페스트에 클립별 SHA-256이 있으므로 매니페스트가 같으면 클립도 같음
+    Stage('audio_pack', 'audio_pack.py',
+          ['--pack-dir', os.path.dirname(AUDIO_PACK_INDEX_PATH), 'build', '--manifest', AUDIO_MANIFEST_PATH],
+          inputs=[AUDIO_MANIFEST_PATH], outputs=[AUDIO_PACK_INDEX_PATH], optional=True),
+    Stage('ko_dict', 'korean_pronunciation_dict_generator.py',
+          ['--input', KO_IPA_PATH, '--output', KO_DICT_PATH],
+          inputs=[KO_IPA_PATH], outputs=[KO_DICT_PATH]),
+    Stage('lexicon', 'korean_phonetic_store.py',
+          ['build', '--input', KO_DICT_PATH, '--output', LEXICON_PATH],
+          inputs=[KO_DICT_PATH], outputs=[LEXICON_PATH]),
+    Stage('index', 'korean_phonetic_index.py',
+          ['build', '--input', KO_DICT_PATH, '--output', INDEX_PATH],
+          inputs=[KO_DICT_PATH], outputs=[INDEX_PATH], optional=True),
+    # 증분 매핑이므로 KO/KSS 사전의 일부 행만 바뀌면 바뀐 행만 다시 계산
+    Stage('mapping', 'korean_phonetic_levenshtein_mapper.py',
+          ['--kss', KSS_IPA_PATH, '--lexicon', LEXICON_PATH, '--output', MAPPED_RESULT_PATH, '--incremental'],
+          inputs=[KSS_IPA_PATH, LEXICON_PATH], outputs=[MAPPED_RESULT_PATH]),
+    Stage('knn_graph', 'korean_phonetic_knn.py',
+          ['build', '--en', KSS_IPA_PATH, '--lexicon', LEXICON_PATH, '--output', KNN_GRAPH_PATH, '--resume'],
+          inputs=[KSS_IPA_PATH, LEXICON_PATH], outputs=[KNN_GRAPH_PATH]),
+]
+
+
+class FileHasher:
+    """파일 SHA-256 계산기 ((크기, 수정 시각)이 기록과 같으면 기록한 해시를 재사용)"""
+
+    def __init__(self, root=ROOT, known=None):
+        self.root = root
+        self.known = dict(known or {})
+
+    def __call__(self, path):
+        """파일 해시 (파일이 없으면 None)"""
+        try:
+            stat = os.stat(os.path.join(self.root, path))
+        except OSError:
+            return None
+        size, mtime = stat.st_size, stat.st_mtime_ns
+        known = self.known.get(path)
+        if known is not None and known[:2] == [size, mtime]:
+            return known[2]
+
+        sha256 = hashlib.sha256()
+        with open(os.path.join(self.root, path), 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha256.update(chunk)
+        digest = sha256.hexdigest()
+        self.known[path] = [size, mtime, digest]
+        return digest
+
+
+def local_modules(script, root=ROOT):
+    """script와 script가 (함수 안에서라도) import하는 이 저장소의 모듈 파일 목록"""
+    found = []
+    pending = [script]
+    while pending:
+        path = pending.pop()
+        if path in found:
+            continue
+        found.append(path)
+        with open(os.path.join(root, path), encoding='utf-8') as f:
+            tree = ast.parse(f.read(), path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                module = f"{name.split('.')[0]}.py"
+                if os.path.exists(os.path.join(root, module)):
+                    pending.append(module)
+    return sorted(found)
+
+
+class Pipeline:
+    """단계 목록을 DAG로 보고 바뀐 단계만 의존 순서대로 실행하는 클래스"""
+
+    def __init__(self, stages=STAGES, root=ROOT, state_path=STATE_PATH, log_dir=LOG_DIR):
+        self.stages = {stage.name: stage for stage in stages}
+        self.producers = {output: stage.name for stage in stages for output in stage.outputs}
+        self.root = root
+        self.state_path = os.path.join(root, state_path)
+        self.log_dir = os.path.join(root, log_dir)
+        self.state = self._load_state()
+        self.hash = FileHasher(root, self.state['files'])
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = None
+        if state is None or state.get('version') != STATE_VERSION:
+            state = {'version': STATE_VERSION, 'stages': {}, 'files': {}}
+        return state
+
+    def _save_state(self):
+        self.state['files'] = self.hash.known
+        os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp_path = f'{self.state_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def dependencies(self, name):
+        """name 단계의 입력을 만드는 단계 이름 집합"""
+        return {self.producers[path] for path in self.stages[name].inputs if path in self.producers}
+
+    def select(self, targets=None, optional=False):
+        """targets와 그 상위 단계 전체 (정의 순서대로, targets가 없으면 모든 단계)
+
+        선택 단계는 targets에 직접 있을 때(또는 optional일 때)만 포함하며, 상위 단계로 끌려
+        들어오지 않습니다. 빠진 선택 단계의 출력 파일은 원본 입력처럼 그대로 읽습니다.
+        """
+        if not targets:
+            return [name for name, stage in self.stages.items() if optional or not stage.optional]
+        unknown = set(targets) - set(self.stages)
+        if unknown:
+            raise ValueError(f"알 수 없는 단계: {', '.join(sorted(unknown))}")
+        selected = set()
+        pending = list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in selected:
+                selected.add(name)
+                pending.extend(dep for dep in self.dependencies(name)
+                               if optional or dep in targets or not self.stages[dep].optional)
+        return [name for name in self.stages if name in selected]
+
+    def fingerprint(self, name):
+        """(인자, 코드, 입력 파일 내용) 지문 (입력 파일이 없으면 None)"""
+        stage = self.stages[name]
+        inputs = {path: self.hash(path) for path in stage.inputs}
+        if None in inputs.values():
+            return None
+        payload = {
+            'args': [stage.script] + stage.args,
+            'code': {path: self.hash(path) for path in local_modules(stage.script, self.root)},
+            'inputs': inputs,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def is_fresh(self, name, fingerprint):
+        """지문이 기록과 같고 출력 파일이 기록한 내용 그대로인지"""
+        record = self.state['stages'].get(name)
+        if fingerprint is None or record is None or record['fingerprint'] != fingerprint:
+            return False
+        return all(self.hash(path) == digest for path, digest in record['outputs'].items())
+
+    def status(self, targets=None):
+        """단계별 (지문 기준 최신 여부, 마지막 실행 기록) (상위 단계가 다시 실행될 경우는 반영하지 않음)"""
+        return {
+            name: (self.is_fresh(name, self.fingerprint(name)), self.state['stages'].get(name))
+            for name in self.select(targets, optional=True)
+        }
+
+    def _execute(self, name):
+        """단계 명령 실행 후 (종료 코드, 소요 시간) 반환"""
+        stage = self.stages[name]
+        os.makedirs(self.log_dir, exist_ok=True)
+        start = time.perf_counter()
+        with open(os.path.join(self.log_dir, f'{name}.log'), 'w', encoding='utf-8') as log:
+            returncode = subprocess.run(stage.command, cwd=self.root, stdout=log, stderr=subprocess.STDOUT).returncode
+        return returncode, time.perf_counter() - start
+
+    def _prepare(self, name, force):
+        """실행이 필요하면 지문을, 아니면 결과 상태를 반환"""
+        stage = self.stages[name]
+        fingerprint = self.fingerprint(name)
+        if fingerprint is None:
+            missing = [path for path in stage.inputs if self.hash(path) is None]
+            outputs_exist = all(self.hash(path) is not None for path in stage.outputs)
+            print(f"[{name}] 입력 파일 없음: {', '.join(missing)}"
+                  + (" (기존 출력 사용)" if outputs_exist else ""))
+            return SOURCE_MISSING if outputs_exist else FAILED
+        if not force and self.is_fresh(name, fingerprint):
+            return FRESH
+        return fingerprint
+
+    def run(self, targets=None, force=False, jobs=2):
+        """선택한 단계를 의존 순서대로 실행하고 {단계: 결과} 반환
+
+        상위 단계가 끝나야 입력 파일 내용이 정해지므로 지문은 실행 직전에 계산합니다.
+        """
+        order = self.select(targets)
+        results = {}
+        running = {}
+        fingerprints = {}
+        with ThreadPoolExecutor(max_workers=max(jobs, 1)) as executor:
+            while len(results) < len(order):
+                for name in order:
+                    if name in results or name in running.values():
+                        continue
+                    dependencies = self.dependencies(name) & set(order)
+                    if not dependencies <= set(results):
+                        continue
+                    if any(results[dep] in (FAILED, SKIPPED) for dep in dependencies):
+                        results[name] = SKIPPED
+                        print(f"[{name}] 상위 단계 실패로 건너뜀")
+                        continue
+                    prepared = self._prepare(name, force)
+                    if prepared in (FRESH, SOURCE_MISSING, FAILED):
+                        results[name] = prepared
+                        if prepared == FRESH:
+                            print(f"[{name}] 최신 상태")
+                        continue
+                    print(f"[{name}] 실행: {' '.join(self.stages[name].command[1:])}")
+                    running[executor.submit(self._execute, name)] = name
+                    fingerprints[name] = prepared
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    returncode, elapsed = future.result()
+                    outputs = {path: self.hash(path) for path in self.stages[name].outputs}
+                    if returncode != 0 or None in outputs.values():
+                        results[name] = FAILED
+                        print(f"[{name}] 실패 (종료 코드 {returncode}, 로그: {os.path.join(self.log_dir, name)}.log)")
+                        continue
+                    results[name] = RAN
+                    self.state['stages'][name] = {
+                        'fingerprint': fingerprints[name],
+                        'outputs': outputs,
+                        'seconds': elapsed,
+                        'finished': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                    }
+                    self._save_state()
+                    print(f"[{name}] 완료 ({elapsed:.1f}초)")
+        self._save_state()
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="데이터 생성 단계를 DAG로 실행 (바뀐 단계만)")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help="바뀐 단계 실행")
+    run_parser.add_argument('stages', nargs='*', help="실행할 단계 (상위 단계 포함, 없으면 선택 단계를 뺀 전체)")
+    run_parser.add_argument('--jobs', type=int, default=2, help="동시에 실행할 단계 수")
+    run_parser.add_argument('--force', action='store_true', help="지문이 같아도 다시 실행")
+
+    status_parser = subparsers.add_parser('status', help="단계별 최신 여부 출력")
+    status_parser.add_argument('stages', nargs='*')
+
+    for sub in (run_parser, status_parser):
+        sub.add_argument('--state', default=STATE_PATH, help="단계별 지문을 기록할 상태 파일")
+
+    args = parser.parse_args()
+    pipeline = Pipeline(state_path=args.state)
+
+    if args.command == 'status':
+        for name, (fresh, record) in pipeline.status(args.stages).items():
+            stage = pipeline.stages[name]
+            finished = record.get('finished', '-') if record else '-'
+            print(f"{name:<10} {'최신' if fresh else '실행 필요':<8} {'선택' if stage.optional else '':<4} {finished:<26} "
+                  f"{', '.join(stage.inputs)} -> {', '.join(stage.outputs)}")
+        return
+
+    start = time.perf_counter()
+    results = pipeline.run(args.stages, force=args.force, jobs=args.jobs)
+    counts = {}
+    for result in results.values():
+        counts[result] = counts.get(result, 0) + 1
+    print(f"파이프라인 종료 ({time.perf_counter() - start:.1f}초): "
+          + ', '.join(f'{result} {count}' for result, count in counts.items()))
+    if FAILED in counts or SKIPPED in counts:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
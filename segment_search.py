@@ -0,0 +1,230 @@
+"""
+영어 단어 발음을 여러 조각으로 나누었을 때 가장 잘 맞는 한국어 키워드 조합을 찾는 모듈
+
+노트북에서 split_1/split_2/split_3처럼 손으로 정한 분할을 하나씩 시험하던 것을, 발음을 최대
+K개의 연속된 조각으로 나누는 모든 분할에 대해 탐색하도록 바꾼 것입니다. 조각(부분 문자열)별
+상위 매칭 결과는 한 번만 계산하여 메모해 두므로 여러 분할, 여러 단어에 걸쳐 겹치는 조각은
+다시 계산하지 않고, 분할 점수는 조각 점수의 합이므로 DP로 상위 분할을 구합니다.
+
+    python segment_search.py hangul --max-segments 3
+    python segment_search.py ipa --ko dict/ko-dict-ipa.csv
+
+한글 경로는 발음(음절 단위)을 KoreanPhoneticSimilarity 유사도로, IPA 경로는 IPA(음소 기호
+단위)를 IPASegmentMatcher의 길이로 정규화한 레벤슈타인 유사도로 비교합니다.
+"""
+
+import argparse
+import heapq
+import time
+
+from ipa_segment_matcher import IPASegmentMatcher, ipa_similarity, tokenize_ipa
+from korean_phonetic_levenshtein import _to_text
+
+KSS_DATA_PATH = 'dict/kss_data.csv'
+EN_IPA_PATH = 'dict/en-dict-ipa.csv'
+KO_PATH = 'dict/final/ko-dict-pronunciation.csv'
+KO_IPA_PATH = 'dict/ko-dict-ipa.csv'
+OUTPUT_PATH = 'dict/segment-search-result.csv'
+
+
+class HangulSegmentBackend:
+    """한글 발음을 음절 단위로 나누고 조각을 top_k(query, k)를 가진 사전으로 매칭
+
+    matcher는 KoreanPhoneticLexicon, KoreanPhoneticIndex, PronunciationMatcher 중 어느 것이든
+    됩니다. 크롤링한 발음의 강세 표시(<...>)와 공백은 무시합니다.
+    """
+
+    def __init__(self, matcher):
+        self.matcher = matcher
+
+    def units(self, text):
+        return [char for char in _to_text(text) if char not in '<> ']
+
+    def join(self, units):
+        return ''.join(units)
+
+    def match_many(self, segments, k):
+        """조각별 상위 k개의 (단어, 유사도) 리스트"""
+        return [self.matcher.top_k(segment, k) for segment in segments]
+
+
+class IPASegmentBackend:
+    """IPA를 음소 기호 단위로 나누고 조각을 IPASegmentMatcher로 한꺼번에 매칭
+
+    유사도는 1 - 토큰 거리 / 두 토큰열 중 긴 쪽의 길이(ipa_similarity)이며, 상위 k개도 거리가
+    아니라 이 유사도로 고릅니다.
+    """
+
+    def __init__(self, matcher):
+        self.matcher = matcher
+
+    def units(self, text):
+        return tokenize_ipa(text)
+
+    def join(self, units):
+        return ''.join(units)
+
+    def match_many(self, segments, k):
+        """조각별 상위 k개의 (단어, 유사도) 리스트 (유사도 내림차순)"""
+        results = []
+        for segment, matches in zip(segments, self.matcher.match_many(segments, k, normalized=True)):
+            length = len(tokenize_ipa(segment))
+            results.append([
+                (word, float(ipa_similarity(distance, length, len(tokenize_ipa(ipa)))))
+                for word, ipa, distance in matches
+            ])
+        return results
+
+
+class SegmentSearch:
+    """최대 max_segments개의 연속된 조각으로 나누는 분할 중 점수가 높은 분할을 찾는 클래스
+
+    분할 점수는 조각별 최고 유사도를 조각 길이로 가중 평균한 값에서, 조각이 하나 늘 때마다
+    split_penalty를 뺀 값입니다. 조각이 짧을수록 쉽게 맞으므로 penalty로 과도한 분할을 막습니다.
+    """
+
+    def __init__(self, backend, max_segments=3, k=5, split_penalty=0.05, min_units=1):
+        self.backend = backend
+        self.max_segments = max_segments
+        self.k = k
+        self.split_penalty = split_penalty
+        self.min_units = min_units
+        self._memo = {}
+
+    def _substrings(self, units):
+        """분할에 쓰일 수 있는 모든 조각 (시작, 끝, 문자열)"""
+        n = len(units)
+        for start in range(n):
+            for end in range(start + self.min_units, n + 1):
+                yield start, end, self.backend.join(units[start:end])
+
+    def prepare(self, texts):
+        """여러 발음의 모든 조각을 모아 메모에 없는 것만 한 번에 매칭"""
+        pending = []
+        for text in texts:
+            for _, _, segment in self._substrings(self.backend.units(text)):
+                if segment not in self._memo:
+                    pending.append(segment)
+        pending = list(dict.fromkeys(pending))
+        if pending:
+            self._memo.update(zip(pending, self.backend.match_many(pending, self.k)))
+
+    def matches(self, segment):
+        """조각의 상위 k개 (단어, 유사도) (메모에 없으면 계산)"""
+        if segment not in self._memo:
+            self._memo[segment] = self.backend.match_many([segment], self.k)[0]
+        return self._memo[segment]
+
+    def stats(self):
+        """매칭해 둔 조각 수"""
+        return {'segments': len(self._memo)}
+
+    def search(self, text, n_best=5):
+        """점수 상위 n_best개의 (점수, [(조각, 상위 매칭 리스트), ...]) 리스트
+
+        best[(j, m)]에 앞 j개 단위를 m개 조각으로 나눈 부분 분할 중 상위 n_best개를 두는
+        DP이므로, 조각 매칭은 부분 문자열마다 한 번만 필요합니다.
+        """
+        units = self.backend.units(text)
+        n = len(units)
+        if n == 0:
+            return []
+        self.prepare([text])
+
+        gains = {}
+        for start, end, segment in self._substrings(units):
+            matches = self.matches(segment)
+            if matches:
+                gains[start, end] = (matches[0][1] * (end - start) / n - self.split_penalty, segment)
+
+        # best[(j, m)]: (누적 점수, 조각 경계 튜플) 리스트
+        best = {(0, 0): [(0.0, ())]}
+        for end in range(1, n + 1):
+            for m in range(1, self.max_segments + 1):
+                candidates = []
+                for start in range(end):
+                    if (start, end) not in gains or (start, m - 1) not in best:
+                        continue
+                    gain = gains[start, end][0]
+                    for score, bounds in best[start, m - 1]:
+                        candidates.append((score + gain, bounds + (end,)))
+                if candidates:
+                    best[end, m] = heapq.nlargest(n_best, candidates, key=lambda item: item[0])
+
+        finals = [item for m in range(1, self.max_segments + 1) for item in best.get((n, m), [])]
+        results = []
+        for score, bounds in heapq.nlargest(n_best, finals, key=lambda item: item[0]):
+            segments = []
+            for start, end in zip((0,) + bounds, bounds):
+                segment = gains[start, end][1]
+                segments.append((segment, self.matches(segment)))
+            results.append((score + self.split_penalty, segments))
+        return results
+
+    def search_many(self, texts, n_best=5):
+        """여러 발음의 조각을 한 번에 매칭한 뒤 각 발음의 상위 분할 리스트를 반환"""
+        texts = [_to_text(text) for text in texts]
+        self.prepare(texts)
+        return [self.search(text, n_best) for text in texts]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="발음 분할별 한국어 키워드 조합 탐색")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    hangul_parser = subparsers.add_parser('hangul', help="한글 발음을 음절 단위로 분할")
+    hangul_parser.add_argument('--input', default=KSS_DATA_PATH, help="word, pronunciation 컬럼이 있는 CSV")
+    hangul_parser.add_argument('--ko', default=KO_PATH, help="KO 사전 발음 CSV")
+    hangul_parser.add_argument('--lexicon', help="KO 사전 바이너리 파일 (주어지면 --ko 대신 사용)")
+
+    ipa_parser = subparsers.add_parser('ipa', help="IPA를 음소 기호 단위로 분할")
+    ipa_parser.add_argument('--input', default=EN_IPA_PATH, help="word, ipa 컬럼이 있는 CSV")
+    ipa_parser.add_argument('--ko', default=KO_IPA_PATH, help="한국어 단어 IPA CSV (word, ipa)")
+
+    for sub in (hangul_parser, ipa_parser):
+        sub.add_argument('--output', default=OUTPUT_PATH)
+        sub.add_argument('--max-segments', type=int, default=3, help="최대 조각 수")
+        sub.add_argument('--top-k', type=int, default=5, help="조각별로 기억할 매칭 수")
+        sub.add_argument('--n-best', type=int, default=3, help="단어별로 저장할 분할 수")
+        sub.add_argument('--split-penalty', type=float, default=0.05, help="조각이 하나 늘 때마다 빼는 점수")
+    args = parser.parse_args()
+
+    import pandas as pd
+
+    if args.command == 'hangul':
+        from korean_phonetic_levenshtein_mapper import PronunciationMatcher, load_matcher
+
+        if args.lexicon:
+            backend = HangulSegmentBackend(PronunciationMatcher.load(args.lexicon))
+        else:
+            backend = HangulSegmentBackend(load_matcher(args.ko))
+        column = 'pronunciation'
+    else:
+        backend = IPASegmentBackend(IPASegmentMatcher.from_csv(args.ko))
+        column = 'ipa'
+
+    df = pd.read_csv(args.input)
+    search = SegmentSearch(backend, max_segments=args.max_segments, k=args.top_k,
+                           split_penalty=args.split_penalty)
+
+    start = time.perf_counter()
+    results = search.search_many(df[column], n_best=args.n_best)
+    print(f"{len(df)}개 단어, {search.stats()['segments']}개 조각 매칭 ({time.perf_counter() - start:.2f}초)")
+
+    rows = []
+    for word, text, segmentations in zip(df['word'], df[column], results):
+        for rank, (score, segments) in enumerate(segmentations, 1):
+            rows.append({
+                'word': word,
+                column: text,
+                'rank': rank,
+                'score': score,
+                'segments': '|'.join(segment for segment, _ in segments),
+                'keywords': '|'.join(matches[0][0] for _, matches in segments),
+            })
+    pd.DataFrame(rows).to_csv(args.output, index=False, encoding='utf-8-sig')
+    print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+저장소의 스크립트들을 하위 명령으로 묶은 soundle 명령줄 도구
+
+    python -m soundle map --workers 8
+    python -m soundle crawl --concurrency 4 --rate 1
+    python -m soundle audio --workers 8
+    python -m soundle mnemonic run --client fake
+    python -m soundle bench run --sizes 10000
+    python -m soundle similar 사과 사카 바나나
+    python -m soundle similar 사과 -k 5 --scoring syllable
+    python -m soundle importtime --budget-ms 50
+
+map, crawl, audio, mnemonic, bench, knn, pipeline은 해당 스크립트의 main()에 나머지 인자를 그대로
+넘기며, 스크립트 모듈은 그 명령을 실행할 때 처음 import합니다. 따라서 이 모듈 자체는 표준
+라이브러리만 불러오고, similar처럼 짧게 끝나는 명령은 pandas/numpy 없이 수십 ms 안에 시작합니다.
+
+importtime은 python -X importtime으로 새 프로세스에서 핵심 유사도 모듈을 import하여 누적 import
+시간이 예산을 넘거나 무거운 패키지(numpy, pandas 등)를 불러오면 실패(종료 코드 1)합니다.
+"""
+
+import argparse
+import importlib
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+LEXICON_PATH = 'dict/final/ko-dict-pronunciation.lexicon.bin'
+
+# 인자를 그대로 넘기는 하위 명령 -> (스크립트 모듈, 설명)
+SCRIPTS = {
+    'map': ('korean_phonetic_levenshtein_mapper', "KSS 단어와 발음이 유사한 KO 사전 단어 매핑"),
+    'crawl': ('crawl_korean_pronunciation', "aha-dic.com에서 영어 단어의 한글 발음 수집"),
+    'audio': ('download_audio', "영어 단어 발음 오디오 다운로드"),
+    'mnemonic': ('naive_mnemonic_generator', "영어 단어 니모닉 생성"),
+    'bench': ('benchmark', "발음 유사도/매핑 성능 측정"),
+    'knn': ('korean_phonetic_knn', "EN 사전과 KO 사전 사이의 양방향 kNN 그래프 생성 및 조회"),
+    'pipeline': ('pipeline', "데이터 생성 파이프라인 실행"),
+}
+
+# importtime 기본 대상과 예산
+CORE_MODULES = ['korean_phonetic_levenshtein']
+IMPORT_BUDGET_MS = 50.0
+
+# 핵심 모듈이 import 시점에 불러오면 안 되는 패키지
+HEAVY_MODULES = ['numpy', 'pandas', 'requests', 'bs4', 'tqdm', 'openai', 'dotenv']
+
+
+def run_script(name, argv):
+    """name 하위 명령의 스크립트 main()을 argv 인자로 실행"""
+    module_name, _ = SCRIPTS[name]
+    module = importlib.import_module(module_name)
+    # 스크립트의 argparse가 sys.argv를 읽으므로 도움말의 프로그램 이름도 하위 명령으로 표시됨
+    sys.argv = [f'soundle {name}', *argv]
+    return module.main()
+
+
+def similar(args):
+    """쿼리 발음과 후보 발음들의 유사도, 또는 바이너리 KO 사전에서 가장 유사한 k개 출력"""
+    if args.candidates:
+        from korean_phonetic_levenshtein import KoreanPhoneticSimilarity
+
+        kps = KoreanPhoneticSimilarity()
+        score = kps.syllable_similarity if args.scoring == 'syllable' else kps.weighted_levenshtein
+        for candidate in args.candidates:
+            print(f"{candidate}\t{score(args.query, candidate):.4f}")
+        return 0
+
+    if not os.path.exists(args.lexicon):
+        print(f"바이너리 사전이 없습니다: {args.lexicon} (python korean_phonetic_store.py build로 생성)",
+              file=sys.stderr)
+        return 1
+
+    from korean_phonetic_levenshtein_mapper import PronunciationMatcher
+
+    matcher = PronunciationMatcher.load(args.lexicon, scoring=args.scoring)
+    for i, (word, similarity) in enumerate(matcher.top_k(args.query, args.top_k), 1):
+        print(f"{i}. {word}\t{similarity:.4f}")
+    return 0
+
+
+def measure_import(module, python=sys.executable):
+    """새 프로세스에서 module을 import하여 (누적 import 시간(μs), [(모듈, 자체 μs, 누적 μs)]) 반환
+
+    목록은 module을 import하면서 새로 불러온 모듈만 담습니다 (인터프리터 시작 때 이미 불러온
+    모듈은 제외).
+    """
+    import re
+    import subprocess
+
+    result = subprocess.run([python, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{module} import 실패:\n{result.stderr.strip()}")
+
+    # 각 줄: "import time: <자체 μs> | <누적 μs> | <들여쓰기><모듈>", 하위 모듈이 부모보다 먼저 출력됨
+    rows = []
+    for line in result.stderr.splitlines():
+        match = re.match(r'import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)', line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        if not indent and name != module:
+            # 인터프리터 시작(site 등) 때의 최상위 import
+            rows = []
+            continue
+        rows.append((name, int(self_us), int(cumulative_us)))
+    if not rows or rows[-1][0] != module:
+        raise RuntimeError(f"{module}의 import 시간을 찾지 못했습니다.")
+    return rows[-1][2], rows
+
+
+def check_import_budget(modules=CORE_MODULES, budget_ms=IMPORT_BUDGET_MS, repeat=3, heavy=HEAVY_MODULES, top=5):
+    """각 모듈의 import 시간(repeat번 중 최소)과 무거운 패키지 import 여부를 확인하여 통과 여부 반환"""
+    passed = True
+    for module in modules:
+        total_us, rows = min((measure_import(module) for _ in range(repeat)), key=lambda item: item[0])
+        loaded = sorted({name.split('.')[0] for name, _, _ in rows} & set(heavy))
+        ok = total_us / 1000 <= budget_ms and not loaded
+        passed &= ok
+
+        print(f"{module}: {total_us / 1000:.1f}ms / 예산 {budget_ms:.0f}ms, 모듈 {len(rows)}개 "
+              f"{'통과' if ok else '실패'}")
+        if loaded:
+            print(f"  import 시점에 불러온 무거운 패키지: {', '.join(loaded)}")
+        for name, self_us, _ in sorted(rows, key=lambda row: -row[1])[:top]:
+            print(f"  {self_us / 1000:7.2f}ms  {name}")
+    return passed
+
+
+def build_parser():
+    from korean_phonetic_levenshtein import SCORING_MODES
+
+    parser = argparse.ArgumentParser(prog='soundle', description="발음 사전 생성과 유사 발음 검색 도구")
+    subparsers = parser.add_subparsers(dest='command', required=True, metavar='command')
+
+    # 스크립트 하위 명령은 main()에서 먼저 처리하며, 여기서는 도움말에 표시하기 위해서만 등록
+    for name, (module_name, description) in SCRIPTS.items():
+        subparsers.add_parser(name, help=f"{description} ({module_name}.py)", add_help=False)
+
+    similar_parser = subparsers.add_parser('similar', help="발음 유사도 조회")
+    similar_parser.add_argument('query', help="쿼리 발음")
+    similar_parser.add_argument('candidates', nargs='*', help="비교할 발음 (없으면 --lexicon에서 top-k 검색)")
+    similar_parser.add_argument('--lexicon', default=LEXICON_PATH, help="KO 사전 바이너리 파일")
+    similar_parser.add_argument('-k', '--top-k', type=int, default=5)
+    similar_parser.add_argument('--scoring', choices=SCORING_MODES, default='jamo',
+                                help="jamo: 자모열별 정렬, syllable: 음절 단위 정렬")
+
+    importtime_parser = subparsers.add_parser('importtime', help="핵심 모듈의 import 시간 예산 확인")
+    importtime_parser.add_argument('modules', nargs='*', default=CORE_MODULES, help="확인할 모듈")
+    importtime_parser.add_argument('--budget-ms', type=float, default=IMPORT_BUDGET_MS, help="모듈별 누적 import 시간 예산")
+    importtime_parser.add_argument('--repeat', type=int, default=3, help="측정 반복 횟수 (최솟값 사용)")
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] in SCRIPTS:
+        return run_script(argv[0], argv[1:])
+
+    args = build_parser().parse_args(argv)
+    if args.command == 'similar':
+        return similar(args)
+    return 0 if check_import_budget(args.modules, args.budget_ms, args.repeat) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
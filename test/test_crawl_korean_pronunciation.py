@@ -0,0 +1,136 @@
+"""
+crawl_korean_pronunciation의 재시도, 429/5xx 처리, 응답 캐시, 요청 속도 제한을 로컬 스텁 HTTP 서버로 확인하는 테스트
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import crawl_korean_pronunciation as crawler_module
+from crawl_korean_pronunciation import PronunciationCrawler, ResponseCache
+
+
+def page(pronunciation, accent):
+    return (f'<html><body><span class="phoneticKor">[{pronunciation}'
+            f'<span class="accent">{accent}</span>]</span></body></html>')
+
+
+class StubServer:
+    """단어별로 정해 둔 응답을 순서대로 돌려주는 aha-dic 스텁 (마지막 응답은 계속 반복)"""
+
+    def __init__(self):
+        self.responses = {}
+        self.requests = []
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                word = parse_qs(urlparse(self.path).query)['word'][0]
+                with stub.lock:
+                    stub.requests.append((word, time.monotonic()))
+                    queue = stub.responses.get(word, [(404, {}, '')])
+                    status, headers, body = queue.pop(0) if len(queue) > 1 else queue[0]
+                data = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.httpd.server_address[1]}/View.asp'
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def count(self, word):
+        return sum(1 for requested, _ in self.requests if requested == word)
+
+
+@pytest.fixture
+def server():
+    stub = StubServer()
+    stub.thread.start()
+    yield stub
+    stub.httpd.shutdown()
+    stub.httpd.server_close()
+
+
+def make_crawler(server, tmp_path, **kwargs):
+    options = dict(base_url=server.url, concurrency=4, rate=0, retries=2, backoff=0,
+                   timeout=5, cache=ResponseCache(str(tmp_path / 'cache')))
+    options.update(kwargs)
+    return PronunciationCrawler(**options)
+
+
+def test_retries_on_429_and_5xx(server, tmp_path):
+    server.responses = {
+        'felon': [(429, {'Retry-After': '0'}, ''), (503, {}, ''), (200, {}, page('펠', '런'))],
+        'canny': [(500, {}, '')],
+        'mayhem': [(404, {}, '')],
+    }
+    results = make_crawler(server, tmp_path).crawl(['felon', 'canny', 'mayhem'], progress=False)
+
+    assert results[0] == ('펠<런>', None)
+    assert server.count('felon') == 3
+
+    # 재시도를 모두 소진하면 오류로 기록
+    assert results[1][0] == '' and '500' in results[1][1]
+    assert server.count('canny') == 3
+
+    # 404는 재시도하지 않음
+    assert results[2][0] == '' and '404' in results[2][1]
+    assert server.count('mayhem') == 1
+
+
+def test_cache_skips_network_on_rerun(server, tmp_path):
+    server.responses = {'felon': [(200, {}, page('펠', '런'))], 'canny': [(200, {}, page('', '캐니'))]}
+    first = make_crawler(server, tmp_path).crawl(['felon', 'canny'], progress=False)
+    assert len(server.requests) == 2
+
+    # 서버 응답이 바뀌어도 새 크롤러는 캐시된 응답을 사용
+    server.responses = {'felon': [(500, {}, '')], 'canny': [(500, {}, '')]}
+    second = make_crawler(server, tmp_path).crawl(['felon', 'canny'], progress=False)
+    assert second == first == [('펠<런>', None), ('<캐니>', None)]
+    assert len(server.requests) == 2
+
+    # 실패한 응답은 캐시하지 않음
+    third = make_crawler(server, tmp_path, cache=ResponseCache(str(tmp_path / 'other'))).crawl(
+        ['felon'], progress=False)
+    assert third[0][1] is not None
+    assert ResponseCache(str(tmp_path / 'other')).get(make_crawler(server, tmp_path).url('felon')) is None
+
+
+def test_parse_errors_are_recorded_per_word(server, tmp_path, monkeypatch):
+    server.responses = {'felon': [(200, {}, page('펠', '런'))], 'canny': [(200, {}, 'broken')]}
+    parse = crawler_module.parse_pronunciation
+
+    def fragile(html):
+        if html == 'broken':
+            raise ValueError('발음 태그 없음')
+        return parse(html)
+
+    monkeypatch.setattr(crawler_module, 'parse_pronunciation', fragile)
+    results = make_crawler(server, tmp_path).crawl(['felon', 'canny'], progress=False)
+    assert results == [('펠<런>', None), ('', '발음 태그 없음')]
+
+
+def test_rate_limit(server, tmp_path):
+    words = [f'word{i}' for i in range(15)]
+    server.responses = {word: [(200, {}, page('', word))] for word in words}
+
+    start = time.monotonic()
+    results = make_crawler(server, tmp_path, rate=10).crawl(words, progress=False)
+    assert [pronunciation for pronunciation, _ in results] == [f'<{word}>' for word in words]
+
+    # 버킷 용량(10개)을 넘는 5개 요청은 초당 10개씩만 나감
+    assert time.monotonic() - start >= 0.4
+    times = sorted(requested for _, requested in server.requests)
+    assert times[-1] - times[9] >= 0.4
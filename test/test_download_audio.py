@@ -0,0 +1,132 @@
+"""
+download_audio의 404 처리, 잘린 응답, 원자적 저장, 매니페스트 기반 재개를 로컬 스텁 HTTP 서버로 확인하는 테스트
+"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from download_audio import (STATUS_FAILED, STATUS_NOT_FOUND, STATUS_OK, AudioDownloader, audio_location,
+                            load_manifest)
+
+
+class StubServer:
+    """경로별로 정해 둔 (상태, 본문, 선언할 Content-Length)를 돌려주는 오디오 서버 스텁"""
+
+    def __init__(self):
+        self.files = {}
+        self.requests = []
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.lstrip('/')
+                with stub.lock:
+                    stub.requests.append(path)
+                    status, body, length = stub.files.get(path, (404, b'', None))
+                self.send_response(status)
+                self.send_header('Content-Type', 'audio/mpeg')
+                self.send_header('Content-Length', str(len(body) if length is None else length))
+                self.end_headers()
+                self.wfile.write(body)
+                # Content-Length보다 짧게 보낸 경우 연결을 끊어 잘린 응답을 만듦
+                self.close_connection = True
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.httpd.server_address[1]}/'
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def serve(self, word, body, status=200, length=None):
+        self.files[audio_location(word)[0]] = (status, body, length)
+
+    def count(self, word):
+        return self.requests.count(audio_location(word)[0])
+
+
+@pytest.fixture
+def server():
+    stub = StubServer()
+    stub.thread.start()
+    yield stub
+    stub.httpd.shutdown()
+    stub.httpd.server_close()
+
+
+def make_downloader(server, tmp_path, **kwargs):
+    options = dict(audio_base_url=server.url, audio_dir=str(tmp_path / 'audio'), workers=4, retries=1,
+                   backoff=0, timeout=5)
+    options.update(kwargs)
+    return AudioDownloader(**options)
+
+
+def part_files(tmp_path):
+    return list((tmp_path / 'audio').rglob('*.part'))
+
+
+def test_download_not_found_and_truncated(server, tmp_path):
+    server.serve('felon', b'felon-audio')
+    server.serve('canny', b'cut', length=100)
+    manifest_path = str(tmp_path / 'audio' / 'manifest.csv')
+
+    manifest = make_downloader(server, tmp_path).download_all(['felon', 'canny', 'mayhem'], {}, manifest_path)
+
+    assert manifest['felon']['status'] == STATUS_OK
+    assert int(manifest['felon']['size']) == len(b'felon-audio')
+    _, path = audio_location('felon', str(tmp_path / 'audio'))
+    assert path.read_bytes() == b'felon-audio'
+
+    # 404는 재시도 없이 없음으로 기록
+    assert manifest['mayhem']['status'] == STATUS_NOT_FOUND
+    assert server.count('mayhem') == 1
+
+    # 잘린 응답은 재시도 후 실패로 기록하고, 쓰다 만 파일을 남기지 않음
+    assert manifest['canny']['status'] == STATUS_FAILED
+    assert server.count('canny') == 2
+    assert not audio_location('canny', str(tmp_path / 'audio'))[1].exists()
+    assert part_files(tmp_path) == []
+
+    assert load_manifest(manifest_path) == {
+        word: {column: str(value) for column, value in entry.items()} for word, entry in manifest.items()}
+
+
+def test_truncated_response_keeps_existing_file(server, tmp_path):
+    _, path = audio_location('felon', str(tmp_path / 'audio'))
+    path.parent.mkdir(parents=True)
+    path.write_bytes(b'old-audio')
+    server.serve('felon', b'new', length=100)
+
+    # 매니페스트와 크기가 다르므로 다시 받지만, 실패하면 기존 파일은 그대로 둠
+    entry = {'word': 'felon', 'status': STATUS_OK, 'size': '1', 'sha256': ''}
+    result = make_downloader(server, tmp_path).download('felon', entry)
+    assert result['status'] == STATUS_FAILED
+    assert path.read_bytes() == b'old-audio'
+    assert part_files(tmp_path) == []
+
+
+def test_resume_from_manifest(server, tmp_path):
+    server.serve('felon', b'felon-audio')
+    server.serve('canny', b'', status=503)
+    manifest_path = str(tmp_path / 'audio' / 'manifest.csv')
+    words = ['felon', 'canny', 'mayhem']
+
+    make_downloader(server, tmp_path).download_all(words, {}, manifest_path)
+    assert server.requests.count(audio_location('felon')[0]) == 1
+
+    # 다시 실행하면 받은 파일과 없던 단어는 건너뛰고 실패한 단어만 다시 요청
+    server.serve('canny', b'canny-audio')
+    manifest = make_downloader(server, tmp_path).download_all(words, load_manifest(manifest_path), manifest_path)
+    assert [server.count(word) for word in words] == [1, 3, 1]
+    assert manifest['canny']['status'] == STATUS_OK
+    assert manifest['mayhem']['status'] == STATUS_NOT_FOUND
+
+    # --retry-missing이면 없던 단어도 다시 확인
+    server.serve('mayhem', b'mayhem-audio')
+    manifest = make_downloader(server, tmp_path, retry_missing=True).download_all(
+        words, load_manifest(manifest_path), manifest_path)
+    assert [server.count(word) for word in words] == [1, 3, 2]
+    assert manifest['mayhem']['status'] == STATUS_OK
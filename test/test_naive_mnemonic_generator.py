@@ -0,0 +1,163 @@
+"""
+naive_mnemonic_generator의 run, batch-emit, batch-ingest 흐름을 FakeClient로 네트워크 없이 확인하는 테스트
+"""
+
+import json
+import sys
+
+import pandas as pd
+import pytest
+
+import naive_mnemonic_generator as mg
+
+
+@pytest.fixture
+def paths(tmp_path):
+    input_path = tmp_path / 'kss.csv'
+    pd.DataFrame({
+        'word': ['felon', 'canny', 'felon', 'render'],
+        'meaning': ['중죄인', '영리한', '중죄인', '만들다'],
+    }).to_csv(input_path, index=False, encoding='utf-8-sig')
+    return {
+        'input': input_path,
+        'output': tmp_path / 'out.csv',
+        'cache': tmp_path / 'cache' / 'mnemonics.jsonl',
+        'requests': tmp_path / 'batch_requests.jsonl',
+        'results': tmp_path / 'batch_results.jsonl',
+    }
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """모든 실행이 같은 FakeClient를 쓰도록 하여 호출 수를 확인"""
+    fake = mg.FakeClient()
+    monkeypatch.setattr(mg, 'create_client', lambda name='openai': fake)
+    return fake
+
+
+def run_cli(monkeypatch, paths, *command, code=0):
+    monkeypatch.setattr(sys, 'argv', [
+        'naive_mnemonic_generator.py',
+        '--input', str(paths['input']),
+        '--output', str(paths['output']),
+        '--cache', str(paths['cache']),
+        '--client', 'fake',
+        *command,
+    ])
+    assert mg.main() == code
+    if command[0] != 'batch-emit':
+        return pd.read_csv(paths['output'])
+
+
+def read_jsonl(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def fake_batch_result(request, client, error_words=()):
+    """Batch API 결과 파일의 한 줄 (error_words의 단어는 실패 응답)"""
+    body = request['body']
+    word = body['messages'][-1]['content'].splitlines()[0].removeprefix('단어: ')
+    if word in error_words:
+        return {'custom_id': request['custom_id'], 'response': {'status_code': 500, 'body': {}}, 'error': None}
+    response = client.chat.completions.create(**body)
+    content = response.choices[0].message.content
+    return {
+        'custom_id': request['custom_id'],
+        'response': {'status_code': 200, 'body': {'choices': [{'message': {'content': content}}]}},
+        'error': None,
+    }
+
+
+def test_run_writes_output_and_resumes_from_cache(monkeypatch, paths, client):
+    df = run_cli(monkeypatch, paths, 'run', '--rate', '0')
+
+    assert client.calls == 3
+    assert list(df['word']) == ['felon', 'canny', 'felon', 'render']
+    assert list(df['mnemonic_keyword']) == ['felon-키워드', 'canny-키워드', 'felon-키워드', 'render-키워드']
+    assert df['verbal_cue'][0] == f'felon-설명 ({mg.MODEL}, {mg.TEMPERATURE})'
+    assert len(read_jsonl(paths['cache'])) == 3
+
+    # 다시 실행하면 모두 캐시에서 읽음
+    assert run_cli(monkeypatch, paths, 'run', '--rate', '0').equals(df)
+    assert client.calls == 3
+
+    # 새 행과 의미가 바뀐 행만 요청
+    pd.DataFrame({
+        'word': ['felon', 'canny', 'mayhem'],
+        'meaning': ['중죄인', '약삭빠른', '대혼란'],
+    }).to_csv(paths['input'], index=False, encoding='utf-8-sig')
+    df = run_cli(monkeypatch, paths, 'run', '--rate', '0')
+    assert client.calls == 5
+    assert list(df['mnemonic_keyword']) == ['felon-키워드', 'canny-키워드', 'mayhem-키워드']
+
+
+def test_run_skips_unparsable_responses_in_cache(monkeypatch, paths, client):
+    def broken(model, messages, temperature):
+        content = 'not json'
+        return mg.SimpleNamespace(choices=[mg.SimpleNamespace(message=mg.SimpleNamespace(content=content))])
+
+    monkeypatch.setattr(client.chat.completions, 'create', broken)
+    df = run_cli(monkeypatch, paths, 'run', '--rate', '0', code=1)
+
+    assert df['mnemonic_keyword'].isna().all()
+    assert mg.MnemonicCache(str(paths['cache'])).get(mg.cache_key('felon', '중죄인')) is None
+
+
+def test_failed_rows_keep_existing_mnemonics(monkeypatch, paths, client):
+    pd.DataFrame({
+        'word': ['felon', 'canny'],
+        'meaning': ['중죄인', '영리한'],
+        'mnemonic_keyword': ['펠럼', None],
+        'verbal_cue': ['기존 설명', None],
+    }).to_csv(paths['output'], index=False, encoding='utf-8-sig')
+
+    def failing(model, messages, temperature):
+        raise RuntimeError('API 키 없음')
+
+    monkeypatch.setattr(client.chat.completions, 'create', failing)
+    df = run_cli(monkeypatch, paths, 'run', '--rate', '0', code=1)
+
+    assert list(df['mnemonic_keyword'].fillna('')) == ['펠럼', '', '펠럼', '']
+    assert list(df['verbal_cue'].fillna('')) == ['기존 설명', '', '기존 설명', '']
+
+
+def test_batch_emit_and_ingest(monkeypatch, paths, client):
+    # 한 행은 미리 캐시에 넣어 두어 요청에서 빠지는지 확인
+    mg.MnemonicCache(str(paths['cache'])).put(
+        mg.cache_key('canny', '영리한'), {'mnemonic_keyword': '캐니', 'verbal_cue': '캐시된 설명'})
+
+    run_cli(monkeypatch, paths, 'batch-emit', '--requests', str(paths['requests']))
+    requests = read_jsonl(paths['requests'])
+    assert [request['custom_id'] for request in requests] == [
+        mg.cache_key('felon', '중죄인'), mg.cache_key('render', '만들다')]
+    assert all(request['url'] == '/v1/chat/completions' for request in requests)
+    assert requests[0]['body']['model'] == mg.MODEL
+
+    with open(paths['results'], 'w', encoding='utf-8') as f:
+        for request in requests:
+            f.write(json.dumps(fake_batch_result(request, client, error_words={'render'}), ensure_ascii=False) + '\n')
+
+    df = run_cli(monkeypatch, paths, 'batch-ingest', str(paths['results']), code=1)
+    assert list(df['mnemonic_keyword'][:3]) == ['felon-키워드', '캐니', 'felon-키워드']
+    assert pd.isna(df['mnemonic_keyword'][3])
+
+    # 실패한 행만 다시 요청 파일에 들어감
+    run_cli(monkeypatch, paths, 'batch-emit', '--requests', str(paths['requests']))
+    assert [request['custom_id'] for request in read_jsonl(paths['requests'])] == [mg.cache_key('render', '만들다')]
+
+
+def test_generate_all_creates_one_client(monkeypatch):
+    created = []
+
+    def create(name='openai'):
+        created.append(mg.FakeClient())
+        return created[-1]
+
+    monkeypatch.setattr(mg, 'create_client', create)
+    generator = mg.MnemonicGenerator(concurrency=8, rate=0)
+    rows = [(f'word{i}', '뜻') for i in range(32)]
+    results = generator.generate_all(rows, progress=False)
+
+    assert len(created) == 1 and created[0].calls == 32
+    assert results[('word0', '뜻')]['mnemonic_keyword'] == 'word0-키워드'